@@ -0,0 +1,94 @@
+"""
+Throughput of POST /plan-trips against the same trips sent as separate
+/plan-trip calls (in-process ASGI, synthetic providers with a fixed latency).
+
+A batch searches and extracts each (destination, tier) once, so its provider
+calls -- and its wall time -- follow the number of distinct destinations, not
+the number of trips.
+
+Run:  python -m benchmarks.bench_batch [--latency 0.05] [--trips 64] [--destinations 2 8 32]
+"""
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+
+os.environ.setdefault("CHECKPOINT_PATH", os.path.join(tempfile.mkdtemp(), "checkpoints.db"))
+
+import httpx
+from benchmarks.common import write_results, quiet
+from src import api, metrics, providers, tools
+from src.api import app as api_app
+from src.backends import SyntheticLLM, SyntheticSearch
+from src.cache import SearchCache
+from src.checkpoint import close_checkpointed_graph
+from src.plan_cache import PlanCache
+
+
+class CountingSearch(SyntheticSearch):
+    calls = 0
+
+    async def ainvoke(self, payload, **kwargs):
+        CountingSearch.calls += 1
+        return await super().ainvoke(payload, **kwargs)
+
+
+def trips(count, destinations):
+    # Distinct budgets, so neither coalescing nor the plan cache can merge trips
+    return [{"destination": f"City {i % destinations}", "total_budget": 3000 + 10 * i, "days": 5}
+            for i in range(count)]
+
+
+async def _measure(payload, batch):
+    transport = httpx.ASGITransport(app=api_app)
+    searches, llm_calls = CountingSearch.calls, metrics.LLM_CALLS.value(purpose="extraction")
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        start = time.perf_counter()
+        if batch:
+            response = await client.post("/plan-trips", json=payload)
+            response.raise_for_status()
+            bodies = response.json()
+        else:
+            responses = await asyncio.gather(*(client.post("/plan-trip", json=trip) for trip in payload))
+            for response in responses:
+                response.raise_for_status()
+            bodies = [response.json() for response in responses]
+        elapsed = time.perf_counter() - start
+    await close_checkpointed_graph()
+    return {
+        "trips_per_s": round(len(payload) / elapsed, 2),
+        "wall_ms": round(elapsed * 1000, 1),
+        "searches": CountingSearch.calls - searches,
+        "extraction_llm_calls": metrics.LLM_CALLS.value(purpose="extraction") - llm_calls,
+        "errors": sum(body["status"] == "ERROR" for body in bodies),
+    }
+
+
+def run(latency=0.05, count=64, destinations=(2, 8, 32)):
+    providers.set_llm(SyntheticLLM(latency_ms=latency * 1000))
+    providers.set_search_tool(CountingSearch(latency_ms=latency * 1000))
+    results = {}
+    with quiet():
+        for n in destinations:
+            for mode in ("individual", "batch"):
+                tools.search_cache = SearchCache(ttl=0)  # every run pays for its own searches
+                api.plan_cache = PlanCache(ttl=0)
+                # A fresh semaphore per asyncio.run(): the old one is bound to the previous loop
+                api.negotiation_slots = asyncio.Semaphore(api.MAX_CONCURRENT_NEGOTIATIONS)
+                results[f"{mode}_{n}_destinations"] = asyncio.run(_measure(trips(count, n), mode == "batch"))
+    params = {"provider_latency_s": latency, "trips": count, "destinations": list(destinations)}
+    return write_results("batch", params, results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--trips", type=int, default=64)
+    parser.add_argument("--destinations", type=int, nargs="+", default=[2, 8, 32])
+    args = parser.parse_args(argv)
+    return run(args.latency, args.trips, tuple(args.destinations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Single-run latency of app.invoke for the representative scenarios
+(immediate approve, budget loop, planner deadlock -> human).
+
+Run:  python -m benchmarks.bench_latency [--latency 0.05] [--runs 20]
+"""
+import time
+import argparse
+
+from benchmarks.common import SCENARIOS, use_scenario, initial_state, summarize, write_results, quiet
+from src.graph import app
+
+
+def run(latency=0.05, runs=20):
+    results = {}
+    for name in SCENARIOS:
+        scenario = use_scenario(name, latency)
+        samples = []
+        with quiet():
+            for _ in range(runs):
+                start = time.perf_counter()
+                final_state = app.invoke(initial_state(scenario))
+                samples.append(time.perf_counter() - start)
+        results[name] = {
+            **summarize(samples),
+            "final_status": final_state["plan_status"],
+            "scout_passes": final_state["retry_count"],
+        }
+    return write_results("latency", {"provider_latency_s": latency, "runs": runs}, results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per provider call")
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args(argv)
+    return run(args.latency, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Memory growth across thousands of app.invoke runs (tracemalloc).
+
+A flat curve means nothing accumulates between negotiations; a steady
+slope points at a leak (caches without bounds, state kept alive, ...).
+
+Run:  python -m benchmarks.bench_memory [--runs 2000] [--every 250]
+"""
+import gc
+import argparse
+import tracemalloc
+
+from benchmarks.common import use_scenario, initial_state, write_results, quiet
+from src.graph import app
+
+
+def run(runs=2000, every=250, scenario="budget_loop"):
+    chosen = use_scenario(scenario, latency=0.0)
+    with quiet():
+        app.invoke(initial_state(chosen))  # warm-up: imports, compiled graph, caches
+        gc.collect()
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        curve = []
+        for i in range(1, runs + 1):
+            app.invoke(initial_state(chosen))
+            if i % every == 0:
+                gc.collect()
+                curve.append({"runs": i, "retained_kb": round((tracemalloc.get_traced_memory()[0] - baseline) / 1024, 1)})
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    first, last = curve[0], curve[-1]
+    span = max(last["runs"] - first["runs"], 1)
+    results = {
+        "curve": curve,
+        "growth_kb_per_1000_runs": round((last["retained_kb"] - first["retained_kb"]) * 1000 / span, 2),
+        "peak_kb": round((peak - baseline) / 1024, 1),
+    }
+    return write_results("memory", {"runs": runs, "every": every, "scenario": scenario}, results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=2000)
+    parser.add_argument("--every", type=int, default=250)
+    parser.add_argument("--scenario", default="budget_loop")
+    args = parser.parse_args(argv)
+    return run(args.runs, args.every, args.scenario)
+
+
+if __name__ == "__main__":
+    main()
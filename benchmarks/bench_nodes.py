@@ -0,0 +1,60 @@
+"""
+Per-node cost of scout_agent / budget_agent / planner_agent, called directly.
+
+With --latency 0 this is the pure Python overhead of each node; with a
+latency it shows how much of a scout pass is spent waiting on providers.
+
+Run:  python -m benchmarks.bench_nodes [--latency 0] [--runs 500]
+"""
+import time
+import argparse
+
+from benchmarks.common import use_scenario, initial_state, summarize, write_results, quiet
+from src.agents import scout_agent, budget_agent, planner_agent
+
+
+def _time(fn, state, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(dict(state))
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def run(latency=0.0, runs=500):
+    scenario = use_scenario("budget_loop", latency)
+    first_pass = initial_state(scenario)
+    proposed = {
+        **first_pass,
+        "plan_status": "PROPOSED",
+        "current_proposal": {"name": "Hostel Marais", "price": 150, "location": "City Center"},
+    }
+    # Retry that is answered from the candidate pool (no provider calls)
+    pooled_retry = {
+        **proposed,
+        "plan_status": "REJECTED",
+        "rejection_reason": "Total cost $2750 exceeds budget of $1500.",
+        "candidates": [{"name": "Hostel Marais", "price": 150, "location": "City Center"}],
+    }
+
+    with quiet():
+        results = {
+            "scout_first_pass": _time(scout_agent, first_pass, runs),
+            "scout_pool_retry": _time(scout_agent, pooled_retry, runs),
+            "budget": _time(budget_agent, proposed, runs),
+            "planner": _time(planner_agent, proposed, runs),
+        }
+    return write_results("nodes", {"provider_latency_s": latency, "runs": runs}, results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per provider call")
+    parser.add_argument("--runs", type=int, default=500)
+    args = parser.parse_args(argv)
+    return run(args.latency, args.runs)
+
+
+if __name__ == "__main__":
+    main()
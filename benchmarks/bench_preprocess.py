@@ -0,0 +1,106 @@
+"""
+Extraction prompt size before/after search-result preprocessing (src/preprocess.py).
+
+Uses recorded Tavily responses from the search cassette when one exists
+(PROVIDER_MODE=record), otherwise a built-in sample of noisy results plus
+synthetic ones. Accuracy is checked two ways:
+  * retention: every hotel the local parser finds in a raw result must still
+    have its name, price and area in the compacted text
+  * --llm: extract with get_llm() (PROVIDER_MODE decides which) from both
+    prompts and compare the hotels it returns
+
+Run:  python -m benchmarks.bench_preprocess [--cassette cassettes/search.json] [--budget 800] [--llm]
+"""
+import os
+import json
+import argparse
+
+from benchmarks.common import write_results, quiet
+from src.backends import CASSETTE_DIR, SyntheticSearch
+from src.extraction import parse_result
+from src.preprocess import compact_results
+
+NOISY_SAMPLE = [[
+    {"url": "https://www.example-hotels.com/paris/le-marais-inn",
+     "title": "Le Marais Inn - Paris | Official Site",
+     "content": "Skip to main content. Sign in to see member prices. Le Marais Inn is a boutique hotel in the "
+                "city center of Paris. Rooms from $180 per night. Free WiFi in all rooms. "
+                "[Book now](https://www.example-hotels.com/book) We use cookies to improve your experience. "
+                "Le Marais Inn is a boutique hotel in the city center of Paris. © 2025 All rights reserved."},
+    {"url": "https://travel.example.org/best-cheap-hotels-paris",
+     "title": "12 Best Cheap Hotels in Paris (2025)",
+     "content": "<p>Looking for a bargain?</p> The Gare du Nord Hostel sits right downtown with beds at $65 a night. "
+                "Subscribe to our newsletter for more deals! Paris is lovely in spring. "
+                "The Orly Airport Lodge, near the airport, charges $90 per night. Read more at www.travel.example.org"},
+    {"url": "https://reviews.example.net/le-marais-inn",
+     "title": "Le Marais Inn - Guest reviews",
+     "content": "Le Marais Inn is a boutique hotel in the city center of Paris. Guests love the breakfast. "
+                "Rooms from $180 per night. Terms of use apply. Log in to write a review."},
+]]
+
+
+def _load(cassette):
+    if cassette and os.path.exists(cassette):
+        with open(cassette) as f:
+            return "cassette", [r for r in json.load(f).values() if isinstance(r, list)]
+    synthetic = SyntheticSearch(latency_ms=0)
+    samples = [synthetic._results(f"{tier} hotels in {city} price per night")
+               for tier in ("luxury", "budget") for city in ("Paris", "Lisbon", "Tokyo")]
+    return "sample", NOISY_SAMPLE + samples
+
+
+def _retained(hotel, text):
+    lowered = text.lower()
+    area = ("center", "centre", "downtown") if hotel["location"] == "City Center" else ("suburb", "airport", "outskirts")
+    return hotel["name"].lower() in lowered and str(hotel["price"]) in text and any(a in lowered for a in area)
+
+
+def _llm_hotels(payload):
+    from src.agents import _extraction_messages, _parse_candidates
+    from src.providers import get_llm
+    response = get_llm().invoke(_extraction_messages(payload))
+    return {(c["name"].lower(), c["price"], c["location"]) for c in _parse_candidates(response.content, fallback=False)}
+
+
+def run(cassette=None, budget=800, llm=False):
+    source, samples = _load(cassette or os.path.join(CASSETTE_DIR, "search.json"))
+    before = after = checked = retained = 0
+    agreement = []
+    with quiet():
+        for results in samples:
+            text, report = compact_results(results, token_budget=budget)
+            before += report["tokens_before"]
+            after += report["tokens_after"]
+            for hotel in filter(None, (parse_result(r) for r in results if isinstance(r, dict))):
+                checked += 1
+                retained += _retained(hotel, text)
+            if llm:
+                raw_hotels, compact_hotels = _llm_hotels(results), _llm_hotels(text)
+                if raw_hotels:
+                    agreement.append(len(raw_hotels & compact_hotels) / len(raw_hotels))
+
+    results = {
+        "source": source,
+        "samples": len(samples),
+        "tokens_before": before,
+        "tokens_after": after,
+        "reduction": round(1 - after / before, 3) if before else 0.0,
+        "hotels_checked": checked,
+        "retention": round(retained / checked, 3) if checked else None,
+    }
+    if llm:
+        results["llm_agreement"] = round(sum(agreement) / len(agreement), 3) if agreement else None
+    return write_results("preprocess", {"token_budget": budget, "llm": llm}, results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cassette", default=None, help="recorded search responses (JSON)")
+    parser.add_argument("--budget", type=int, default=800, help="token budget per prompt")
+    parser.add_argument("--llm", action="store_true", help="also compare LLM extraction on raw vs compacted")
+    args = parser.parse_args(argv)
+    return run(args.cassette, args.budget, args.llm)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Tail latency and error rate of provider calls with and without src/clients.py,
+against a local fake Tavily server (benchmarks/fake_provider.py) that makes a
+share of requests slow and a share fail with 503.
+
+  bare   -> TavilySearch alone: one attempt, no hedging
+  retry  -> Resilient: jittered retries + circuit breaker
+  hedged -> Resilient + a duplicate request after the p90 latency
+
+Run:  python -m benchmarks.bench_resilience [--calls 1000] [--slow 0.04] [--errors 0.05]
+"""
+import time
+import random
+import asyncio
+import argparse
+
+from benchmarks.common import write_results, quiet
+from benchmarks.fake_provider import FakeProvider
+from src import metrics
+from src.clients import Resilient, CircuitBreaker, LatencyWindow, TavilySearch
+
+QUERY = {"query": "budget hotels in Paris price per night"}
+
+
+def _summary(samples, failures, calls):
+    ordered = sorted(samples)
+    pick = lambda q: round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 1) if ordered else None
+    return {"error_rate": round(failures / calls, 3), "p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99)}
+
+
+async def _drive(client, calls, concurrency):
+    slots = asyncio.Semaphore(concurrency)
+    samples, failures = [], 0
+
+    async def one():
+        nonlocal failures
+        async with slots:
+            start = time.perf_counter()
+            try:
+                await client.ainvoke(QUERY)
+                samples.append(time.perf_counter() - start)
+            except Exception:
+                failures += 1
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return samples, failures
+
+
+def run(calls=1000, concurrency=8, slow=0.04, errors=0.05, slow_s=1.0, fast_s=0.03, seed=7):
+    latency = lambda n: slow_s if random.Random(seed * 1_000_003 + n).random() < slow else fast_s
+    error = lambda n: 503 if random.Random(seed * 7_919 + n).random() < errors else None
+
+    results = {}
+    with quiet():
+        for mode in ("bare", "retry", "hedged"):
+            with FakeProvider(latency=latency, error=error) as fake:
+                tavily = TavilySearch(api_key="bench", base_url=fake.url, timeout=10)
+                if mode == "bare":
+                    client = tavily
+                else:
+                    client = Resilient(tavily, f"bench-{mode}", timeout=10, retries=2,
+                                       hedge_percentile=90 if mode == "hedged" else 0,
+                                       breaker=CircuitBreaker(f"bench-{mode}", failures=50),
+                                       window=LatencyWindow(min_samples=20))
+                samples, failures = asyncio.run(_drive(client, calls, concurrency))
+                results[mode] = {
+                    **_summary(samples, failures, calls),
+                    "server_requests": fake.requests,
+                    "retries": metrics.PROVIDER_RETRIES.value(provider=f"bench-{mode}"),
+                    "hedges": metrics.PROVIDER_HEDGES.value(provider=f"bench-{mode}"),
+                }
+    params = {"calls": calls, "concurrency": concurrency, "slow_share": slow, "error_share": errors,
+              "slow_s": slow_s, "fast_s": fast_s}
+    return write_results("resilience", params, results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--slow", type=float, default=0.04, help="share of requests the server delays")
+    parser.add_argument("--errors", type=float, default=0.05, help="share of requests that get a 503")
+    args = parser.parse_args(argv)
+    return run(args.calls, args.concurrency, args.slow, args.errors)
+
+
+if __name__ == "__main__":
+    main()
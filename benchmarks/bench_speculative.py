@@ -0,0 +1,48 @@
+"""
+Wall-clock effect of SCOUT_SPECULATIVE on the main.py scenario (Paris, $1500, 5 days).
+
+Providers are stubbed with a fixed latency, so the numbers only reflect how many
+round trips sit on the critical path -- not Groq/Tavily speed.
+
+Run:  python -m benchmarks.bench_speculative [--latency 0.2] [--runs 5]
+"""
+import time
+import argparse
+
+import src.agents as agents
+from benchmarks.common import use_scenario, initial_state, summarize, write_results, quiet
+from src.graph import app
+
+
+def run(latency=0.2, runs=5):
+    scenario = use_scenario("budget_loop", latency)
+    results = {}
+    with quiet():
+        for speculative in (False, True):
+            agents.SPECULATIVE_SEARCH = speculative
+            samples = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                final_state = app.invoke(initial_state(scenario))
+                samples.append(time.perf_counter() - start)
+            results["speculative" if speculative else "sequential"] = {
+                **summarize(samples),
+                "status": final_state["plan_status"],
+                "hotel": final_state["current_proposal"]["name"],
+                "scout_passes": final_state["retry_count"],
+            }
+
+    results["speedup"] = round(results["sequential"]["mean_ms"] / results["speculative"]["mean_ms"], 2)
+    return write_results("speculative", {"provider_latency_s": latency, "runs": runs}, results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per provider call")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+    return run(args.latency, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+API throughput of POST /plan-trip under N concurrent clients (in-process ASGI,
+checkpoints in a temporary SQLite file).
+
+Every client sends the same trip, so --coalesce shows how many LLM calls
+single-flight coalescing saves; without it each request negotiates on its own.
+
+Run:  python -m benchmarks.bench_throughput [--latency 0.05] [--clients 1 4 16 64] [--requests 64] [--coalesce]
+"""
+import os
+import time
+import asyncio
+import argparse
+import tempfile
+
+os.environ.setdefault("CHECKPOINT_PATH", os.path.join(tempfile.mkdtemp(), "checkpoints.db"))
+
+import httpx
+from benchmarks.common import use_scenario, summarize, write_results, quiet
+from src import api, metrics
+from src.api import app as api_app
+from src.checkpoint import close_checkpointed_graph
+from src.plan_cache import PlanCache
+
+
+async def _measure(scenario, clients, requests):
+    payload = {k: scenario[k] for k in ("destination", "total_budget", "days")}
+    transport = httpx.ASGITransport(app=api_app)
+    latencies = []
+    llm_calls = sum(metrics.LLM_CALLS.value(purpose=p) for p in ("strategy", "extraction"))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        slots = asyncio.Semaphore(clients)
+
+        async def one():
+            async with slots:
+                start = time.perf_counter()
+                response = await client.post("/plan-trip", json=payload)
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+    await close_checkpointed_graph()
+    llm_calls = sum(metrics.LLM_CALLS.value(purpose=p) for p in ("strategy", "extraction")) - llm_calls
+    return {"requests_per_s": round(requests / elapsed, 2),
+            "llm_calls_per_request": round(llm_calls / requests, 3), **summarize(latencies)}
+
+
+def run(latency=0.05, clients=(1, 4, 16, 64), requests=64, scenario="budget_loop", coalesce=False):
+    chosen = use_scenario(scenario, latency)
+    api.COALESCE_REQUESTS = coalesce
+    api.plan_cache = PlanCache(ttl=0)  # every request must reach the graph
+    results = {}
+    with quiet():
+        for n in clients:
+            results[f"clients_{n}"] = asyncio.run(_measure(chosen, n, requests))
+    params = {"provider_latency_s": latency, "requests": requests, "scenario": scenario, "clients": list(clients),
+              "coalesce": coalesce}
+    return write_results("throughput", params, results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per provider call")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--scenario", default="budget_loop")
+    parser.add_argument("--coalesce", action="store_true", help="share one negotiation between identical requests")
+    args = parser.parse_args(argv)
+    return run(args.latency, args.clients, args.requests, args.scenario, args.coalesce)
+
+
+if __name__ == "__main__":
+    main()
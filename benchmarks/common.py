@@ -0,0 +1,153 @@
+"""
+Shared pieces for the benchmark scripts: scripted stub providers with a
+configurable latency, the representative negotiation scenarios, and a
+JSON results writer so runs can be diffed between commits.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import platform
+import contextlib
+import subprocess
+import statistics
+from datetime import datetime, timezone
+
+from src import providers
+from src import tools
+from src.backends import SyntheticLLM
+from src.cache import SearchCache
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# --- SCENARIOS ---
+# Hotels per tier; the stub search returns them in the synthetic backend's
+# text format so SyntheticLLM can "extract" them like the real model would.
+SCENARIOS = {
+    # Luxury pick fits the budget: scout -> budget -> planner, done
+    "immediate_approve": {
+        "destination": "Paris", "total_budget": 5000, "days": 5,
+        "hotels": {
+            "luxury": [("Le Grand Palais", 450, "City Center")],
+            "budget": [("Hostel Marais", 150, "City Center")],
+        },
+    },
+    # main.py scenario: luxury is rejected on price, budget tier is approved
+    "budget_loop": {
+        "destination": "Paris", "total_budget": 1500, "days": 5,
+        "hotels": {
+            "luxury": [("Le Grand Palais", 450, "City Center"), ("Hotel Royal Opera", 520, "City Center")],
+            "budget": [("Hostel Marais", 150, "City Center"), ("Ibis Porte d'Italie", 95, "Suburbs")],
+        },
+    },
+    # Everything affordable is far away: planner keeps rejecting until the human node
+    "planner_deadlock": {
+        "destination": "Paris", "total_budget": 5000, "days": 5,
+        "hotels": {
+            "luxury": [("Chateau de Versailles Suites", 300, "Suburbs")],
+            "budget": [("Airport Lodge", 80, "Suburbs")],
+        },
+    },
+}
+
+
+class ScriptedSearch:
+    """Tavily stand-in: returns the scenario's hotels for the tier in the query."""
+
+    def __init__(self, hotels, latency=0.0):
+        self.hotels = hotels
+        self.latency = latency
+
+    def _results(self, payload):
+        tier = "budget" if payload["query"].lower().startswith("budget") else "luxury"
+        return [{
+            "url": f"https://example.com/{tier}/{i}",
+            "title": name,
+            "content": f"{name} - ${price} per night, located in the {location} of Paris.",
+        } for i, (name, price, location) in enumerate(self.hotels[tier])]
+
+    def invoke(self, payload, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._results(payload)
+
+    async def ainvoke(self, payload, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._results(payload)
+
+
+def use_scenario(name, latency=0.0):
+    """Points the provider factory at stubs for `name` and disables the search cache."""
+    scenario = SCENARIOS[name]
+    providers.set_llm(SyntheticLLM(latency_ms=latency * 1000))
+    providers.set_search_tool(ScriptedSearch(scenario["hotels"], latency))
+    tools.search_cache = SearchCache(ttl=0)  # measure the provider path, not the cache
+    return scenario
+
+
+def initial_state(scenario):
+    return {
+        "destination": scenario["destination"],
+        "total_budget": scenario["total_budget"],
+        "days": scenario["days"],
+        "retry_count": 0,
+        "messages": [],
+        "candidates": [],
+        "rejection_reason": None,
+        "plan_status": "IN_PROGRESS",
+        "human_decision": None,
+    }
+
+
+def summarize(samples):
+    """Latency summary in milliseconds."""
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {
+        "n": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(pick(0.50) * 1000, 3),
+        "p95_ms": round(pick(0.95) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(name, params, results, out_dir=RESULTS_DIR):
+    """Writes benchmarks/results/<name>.json and returns the payload."""
+    payload = {
+        "benchmark": name,
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "params": params,
+        "results": results,
+    }
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"{name}.json")
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+    print(f"[BENCH] {name}: wrote {path}", file=sys.stderr)
+    return payload
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silences agent logs and tool/graph prints, which would dominate the timings."""
+    logging.disable(logging.CRITICAL)
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            yield
+    finally:
+        logging.disable(logging.NOTSET)
@@ -0,0 +1,45 @@
+"""
+Diffs two result files from benchmarks/results (e.g. saved from two commits).
+
+Run:  python -m benchmarks.compare before.json after.json
+"""
+import sys
+import json
+
+
+def _flatten(data, prefix=""):
+    flat = {}
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, path + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def compare(before, after):
+    old, new = _flatten(before["results"]), _flatten(after["results"])
+    rows = []
+    for key in sorted(old.keys() & new.keys()):
+        change = (new[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+        rows.append((key, old[key], new[key], change))
+    return rows
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        sys.exit(__doc__)
+    with open(argv[0]) as f:
+        before = json.load(f)
+    with open(argv[1]) as f:
+        after = json.load(f)
+
+    print(f"{before['benchmark']}: {before.get('commit')} -> {after.get('commit')}")
+    for key, old, new, change in compare(before, after):
+        print(f"  {key:<45} {old:>12} -> {new:>12}  ({change:+.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+A local HTTP server that speaks just enough of the Tavily (/search) and Groq
+(OpenAI-style /openai/v1/chat/completions) APIs for src/clients.py to talk to,
+with scripted latency and errors per request. Used by tests/test_clients.py
+and benchmarks/bench_resilience.py.
+"""
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SEARCH_RESULTS = [{
+    "title": "Fake Hotel",
+    "url": "https://example.com/fake-hotel",
+    "content": "Fake Hotel - $120 per night, located in the City Center.",
+    "score": 0.9,
+}]
+LLM_REPLY = json.dumps({"name": "Fake Hotel", "price": 120, "location": "City Center"})
+
+
+class FakeProvider:
+    """
+    latency(n) -> seconds and error(n) -> HTTP status or None are called with
+    the 1-based request number. Use as a context manager; `url` is the base URL.
+    """
+
+    def __init__(self, latency=None, error=None):
+        self.latency = latency or (lambda n: 0.0)
+        self.error = error or (lambda n: None)
+        self.requests = 0
+        self.client_ports = set()  # one per TCP connection the clients opened
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is visible
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with fake._lock:
+                    fake.requests += 1
+                    number = fake.requests
+                    fake.client_ports.add(self.client_address[1])
+                time.sleep(fake.latency(number))
+                status = fake.error(number)
+                if status:
+                    self._reply(status, {"error": {"message": f"injected {status}", "type": "fake"}})
+                elif self.path.endswith("/search"):
+                    self._reply(200, {"query": "", "results": SEARCH_RESULTS})
+                elif self.path.endswith("/chat/completions"):
+                    self._reply(200, {
+                        "id": f"fake-{number}", "object": "chat.completion", "created": int(time.time()),
+                        "model": "fake", "choices": [{"index": 0, "finish_reason": "stop",
+                                                      "message": {"role": "assistant", "content": LLM_REPLY}}],
+                        "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+                    })
+                else:
+                    self._reply(404, {"error": {"message": self.path}})
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                try:
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up (timeout or a hedge won)
+
+        return Handler
@@ -0,0 +1,44 @@
+"""
+Runs every benchmark with its defaults and prints a one-line summary each.
+Results land in benchmarks/results/*.json; compare two runs with
+`python -m benchmarks.compare old.json new.json`.
+
+Run:  python -m benchmarks.run_all [--quick]
+"""
+import sys
+import argparse
+
+from benchmarks import (
+    bench_latency, bench_nodes, bench_throughput, bench_memory, bench_speculative, bench_preprocess, bench_resilience,
+    bench_batch,
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--quick", action="store_true", help="fewer runs, for a smoke check")
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        reports = [
+            bench_latency.run(latency=0.01, runs=3),
+            bench_nodes.run(runs=50),
+            bench_throughput.run(latency=0.01, clients=(1, 8), requests=16),
+            bench_memory.run(runs=200, every=50),
+            bench_speculative.run(latency=0.01, runs=2),
+            bench_preprocess.run(),
+            bench_resilience.run(calls=200),
+            bench_batch.run(latency=0.01, count=16, destinations=(2,)),
+        ]
+    else:
+        reports = [
+            bench_latency.run(), bench_nodes.run(), bench_throughput.run(),
+            bench_memory.run(), bench_speculative.run(), bench_preprocess.run(), bench_resilience.run(), bench_batch.run(),
+        ]
+
+    for report in reports:
+        print(f"{report['benchmark']:>10}: {report['results']}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,25 @@ import json
 # CONFIG
 API_URL = "https://travel-graph-api.onrender.com"
 
+NODE_LABELS = {
+    "scout": " Scout",
+    "budget": " Budget Officer",
+    "planner": " Planner",
+    "human": " Human Review",
+}
+
+def read_sse(response):
+    """Yields (event, data) pairs from a Server-Sent Events response as they arrive."""
+    event = "message"
+    for line in response.iter_lines(decode_unicode=True):
+        if not line:
+            continue
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: "):
+            yield event, json.loads(line[len("data: "):])
+            event = "message"
+
 st.set_page_config(page_title="TravelGraph Pro", page_icon="✈️", layout="centered")
 
 st.title(" TravelGraph")
@@ -33,6 +52,7 @@ with st.sidebar:
 
 # MAIN ACTION BUTTON
 if st.button(" Launch Negotiation"):
+    st.session_state.pop("pending_run_id", None)
     payload = {
         "destination": destination,
         "total_budget": budget,
@@ -45,14 +65,30 @@ if st.button(" Launch Negotiation"):
         
         try:
            # The 'proxies' part tells Python to ignore any school/work firewalls
+           # Streaming endpoint: each agent step shows up as soon as it finishes
             response = requests.post(
-                f"{API_URL}/plan-trip", 
+                f"{API_URL}/plan-trip/stream", 
                 json=payload,
+                stream=True,
+                timeout=(5, 120),  # connect, then the longest gap between agent steps
                 proxies={"http": None, "https": None} 
                 )
             
+            data = None
             if response.status_code == 200:
-                data = response.json()
+                for event, event_data in read_sse(response):
+                    if event == "node":
+                        proposal = event_data.get("proposal") or {}
+                        line = f"{NODE_LABELS.get(event_data['node'], event_data['node'])}: {event_data['status']}"
+                        if proposal:
+                            line += f" — {proposal.get('name')} (${proposal.get('price')}/night)"
+                        st.write(line)
+                    elif event == "result":
+                        data = event_data
+                    elif event == "error":
+                        st.error(f"API Error: {event_data.get('detail')}")
+
+            if data is not None:
                 st.write(" Response received!")
                 status.update(label="Planning Complete!", state="complete", expanded=False)
                 # DISPLAY RESULTS
@@ -84,17 +120,22 @@ if st.button(" Launch Negotiation"):
                         st.metric("Distance", "45 mins (Too far)") # In a real app, you'd extract this from logs
                         st.metric("Total Cost", f"${proposal.get('total_cost')}")
                     
-                    st.write("---")
-                    st.write("###  Human Decision Required")
-                    
-                    c1, c2 = st.columns(2)
-                    with c1:
-                        if st.button(" Force Approve"):
-                            # Send 'approve' signal to backend (Future feature)
-                            st.success("You overruled the Planner! Trip Approved.")
-                    with c2:
-                        if st.button(" Cancel Trip"):
-                            st.error("Trip Cancelled.")
+                    # The decision buttons live below, outside this block,
+                    # because Streamlit re-runs the script when they are clicked
+                    st.session_state["pending_run_id"] = data["run_id"]
+                elif result_status == "PARTIAL":
+                    proposal = data["itinerary"]
+                    st.warning(" The agents ran out of time. This is the best hotel they found that fits.")
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.metric("Hotel", proposal.get("name", "Unknown"))
+                        st.metric("Price/Night", f"${proposal.get('price', 0)}")
+                    with col2:
+                        st.metric("Total Cost", f"${proposal.get('total_cost', 0)}")
+                elif result_status == "TIMED_OUT":
+                    st.error(" The agents ran out of time before finding a hotel that fits. Try again.")
+                elif result_status == "INFEASIBLE":
+                    st.error(" This budget cannot even cover food for the trip. Raise the budget or shorten the stay.")
                 else:
                     st.error(f"Plan Rejected: {result_status}")
                     
@@ -103,8 +144,40 @@ if st.button(" Launch Negotiation"):
                     for msg in data["logs"]:
                         st.text(msg)
                         
-            else:
+            elif response.status_code != 200:
                 st.error(f"API Error: {response.status_code} - {response.text}")
                 
         except requests.exceptions.ConnectionError:
-            st.error(" Connection Refused. Is the backend running?")
\ No newline at end of file
+            st.error(" Connection Refused. Is the backend running?")
+
+# HUMAN DECISION (resumes the paused run on the backend from its checkpoint)
+if st.session_state.get("pending_run_id"):
+    st.write("---")
+    st.write("###  Human Decision Required")
+    
+    decision = None
+    c1, c2 = st.columns(2)
+    with c1:
+        if st.button(" Force Approve"):
+            decision = "approve"
+    with c2:
+        if st.button(" Cancel Trip"):
+            decision = "quit"
+    
+    if decision:
+        run_id = st.session_state.pop("pending_run_id")
+        try:
+            response = requests.post(
+                f"{API_URL}/plan-trip/{run_id}/decision",
+                json={"decision": decision},
+                timeout=10,
+                proxies={"http": None, "https": None}
+                )
+            if response.status_code != 200:
+                st.error(f"API Error: {response.status_code} - {response.text}")
+            elif response.json()["status"] == "APPROVED":
+                st.success("You overruled the Planner! Trip Approved.")
+            else:
+                st.error("Trip Cancelled.")
+        except requests.exceptions.ConnectionError:
+            st.error(" Connection Refused. Is the backend running?")
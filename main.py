@@ -1,10 +1,20 @@
+import logging
 from dotenv import load_dotenv
 load_dotenv() # Load API keys from .env
 
 from src.graph import app
+from src.providers import PROVIDER_MODE
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - [%(levelname)s] - %(message)s',
+    datefmt='%H:%M:%S'
+)
 
 def run_negotiation():
     print("--- STARTING TRAVEL NEGOTIATOR---")
+    # PROVIDER_MODE=synthetic|replay runs this offline (see src/backends.py)
+    print(f"Providers: {PROVIDER_MODE}")
     
     # TEST CASE:
     # We set a LOW budget to force the agents to negotiate.
@@ -1,108 +1,477 @@
 import os
-import json
-import re
 import logging
-from langchain_groq import ChatGroq
-from langchain_core.messages import SystemMessage, HumanMessage
-from src.state import AgentState
-from src.tools import search_hotels, calculate_total, check_distance
-
-# ---  SETUP LOGGING (Resilience Improvement) ---
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - [%(levelname)s] - %(message)s',
-    datefmt='%H:%M:%S'
-)
+import random
+import asyncio
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from langchain_core.messages import HumanMessage
+from src.state import AgentState, Proposal, proposals
+from src.providers import get_llm
+from src import geo, metrics, tools, tracing
+from src.strategy import choose_tier, achoose_tier
+from src.tools import find_hotels, afind_hotels, calculate_total
+from src.cache import make_key, candidates_key, fallback_key
+from src.constraints import envelope, infeasible_reason, MAX_TRAVEL_MINUTES
+from src.extraction import json_objects, extract_local, EXTRACTION_CONFIDENCE
+from src.preprocess import compact_results, SEARCH_PREPROCESS
+
+# Logging is configured by the entry points (src/api.py, main.py)
 logger = logging.getLogger(__name__)
 
-# Initialize Groq LLM
-llm = ChatGroq(
-    model= "llama-3.3-70b-versatile", 
-    temperature=0,
-    api_key=os.environ.get("GROQ_API_KEY")
-)
+# Opt-in: on the first pass, search and extract both tiers concurrently so a
+# budget rejection of the luxury pick can be answered from the pool right away.
+SPECULATIVE_SEARCH = os.environ.get("SCOUT_SPECULATIVE", "0") == "1"
 
-# --- AGENT 1: THE SCOUT ---
-def scout_agent(state: AgentState):
-    #  PASSTHROUGH
-    if state.get("human_decision") == "approve":
-        logger.info("[SCOUT] Human override detected. Skipping search.")
-        return {
-            "plan_status": "APPROVED",
-            "current_proposal": state["current_proposal"],
-            "messages": ["Scout: Honoring human override."]
-        }
+# Placeholder proposal when extraction fails (counted by the fallback metric)
+FALLBACK_HOTEL_NAME = "Fallback Inn (Error)"
 
-    logger.info(f"[SCOUT] Starting search for destination: {state['destination']}")
-    
-    rejection_reason = state.get("rejection_reason")
-    retry_count = state.get("retry_count", 0)
-    
-    # DECIDE STRATEGY
-    system_prompt = """You are a Travel Scout.
-    Decide whether to search for a 'luxury' or 'budget' hotel.
-    - If rejection mentioned 'expensive', switch to 'budget'.
-    - If rejection mentioned 'far', switch to 'luxury'.
-    - Default to 'luxury'.
-    Respond with ONLY: "luxury" or "budget".
-    """
-    decision = llm.invoke([
-        SystemMessage(content=system_prompt), 
-        HumanMessage(content=f"History: {rejection_reason}")
-    ]).content.strip().lower()
-    
-    tier = "budget" if "budget" in decision else "luxury"
-    logger.info(f"[SCOUT] Strategy applied: Searching for {tier} options.")
+# --- SCOUT HELPERS (shared by the sync and async nodes) ---
+def _override_result(state: AgentState):
+    logger.info("[SCOUT] Human override detected. Skipping search.")
+    return {
+        "plan_status": "APPROVED",
+        "current_proposal": state["current_proposal"],
+        "messages": ["Scout: Honoring human override."]
+    }
 
-    # EXECUTE SEARCH
-    query = f"{tier} hotels in {state['destination']} price per night"
-    try:
-        search_results = search_hotels.invoke(query)
-    except Exception as e:
-        logger.error(f"[SCOUT] Tavily Search Failed: {e}")
-        search_results = "" # Fail gracefully
-    
-    # EXTRACT DATA
+def _extraction_messages(search_results, env=None):
     extraction_prompt = f"""
     You are a Data Extractor. 
     Here are the raw search results: {search_results}
     
-    CRITICAL: Return a JSON object with these EXACT keys:
+    CRITICAL: Return a JSON array with one object for EVERY hotel you can find.
+    Each object must have these EXACT keys:
     - "name": (str) Name of hotel
     - "price": (int) Price per night (numbers only, remove '$')
     - "location": (str) EITHER "City Center" OR "Suburbs" (Infer this)
     """
-    
-    raw_response = llm.invoke([HumanMessage(content=extraction_prompt)])
-    content = raw_response.content
-    
+    if env is not None:
+        extraction_prompt += f"""
+    The traveller can afford {env.describe()}.
+    Put the hotels that fit first, but still include every hotel.
+    """
+    return [HumanMessage(content=extraction_prompt)]
+
+def _clean_candidate(raw):
+    """Returns a {name, price, location} dict, or None if the LLM gave us junk."""
+    if not isinstance(raw, dict) or not raw.get("name"):
+        return None
     try:
-        # ROBUST FIX: Use Regex to find the JSON object
-        match = re.search(r"\{.*?\}", content, re.DOTALL)
-        if match:
-            json_str = match.group(0)
-            proposal = json.loads(json_str)
-            logger.info(f"[SCOUT] Successfully extracted: {proposal['name']} (${proposal['price']})")
-        else:
-            raise ValueError("No JSON found in response")
-            
-    except Exception as e:
-        logger.warning(f"[SCOUT] Extraction Error: {e}. Using Fallback.")
-        import random
-        proposal = {
-            "name": "Fallback Inn (Error)", 
-            "price": random.randint(150, 300), 
-            "location": "City Center"
-        }
+        price = int(float(str(raw.get("price", 0)).replace("$", "").replace(",", "")))
+    except ValueError:
+        return None
+    return {"name": str(raw["name"]), "price": price, "location": str(raw.get("location", "City Center"))}
+
+def _parse_candidates(content: str, fallback: bool = True):
+    # Every JSON object in the reply (arrays, stray objects, surrounding prose)
+    candidates = [c for c in map(_clean_candidate, json_objects(content)) if c]
+
+    if candidates:
+        logger.info(f"[SCOUT] Successfully extracted {len(candidates)} candidates: "
+                    + ", ".join(f"{c['name']} (${c['price']})" for c in candidates))
+        return candidates
+
+    if not fallback:
+        logger.warning("[SCOUT] Extraction Error: No JSON found in response.")
+        return []
+
+    logger.warning("[SCOUT] Extraction Error: No JSON found in response. Using Fallback.")
+    return _fallback_candidates()
 
+def _fallback_candidates():
+    return [{
+        "name": FALLBACK_HOTEL_NAME, 
+        "price": random.randint(150, 300), 
+        "location": "City Center"
+    }]
+
+def _state_envelope(state: AgentState):
+    return envelope(state["total_budget"], state["days"], destination=state.get("destination"))
+
+def _infeasible_result(state: AgentState):
+    reason = infeasible_reason(state["total_budget"], state["days"])
+    logger.warning(f"[SCOUT] INFEASIBLE: {reason}")
     return {
-        "current_proposal": proposal,
+        "plan_status": "INFEASIBLE",
+        "rejection_reason": reason,
+        "messages": [f"Scout: Stopped before searching. {reason}"]
+    }
+
+def _pick(candidates: list, env):
+    """Drops hotels outside the envelope. Returns (proposal, pool); proposal is None if nothing fits."""
+    feasible = env.filter(candidates)
+    if not feasible:
+        return None, []
+    return feasible[0], feasible[1:]
+
+def _next_from_pool(state: AgentState):
+    """
+    On a retry, serve the next feasible hotel from the last extraction instead of
+    searching again. Returns (proposal, remaining_pool); proposal is None when the
+    pool has nothing usable left.
+    """
+    return _pick(state.get("candidates") or [], _state_envelope(state))
+
+def _proposal_result(proposal, pool: list, retry_count: int, source: str = "search"):
+    if proposal["name"] == FALLBACK_HOTEL_NAME:
+        source = "fallback"
+    metrics.PROPOSALS.inc(source=source)
+    return {
+        "current_proposal": Proposal.of(proposal),
+        "candidates": proposals(pool),
         "plan_status": "PROPOSED",
         "retry_count": retry_count + 1,
         "rejection_reason": None,
-        "messages": [f"Scout: Proposed {proposal['name']}"]
+        "messages": [f"Scout: Proposed {proposal['name']}" + (" (from candidate pool)" if source == "pool" else "")]
     }
 
+def _local_candidates(search_results, tier: str):
+    """Fast path: parse the results ourselves; [] means 'not confident, ask the LLM'."""
+    with tracing.span("extract.local", tier=tier) as span:
+        candidates, confidence = extract_local(search_results)
+        tracing.set_attributes(span, confidence=round(confidence, 2), candidates=len(candidates))
+    if not candidates or confidence < EXTRACTION_CONFIDENCE:
+        return []
+    metrics.EXTRACTIONS.inc(method="local")
+    logger.info(f"[SCOUT] Parsed {len(candidates)} candidates locally (confidence {confidence:.0%}), skipping the LLM: "
+                + ", ".join(f"{c['name']} (${c['price']})" for c in candidates))
+    return candidates
+
+def _prompt_results(search_results, span=None):
+    """What the extraction prompt embeds: the compacted results (src/preprocess.py), or the raw payload."""
+    if not SEARCH_PREPROCESS:
+        return search_results
+    text, report = compact_results(search_results)
+    before, after = report["tokens_before"], report["tokens_after"]
+    metrics.EXTRACTION_PROMPT_TOKENS.inc(before, stage="raw")
+    metrics.EXTRACTION_PROMPT_TOKENS.inc(after, stage="compacted")
+    tracing.set_attributes(span, tokens_before=before, tokens_after=after)
+    logger.info(f"[SCOUT] Compacted search results: ~{before} -> ~{after} tokens "
+                f"({report['duplicates']} duplicate, {report['dropped']} off-topic sentences removed).")
+    return text
+
+def _extract(tier: str, destination: str, env=None, refresh: bool = False):
+    """Search + extraction. [] when nothing usable came back; raises if the LLM call fails."""
+    try:
+        search_results = find_hotels(tier, destination, env.query_ceiling if env else None, refresh=refresh)
+    except Exception as e:
+        if refresh:
+            raise  # a background refresh must not overwrite good hotels with a guess
+        logger.error(f"[SCOUT] Tavily Search Failed: {e}")
+        search_results = "" # Fail gracefully
+
+    candidates = _local_candidates(search_results, tier)
+    if candidates:
+        return candidates
+
+    with tracing.span("llm.invoke", purpose="extraction", tier=tier) as span:
+        raw_response = get_llm().invoke(_extraction_messages(_prompt_results(search_results, span), env))
+    metrics.observe_llm(raw_response, "extraction")
+    metrics.EXTRACTIONS.inc(method="llm")
+    return _parse_candidates(raw_response.content, fallback=False)
+
+async def _aextract(tier: str, destination: str, env=None, refresh: bool = False):
+    try:
+        search_results = await afind_hotels(tier, destination, env.query_ceiling if env else None, refresh=refresh)
+    except Exception as e:
+        if refresh:
+            raise
+        logger.error(f"[SCOUT] Tavily Search Failed: {e}")
+        search_results = ""
+
+    candidates = _local_candidates(search_results, tier)
+    if candidates:
+        return candidates
+
+    with tracing.span("llm.invoke", purpose="extraction", tier=tier) as span:
+        raw_response = await get_llm().ainvoke(_extraction_messages(_prompt_results(search_results, span), env))
+    metrics.observe_llm(raw_response, "extraction")
+    metrics.EXTRACTIONS.inc(method="llm")
+    return _parse_candidates(raw_response.content, fallback=False)
+
+def _search_and_extract(tier: str, destination: str, fallback: bool = True, env=None):
+    cached = _cached_candidates(tier, destination, env)
+    if cached is not None:
+        _refresh_later(tier, destination, env)
+        return cached
+
+    try:
+        candidates = _extract(tier, destination, env)
+    except Exception as e:
+        return _when_providers_fail(destination, fallback, e)
+    if not candidates:
+        return _when_providers_fail(destination, fallback)
+    return _store_candidates(tier, destination, env, candidates)
+
+async def _asearch_and_extract(tier: str, destination: str, fallback: bool = True, env=None):
+    shared = _batch_extractions.get()
+    if shared is not None:
+        return await _ashared_candidates(shared, tier, destination, fallback)
+    return await _acandidates(tier, destination, fallback, env)
+
+async def _acandidates(tier: str, destination: str, fallback: bool = True, env=None):
+    cached = _cached_candidates(tier, destination, env)
+    if cached is not None:
+        _arefresh_later(tier, destination, env)
+        return cached
+
+    try:
+        candidates = await _aextract(tier, destination, env)
+    except Exception as e:
+        return _when_providers_fail(destination, fallback, e)
+    if not candidates:
+        return _when_providers_fail(destination, fallback)
+    return _store_candidates(tier, destination, env, candidates)
+
+# --- BATCH SHARING (POST /plan-trips) ---
+# Inside share_extractions() every (tier, destination) is searched and
+# extracted once for all the trips of a batch. The shared search carries no
+# price ceiling; each trip still prunes the hotels against its own envelope,
+# and the Budget Officer and Planner check every trip as usual.
+_batch_extractions = contextvars.ContextVar("batch_extractions", default=None)
+
+@contextmanager
+def share_extractions():
+    """Async Scout passes started (as tasks) inside this block share their searches."""
+    token = _batch_extractions.set({})
+    try:
+        yield
+    finally:
+        _batch_extractions.reset(token)
+
+async def _ashared_candidates(shared: dict, tier: str, destination: str, fallback: bool):
+    key = make_key(tier, destination)
+    if key in shared:
+        metrics.BATCH_SHARED.inc()
+    else:
+        shared[key] = asyncio.ensure_future(_acandidates(tier, destination, fallback=False))
+    # shield(): one trip hitting its deadline must not cancel the search the others wait on
+    candidates = await asyncio.shield(shared[key])
+    if not candidates and fallback:
+        return _fallback_candidates()
+    return list(candidates)  # the Scout extends its list with the other tier's hotels
+
+# --- CANDIDATE CACHE (stale-while-revalidate) ---
+# The extracted hotels are cached next to the raw search results, so a warm
+# destination skips the search *and* the extraction. An expired entry is still
+# served at once while a background refresh replaces it (src/prefetch.py keeps
+# popular destinations from expiring at all), and the last hotels seen for a
+# destination stand in for the random fallback when the providers are down.
+FALLBACK_POOL_SIZE = 10
+
+_refreshing = set()   # candidate keys with a refresh in flight
+_background = set()   # refresh tasks, referenced until they finish
+_refresh_executor = None
+
+def _candidates_key(tier: str, destination: str, env=None):
+    return candidates_key(tier, destination, env.query_ceiling if env else None)
+
+def _cached_candidates(tier: str, destination: str, env=None):
+    """Cached hotels for this search (fresh or stale), as a new list; None on a miss."""
+    cached = tools.search_cache.get(_candidates_key(tier, destination, env), stale=True)
+    if cached is None:
+        return None
+    metrics.EXTRACTIONS.inc(method="cache")
+    logger.info(f"[SCOUT] Serving {len(cached)} cached {tier} candidates for {destination}.")
+    return list(cached)
+
+def _store_candidates(tier: str, destination: str, env, candidates: list):
+    tools.search_cache.set(_candidates_key(tier, destination, env), candidates)
+    known = tools.search_cache.get(fallback_key(destination), stale=True) or []
+    names = {c["name"] for c in candidates}
+    tools.search_cache.set(fallback_key(destination),
+                           (candidates + [c for c in known if c["name"] not in names])[:FALLBACK_POOL_SIZE])
+    return candidates
+
+def _when_providers_fail(destination: str, fallback: bool, error: Exception = None):
+    """
+    No usable hotels from the providers: the last ones seen for this destination
+    if any are cached, else the old behaviour (re-raise the LLM error, or the
+    random fallback proposal).
+    """
+    known = tools.search_cache.get(fallback_key(destination), stale=True)
+    if known:
+        logger.warning(f"[SCOUT] Providers failed for {destination}. Using {len(known)} cached candidates.")
+        metrics.STALE_SERVED.inc(kind="candidates", reason="fallback")
+        return list(known)
+    if error is not None:
+        raise error
+    if not fallback:
+        return []
+    logger.warning("[SCOUT] No cached candidates either. Using Fallback.")
+    return _fallback_candidates()
+
+def _claim_refresh(tier: str, destination: str, env=None):
+    """The cache key to refresh if the cached candidates are stale and nobody is refreshing them yet."""
+    key = _candidates_key(tier, destination, env)
+    if tools.search_cache.is_fresh(key) or key in _refreshing:
+        return None
+    _refreshing.add(key)
+    metrics.STALE_SERVED.inc(kind="candidates", reason="refreshing")
+    logger.info(f"[SCOUT] Cached {tier} candidates for {destination} are stale. Refreshing in the background.")
+    return key
+
+def _refresh_later(tier: str, destination: str, env=None):
+    global _refresh_executor
+    key = _claim_refresh(tier, destination, env)
+    if key is None:
+        return
+    if _refresh_executor is None:
+        _refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="scout-refresh")
+    future = _refresh_executor.submit(warm, tier, destination, env)
+    future.add_done_callback(lambda _: _refreshing.discard(key))
+
+def _arefresh_later(tier: str, destination: str, env=None):
+    key = _claim_refresh(tier, destination, env)
+    if key is None:
+        return
+    # A fresh context: the refresh is not part of this request's trace or scout tally.
+    # (create_task(context=...) is 3.11+; the task copies the context it is created in.)
+    task = contextvars.Context().run(asyncio.get_running_loop().create_task, awarm(tier, destination, env))
+    _background.add(task)
+    task.add_done_callback(lambda t: (_background.discard(t), _refreshing.discard(key)))
+
+def warm(tier: str, destination: str, env=None):
+    """Searches and extracts again, bypassing both caches. True if fresh candidates were stored."""
+    try:
+        candidates = _extract(tier, destination, env, refresh=True)
+    except Exception as e:
+        logger.error(f"[SCOUT] Background refresh of {tier} hotels in {destination} failed: {e}")
+        candidates = []
+    return _warmed(tier, destination, env, candidates)
+
+async def awarm(tier: str, destination: str, env=None):
+    try:
+        candidates = await _aextract(tier, destination, env, refresh=True)
+    except Exception as e:
+        logger.error(f"[SCOUT] Background refresh of {tier} hotels in {destination} failed: {e}")
+        candidates = []
+    return _warmed(tier, destination, env, candidates)
+
+def _warmed(tier: str, destination: str, env, candidates: list):
+    metrics.PREFETCHES.inc(outcome="ok" if candidates else "error")
+    if candidates:
+        _store_candidates(tier, destination, env, candidates)
+    return bool(candidates)
+
+def _other_tier(tier: str):
+    return "budget" if tier == "luxury" else "luxury"
+
+def _should_try_other_tier(rejection_reason):
+    # Only on the first pass, and not when speculative mode already searched both tiers
+    return not rejection_reason and not SPECULATIVE_SEARCH
+
+def _log_other_tier(tier: str, env):
+    logger.info(f"[SCOUT] No {tier} hotel fits ({env.describe()}). Trying {_other_tier(tier)} options.")
+
+def _or_best_effort(proposal, pool, candidates):
+    """Nothing fits the envelope: propose the first hotel anyway and let the agents negotiate."""
+    if proposal is None:
+        logger.warning("[SCOUT] No candidate fits the constraint envelope. Proposing the best we found.")
+        return candidates[0], []
+    return proposal, pool
+
+def _speculative_candidates(tier: str, destination: str, env=None):
+    """
+    First pass only: search both tiers at once. The chosen tier's hotels come
+    first; the other tier's hotels wait at the back of the pool for a retry.
+    """
+    logger.info(f"[SCOUT] Speculative mode: also searching {_other_tier(tier)} options in parallel.")
+    # copy_context() keeps per-pass metrics (and other context) visible in the worker threads
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        primary = executor.submit(contextvars.copy_context().run, _search_and_extract, tier, destination, True, env)
+        spare = executor.submit(contextvars.copy_context().run, _search_and_extract, _other_tier(tier), destination, False, env)
+        return primary.result() + spare.result()
+
+async def _aspeculative_candidates(tier: str, destination: str, env=None):
+    logger.info(f"[SCOUT] Speculative mode: also searching {_other_tier(tier)} options in parallel.")
+    primary, spare = await asyncio.gather(
+        _asearch_and_extract(tier, destination, env=env),
+        _asearch_and_extract(_other_tier(tier), destination, fallback=False, env=env),
+    )
+    return primary + spare
+
+
+# --- AGENT 1: THE SCOUT ---
+def scout_agent(state: AgentState):
+    #  PASSTHROUGH
+    if state.get("human_decision") == "approve":
+        return _override_result(state)
+
+    # CONSTRAINT ENVELOPE (a budget that can't cover food needs no search at all)
+    env = _state_envelope(state)
+    if not env.feasible:
+        return _infeasible_result(state)
+
+    rejection_reason = state.get("rejection_reason")
+    retry_count = state.get("retry_count", 0)
+
+    # CHECK LOCAL POOL FIRST (no network on retries while it lasts)
+    if rejection_reason:
+        proposal, pool = _next_from_pool(state)
+        if proposal:
+            logger.info(f"[SCOUT] Reusing pooled candidate: {proposal['name']} (${proposal['price']})")
+            return _proposal_result(proposal, pool, retry_count, source="pool")
+
+    logger.info(f"[SCOUT] Starting search for destination: {state['destination']}")
+    
+    # DECIDE STRATEGY (rules first, LLM only for unrecognized reasons)
+    tier = choose_tier(rejection_reason)
+    logger.info(f"[SCOUT] Strategy applied: Searching for {tier} options.")
+
+    # EXECUTE SEARCH + EXTRACT DATA
+    if SPECULATIVE_SEARCH and not rejection_reason:
+        candidates = _speculative_candidates(tier, state["destination"], env)
+    else:
+        candidates = _search_and_extract(tier, state["destination"], env=env)
+
+    # PRUNE AGAINST THE ENVELOPE (first pass: try the other tier before proposing a sure rejection)
+    proposal, pool = _pick(candidates, env)
+    if proposal is None and _should_try_other_tier(rejection_reason):
+        _log_other_tier(tier, env)
+        candidates += _search_and_extract(_other_tier(tier), state["destination"], fallback=False, env=env)
+        proposal, pool = _pick(candidates, env)
+
+    return _proposal_result(*_or_best_effort(proposal, pool, candidates), retry_count)
+
+
+async def ascout_agent(state: AgentState):
+    """Async twin of scout_agent, used by graph.ainvoke() so provider calls don't block the event loop."""
+    if state.get("human_decision") == "approve":
+        return _override_result(state)
+
+    env = _state_envelope(state)
+    if not env.feasible:
+        return _infeasible_result(state)
+
+    rejection_reason = state.get("rejection_reason")
+    retry_count = state.get("retry_count", 0)
+
+    if rejection_reason:
+        proposal, pool = _next_from_pool(state)
+        if proposal:
+            logger.info(f"[SCOUT] Reusing pooled candidate: {proposal['name']} (${proposal['price']})")
+            return _proposal_result(proposal, pool, retry_count, source="pool")
+
+    logger.info(f"[SCOUT] Starting search for destination: {state['destination']}")
+
+    tier = await achoose_tier(rejection_reason)
+    logger.info(f"[SCOUT] Strategy applied: Searching for {tier} options.")
+
+    if SPECULATIVE_SEARCH and not rejection_reason:
+        candidates = await _aspeculative_candidates(tier, state["destination"], env)
+    else:
+        candidates = await _asearch_and_extract(tier, state["destination"], env=env)
+
+    proposal, pool = _pick(candidates, env)
+    if proposal is None and _should_try_other_tier(rejection_reason):
+        _log_other_tier(tier, env)
+        candidates += await _asearch_and_extract(_other_tier(tier), state["destination"], fallback=False, env=env)
+        proposal, pool = _pick(candidates, env)
+
+    return _proposal_result(*_or_best_effort(proposal, pool, candidates), retry_count)
+
 
 # --- AGENT 2: BUDGET OFFICER ---
 def budget_agent(state: AgentState):
@@ -114,20 +483,20 @@ def budget_agent(state: AgentState):
         }
 
     logger.info("[BUDGET] Reviewing costs...")
-    proposal = state["current_proposal"]
+    proposal = Proposal.of(state["current_proposal"])
     days = state["days"]
     total_budget = state["total_budget"]
     
     # Using deterministic tool
-    total_cost = calculate_total.invoke({"hotel_price": proposal["price"], "days": days})
+    total_cost = calculate_total.invoke({"hotel_price": proposal.price, "days": days})
     
  
-    # 1. Save the total cost so it's not lost
-    proposal["total_cost"] = total_cost
+    # 1. Save the total cost so it's not lost (a new Proposal: state is never edited in place)
+    proposal = proposal.with_(total_cost=total_cost)
     
     # 2. Safety Net: If price was 0 (extraction error), back-fill it so UI math works
-    if proposal.get("price", 0) == 0 and days > 0:
-        proposal["price"] = int(total_cost / days)
+    if proposal.price == 0 and days > 0:
+        proposal = proposal.with_(price=int(total_cost / days))
 
 
     if total_cost > total_budget:
@@ -147,6 +516,10 @@ def budget_agent(state: AgentState):
         "messages": [f"Budget: Approved. Cost ${total_cost}."]
     }
 
+async def abudget_agent(state: AgentState):
+    # Pure arithmetic, nothing to await -- exists so the async graph has no sync hops.
+    return budget_agent(state)
+
 # --- AGENT 3: PLANNER ---
 def planner_agent(state: AgentState):
     if state.get("plan_status") == "APPROVED" or state.get("human_decision") == "approve":
@@ -157,26 +530,33 @@ def planner_agent(state: AgentState):
         }
 
     logger.info("[PLANNER] Checking logistics...")
-    proposal = state["current_proposal"]
+    # One batch distance lookup for the proposal and the unused pool (src/geo.py)
+    proposal, *pool = proposals(geo.annotate([state["current_proposal"]] + (state.get("candidates") or []),
+                                             state.get("destination", "")))
+    dist = proposal.travel_minutes
     
-    # Using deterministic tool
-    dist = check_distance.invoke({"hotel_location": proposal["location"]})
-    
-    if dist > 30:
+    if dist > MAX_TRAVEL_MINUTES:
         reason = f"Hotel is too far ({dist} mins) from City Center."
         logger.warning(f"[PLANNER] REJECTED: {reason}")
         return {
             "plan_status": "REJECTED",
             "rejection_reason": reason,
+            "current_proposal": proposal,
+            # Closest-to-the-sights first, so the Scout's next pick is the best one
+            "candidates": geo.rank(pool, MAX_TRAVEL_MINUTES),
             "messages": [f"Planner: Rejected. {reason}"]
         }
         
     logger.info(f"[PLANNER] APPROVED: {dist} mins is acceptable.")
     return {
         "plan_status": "APPROVED",
+        "current_proposal": proposal,
         "messages": [f"Planner: Final Approval!"]
     }
 
+async def aplanner_agent(state: AgentState):
+    return planner_agent(state)
+
 # --- HUMAN NODE ---
 def human_review_node(state: AgentState):
     if state.get("human_decision") == "approve":
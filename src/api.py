@@ -1,63 +1,462 @@
+import os
+import json
+import uuid
+import asyncio
 import logging
+from typing import List, Literal, Optional
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from src.graph import app as travel_graph  # Importing your LangGraph app
+from fastapi.responses import StreamingResponse, PlainTextResponse
+from pydantic import BaseModel, Field
+from src.checkpoint import get_checkpointed_graph, close_checkpointed_graph, run_config, fork_run, CHECKPOINT_DURABILITY, CheckpointSweeper  # LangGraph app + SQLite checkpoints
+from src.tools import search_cache
+from src import agents, metrics, tracing
+from src.coalesce import SingleFlight, trip_key, COALESCE_REQUESTS
+from src.plan_cache import PlanCache, plan_outcome
+from src.itinerary import get_itinerary_app, initial_itinerary_state, itinerary_status
+from src.jobs import JobQueue, QueueFull
+from src.deadline import deadline_at
+from src.prefetch import Prefetcher, PREFETCH
 
-# Setup Logging
-logging.basicConfig(level=logging.INFO)
+# ---  SETUP LOGGING (Resilience Improvement) ---
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - [%(levelname)s] - %(message)s',
+    datefmt='%H:%M:%S'
+)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await job_queue.start()
+    if PREFETCH:
+        prefetcher.start()
+    checkpoint_sweeper.start()
+    yield
+    await checkpoint_sweeper.stop()
+    await prefetcher.stop()
+    await job_queue.stop()
+    await close_checkpointed_graph()
+
 # 1. Initialize the API
 app = FastAPI(
     title="TravelGraph API",
     description="Neuro-Symbolic Agent API for Travel Planning",
-    version="1.0"
+    version="1.0",
+    lifespan=lifespan
 )
 
+# Caps how many negotiations run at once; extra requests wait for a free slot
+# instead of piling more concurrent Groq/Tavily calls onto the providers.
+MAX_CONCURRENT_NEGOTIATIONS = int(os.environ.get("MAX_CONCURRENT_NEGOTIATIONS", "10"))
+negotiation_slots = asyncio.Semaphore(MAX_CONCURRENT_NEGOTIATIONS)
+
+# Most trips a single POST /plan-trips may carry
+MAX_BATCH_TRIPS = int(os.environ.get("MAX_BATCH_TRIPS", "500"))
+
+# Identical /plan-trip requests in flight at the same time share one negotiation
+# (see src/coalesce.py; COALESCE_BUDGET_BUCKET widens what counts as identical).
+in_flight_trips = SingleFlight()
+
+# Finished negotiations, reused for larger (approved) or smaller (too expensive) budgets
+plan_cache = PlanCache.from_env()
+metrics.register(metrics.CallbackGauge(
+    "travelgraph_plan_cache_hits", "Plan cache hits since start.", lambda: plan_cache.hits))
+
+# Background negotiations (POST /jobs): JOB_WORKERS run at once, at most
+# JOB_QUEUE_LIMIT wait, and the queue lives in SQLite (JOB_DB_PATH).
+job_queue = JobQueue(lambda body: plan(TripRequest(**body)))
+metrics.register(metrics.CallbackGauge(
+    "travelgraph_job_queue_depth", "Jobs waiting for a worker.", job_queue.depth))
+metrics.register(metrics.CallbackGauge(
+    "travelgraph_jobs_running", "Jobs a worker is running now.", lambda: job_queue.running))
+
+# Keeps the search + extraction cache warm for the most requested destinations
+# (see src/prefetch.py; PREFETCH=0 turns it off).
+prefetcher = Prefetcher()
+metrics.register(metrics.CallbackGauge(
+    "travelgraph_prefetch_due", "Popular searches about to expire (or missing) from the cache.",
+    lambda: len(prefetcher.due())))
+
+# Deletes runs older than CHECKPOINT_RETENTION_S so checkpoints.db stays bounded
+checkpoint_sweeper = CheckpointSweeper()
+
 # 2. Define Input Schema (Standardizes what users send)
 class TripRequest(BaseModel):
     destination: str
     total_budget: int
     days: int = 5
+    # Seconds the negotiation may take before it returns its best hotel so far
+    # (status PARTIAL). Defaults to NEGOTIATION_DEADLINE_SECONDS.
+    deadline_seconds: Optional[float] = Field(default=None, gt=0)
 
-# 3. Define the Endpoint
-@app.post("/plan-trip")
-async def plan_trip(request: TripRequest):
-    """
-    Endpoints that triggers the multi-agent negotiation.
-    """
-    logger.info(f"API received request for: {request.destination}")
-    
-    # Prepare the initial state for your Graph
-    initial_state = {
+class Leg(BaseModel):
+    destination: str
+    days: int
+
+class ItineraryRequest(BaseModel):
+    total_budget: int
+    legs: List[Leg] = Field(min_length=1)
+
+class HumanDecision(BaseModel):
+    decision: Literal["approve", "quit"]
+
+def build_initial_state(request: TripRequest):
+    """Prepare the initial state for your Graph"""
+    return {
         "destination": request.destination,
         "total_budget": request.total_budget,
         "days": request.days,
         "retry_count": 0,
         "messages": [],
+        "candidates": [],
         "rejection_reason": None,
         "plan_status": "IN_PROGRESS",
+        "deadline": deadline_at(request.deadline_seconds),
         "human_decision": None
     }
-    
+
+async def run_status(graph, config, state: dict):
+    """A run paused before the human node is reported as WAITING_FOR_HUMAN."""
+    snapshot = await graph.aget_state(config)
+    if "human" in snapshot.next:
+        return "WAITING_FOR_HUMAN"
+    return state.get("plan_status", "UNKNOWN")
+
+def as_dict(proposal):
+    """Proposals (src/state.py) read like dicts but json.dumps() needs the real thing."""
+    return dict(proposal) if proposal else proposal
+
+def trip_response(final_state: dict, run_id: str, status: str):
+    """Return a clean JSON response"""
+    return {
+        "run_id": run_id,
+        "status": status,
+        "destination": final_state.get("destination"),
+        "itinerary": as_dict(final_state.get("current_proposal", {})),
+        "logs": final_state.get("messages", [])[-5:]  # Send last 5 logs
+    }
+
+async def finish_run(graph, config, final_state: dict, run_id: str):
+    """Builds the response for a finished (or paused) run and records its outcome."""
+    status = await run_status(graph, config, final_state)
+    metrics.record_negotiation(status, final_state.get("retry_count", 0))
+    return trip_response(final_state, run_id, status)
+
+# 3. Define the Endpoint
+@app.post("/plan-trip")
+async def plan_trip(request: TripRequest):
+    """
+    Endpoints that triggers the multi-agent negotiation.
+    """
+    logger.info(f"API received request for: {request.destination}")
     try:
-        # EXECUTE THE GRAPH
-        # .invoke() runs the agents until they finish or hit a breakpoint
-        final_state = travel_graph.invoke(initial_state)
-        
-        # Return a clean JSON response
-        return {
-            "status": final_state.get("plan_status", "UNKNOWN"),
-            "destination": final_state.get("destination"),
-            "itinerary": final_state.get("current_proposal", {}),
-            "logs": final_state.get("messages", [])[-5:]  # Send last 5 logs
-        }
-        
+        return await plan(request)
     except Exception as e:
         logger.error(f"API Error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-# 4. Health Check (Good for keeping the server alive)
+async def plan(request: TripRequest):
+    """The /plan-trip body: plan cache, then an in-flight twin, then a new negotiation."""
+    prefetcher.record(request.destination, request.total_budget, request.days)
+    cached = plan_cache.get(request.destination, request.days, request.total_budget)
+    if cached is not None and cached["status"] == "WAITING_FOR_HUMAN":
+        cached = await fork_paused_run(cached, request)
+    if cached is not None:
+        logger.info(f"Plan cache hit (run {cached['run_id']}) for: {request.destination}")
+        return {**cached, "cached": True}
+
+    if not COALESCE_REQUESTS:
+        return await negotiate(request)
+    key = trip_key(request.destination, request.total_budget, request.days,
+                   deadline_seconds=request.deadline_seconds)
+    # A plan approved for a smaller budget fits ours; any other outcome was decided for that budget only
+    response, shared = await in_flight_trips.do(key, lambda: negotiate(request), budget=request.total_budget,
+                                                reusable=lambda body: body["status"] == "APPROVED")
+    if shared:
+        logger.info(f"Joined in-flight negotiation {response['run_id']} for: {request.destination}")
+        metrics.COALESCED.inc()
+        if response["status"] == "WAITING_FOR_HUMAN":
+            # Like a cached stall: each follower decides on its own copy of the paused run
+            forked = await fork_paused_run(response, request)
+            response = forked if forked is not None else await negotiate(request)
+    return response
+
+async def fork_paused_run(cached: dict, request: TripRequest):
+    """
+    A cached or coalesced WAITING_FOR_HUMAN body points at another caller's paused run. This
+    caller gets a copy of that checkpoint under a new run_id (with their own
+    budget), so their decision can only resume their own run. None if the
+    original run is no longer paused.
+    """
+    travel_graph = await get_checkpointed_graph()
+    snapshot = await travel_graph.aget_state(run_config(cached["run_id"]))
+    if "human" not in snapshot.next:
+        return None
+    # No deadline: the copy only ever runs the human node, which is never cut short
+    run_id = await fork_run(travel_graph, cached["run_id"], total_budget=request.total_budget, deadline=None)
+    return {**cached, "run_id": run_id}
+
+async def negotiate(request: TripRequest):
+    """Runs one negotiation on the checkpointed graph and returns the /plan-trip body."""
+    run_id = str(uuid.uuid4())
+    config = run_config(run_id)
+
+    # EXECUTE THE GRAPH
+    # .ainvoke() runs the async agents, so the event loop stays free for other requests
+    travel_graph = await get_checkpointed_graph()
+    async with negotiation_slots:
+        # The deadline starts with the negotiation, not in the slot queue: a big
+        # /plan-trips batch or a job backlog would otherwise time out unsearched
+        initial_state = build_initial_state(request)
+        with tracing.trace(run_id, destination=request.destination, total_budget=request.total_budget) as root:
+            final_state = await travel_graph.ainvoke(initial_state, config, durability=CHECKPOINT_DURABILITY)
+            response = await finish_run(travel_graph, config, final_state, run_id)
+            tracing.set_attributes(root, status=response["status"], retry_count=final_state.get("retry_count", 0))
+
+    outcome = plan_outcome(final_state, response["status"])
+    if outcome:
+        plan_cache.set(request.destination, request.days, request.total_budget, outcome, response)
+    return response
+
+def sse_event(event: str, data: dict):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/plan-trip/stream")
+async def plan_trip_stream(request: TripRequest):
+    """
+    Same negotiation as /plan-trip, streamed as Server-Sent Events:
+    one 'node' event after every agent step, then a 'result' event
+    with the /plan-trip response body (or an 'error' event).
+    """
+    logger.info(f"API received streaming request for: {request.destination}")
+
+    async def event_stream():
+        run_id = str(uuid.uuid4())
+        config = run_config(run_id)
+        async with negotiation_slots:
+            state = build_initial_state(request)  # deadline starts once a slot is free
+            try:
+                travel_graph = await get_checkpointed_graph()
+                with tracing.trace(run_id, destination=request.destination, total_budget=request.total_budget) as root:
+                    async for update in travel_graph.astream(state, config, stream_mode="updates",
+                                                             durability=CHECKPOINT_DURABILITY):
+                        for node, changes in update.items():
+                            if node == "__interrupt__":
+                                continue
+                            changes = changes or {}
+                            new_messages = changes.get("messages", [])
+                            state.update({k: v for k, v in changes.items() if k != "messages"})
+                            state["messages"] = state["messages"] + new_messages
+                            yield sse_event("node", {
+                                "node": node,
+                                "status": state.get("plan_status"),
+                                "proposal": as_dict(state.get("current_proposal")),
+                                "retry_count": state.get("retry_count", 0),
+                                "messages": new_messages,
+                            })
+                    result = await finish_run(travel_graph, config, state, run_id)
+                    tracing.set_attributes(root, status=result["status"], retry_count=state.get("retry_count", 0))
+                yield sse_event("result", result)
+            except Exception as e:
+                logger.error(f"API Error: {str(e)}")
+                yield sse_event("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # Keep proxies from buffering the stream until the run finishes
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/plan-trips")
+async def plan_trips(requests: List[TripRequest], stream: bool = False):
+    """
+    Plans a list of trips in one call. Each distinct (destination, tier) is
+    searched and extracted once for the whole batch; every trip is still
+    negotiated, budget-checked and planned on its own. Returns the /plan-trip
+    bodies in input order, or with ?stream=true one NDJSON line per trip as it
+    finishes ({"index": i, ...body}). A failed trip reads {"status": "ERROR", "detail": ...}.
+    """
+    if len(requests) > MAX_BATCH_TRIPS:
+        raise HTTPException(status_code=413, detail=f"{len(requests)} trips (limit {MAX_BATCH_TRIPS}).")
+    logger.info(f"API received batch of {len(requests)} trips for "
+                f"{len({' '.join(r.destination.lower().split()) for r in requests})} destinations")
+
+    if not stream:
+        return await asyncio.gather(*start_batch(requests))
+
+    async def lines():
+        tasks = start_batch(requests)
+        try:
+            for finished in asyncio.as_completed([indexed(i, task) for i, task in enumerate(tasks)]):
+                index, body = await finished
+                yield json.dumps({"index": index, **body}) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()  # the client went away: stop the trips it will never read
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+def start_batch(requests: List[TripRequest]):
+    """
+    One task per trip, in input order. The first trip of every destination is
+    started first, so each distinct search begins early and the other trips
+    for that destination find it already in flight (agents.share_extractions).
+    """
+    seen, rank = {}, []
+    for request in requests:
+        key = " ".join(request.destination.lower().split())
+        rank.append(seen.get(key, 0))
+        seen[key] = rank[-1] + 1
+
+    tasks = [None] * len(requests)
+    with agents.share_extractions():
+        for i in sorted(range(len(requests)), key=lambda i: rank[i]):
+            tasks[i] = asyncio.create_task(plan_batch_trip(requests[i]))
+    return tasks
+
+async def plan_batch_trip(request: TripRequest):
+    try:
+        return await plan(request)
+    except Exception as e:
+        logger.error(f"API Error (batch trip to {request.destination}): {str(e)}")
+        return {"status": "ERROR", "detail": str(e)}
+
+async def indexed(index: int, task):
+    return index, await task
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: TripRequest):
+    """
+    Queues a /plan-trip negotiation and returns at once with the job id.
+    Poll GET /jobs/{job_id} for the result. 429 when the queue is full.
+    """
+    try:
+        job = await job_queue.submit(request.model_dump(exclude_none=True))
+    except QueueFull as e:
+        logger.warning(f"Job queue full, refusing: {request.destination}")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+    logger.info(f"Queued job {job['id']} for: {request.destination}")
+    return {"job_id": job["id"], "status": job["status"], "queue_depth": job_queue.depth()}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Job status (QUEUED, RUNNING, DONE, FAILED); 'result' is the /plan-trip body once DONE."""
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "request": job["request"],
+        "result": job["result"],
+        "error": job["error"],
+        "attempts": job["attempts"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+    }
+
+@app.post("/plan-trip/{run_id}/decision")
+async def human_decision(run_id: str, body: HumanDecision):
+    """
+    Resumes a run that is WAITING_FOR_HUMAN from its saved checkpoint.
+    Only the human node runs -- no new searches or LLM calls.
+    """
+    travel_graph = await get_checkpointed_graph()
+    config = run_config(run_id)
+    snapshot = await travel_graph.aget_state(config)
+
+    if not snapshot.values:
+        raise HTTPException(status_code=404, detail=f"Unknown run: {run_id}")
+    if "human" not in snapshot.next:
+        raise HTTPException(status_code=409, detail="Run is not waiting for a human decision.")
+
+    logger.info(f"API received human decision '{body.decision}' for run {run_id}")
+    plan_cache.invalidate(run_id=run_id)  # its cached WAITING_FOR_HUMAN body is about to go stale
+    with tracing.trace(run_id, name="graph_resume", decision=body.decision) as root:
+        await travel_graph.aupdate_state(config, {"human_decision": body.decision})
+        final_state = await travel_graph.ainvoke(None, config, durability=CHECKPOINT_DURABILITY)
+        response = await finish_run(travel_graph, config, final_state, run_id)
+        tracing.set_attributes(root, status=response["status"])
+    return response
+
+@app.get("/plan-trip/{run_id}/events")
+async def run_events(run_id: str):
+    """The run's structured event log from its checkpoint: the newest STATE_EVENT_LIMIT node steps."""
+    travel_graph = await get_checkpointed_graph()
+    snapshot = await travel_graph.aget_state(run_config(run_id))
+    if not snapshot.values:
+        raise HTTPException(status_code=404, detail=f"Unknown run: {run_id}")
+    return {"run_id": run_id, "events": [e.to_dict() for e in snapshot.values.get("events", [])]}
+
+@app.post("/plan-itinerary")
+async def plan_itinerary(request: ItineraryRequest):
+    """
+    Multi-city trip: the budget is split across legs by days and every leg is
+    negotiated in parallel. Money an approved leg leaves unspent is moved to
+    legs that failed, which are then retried once. Legs never pause for a human.
+    """
+    logger.info(f"API received itinerary request for: {[leg.destination for leg in request.legs]}")
+    run_id = str(uuid.uuid4())
+    state = initial_itinerary_state(request.total_budget, [leg.model_dump() for leg in request.legs])
+    try:
+        # Every leg takes its own negotiation slot, so a 20-leg trip cannot bypass the limit
+        with tracing.trace(run_id, name="itinerary_run", legs=len(request.legs)) as root:
+            final_state = await get_itinerary_app().ainvoke(state, {"configurable": {"slots": negotiation_slots}})
+            status = itinerary_status(final_state["leg_results"])
+            tracing.set_attributes(root, status=status, rebalance_rounds=final_state["round"])
+    except Exception as e:
+        logger.error(f"API Error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    legs = final_state["leg_results"]
+    for leg in legs:
+        metrics.record_negotiation(leg["status"], leg["retry_count"])
+    return {
+        "run_id": run_id,
+        "status": status,
+        "total_budget": request.total_budget,
+        "total_cost": sum(leg["total_cost"] for leg in legs),
+        "rebalance_rounds": final_state["round"],
+        "legs": [{**leg, "rebalanced": leg["round"] > 0} for leg in legs],
+    }
+
+# 4. Search cache counters (hit rate tells us how much Tavily spend we save)
+@app.get("/cache/stats")
+def cache_stats():
+    return search_cache.stats()
+
+# 5. Plan cache (whole negotiation outcomes)
+@app.get("/plan-cache/stats")
+def plan_cache_stats():
+    return plan_cache.stats()
+
+@app.delete("/plan-cache")
+def invalidate_plan_cache(destination: Optional[str] = None, days: Optional[int] = None):
+    """Drops cached plans, e.g. after prices change. No filters = clear everything."""
+    removed = plan_cache.invalidate(destination=destination, days=days)
+    logger.info(f"Plan cache: removed {removed} entries (destination={destination}, days={days})")
+    return {"removed": removed}
+
+# 6. Prometheus scrape target (node latency, LLM/search usage, outcomes)
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+# 7. Per-run span waterfall (graph run, nodes, LLM/search calls, router decisions)
+@app.get("/traces/{run_id}")
+def get_trace(run_id: str, format: Literal["json", "text"] = "json"):
+    spans = tracing.get_trace(run_id)
+    if spans is None:
+        raise HTTPException(status_code=404, detail=f"No trace for run: {run_id} (unknown or not sampled)")
+    if format == "text":
+        return PlainTextResponse(tracing.render_waterfall(spans))
+    return {"run_id": run_id, "spans": spans}
+
+# 8. Health Check (Good for keeping the server alive)
 @app.get("/health")
 def health_check():
     return {"status": "active", "system": "TravelGraph Neuro-Symbolic Agents"}
\ No newline at end of file
@@ -0,0 +1,238 @@
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+import threading
+from langchain_core.messages import AIMessage
+from src.strategy import rule_based_tier
+
+# --- OFFLINE PROVIDER BACKENDS ---
+# Selected with PROVIDER_MODE (see src/providers.py):
+#   record    -> call Groq/Tavily for real and save every response to a cassette
+#   replay    -> serve responses from the cassettes, no network
+#   synthetic -> invent plausible hotels for any destination, no network, no cassettes
+# PROVIDER_LATENCY_MS adds an artificial delay to replay/synthetic calls so
+# benchmarks and load tests see realistic round-trip times.
+
+CASSETTE_DIR = os.environ.get("PROVIDER_CASSETTE_DIR", "cassettes")
+LATENCY_MS = float(os.environ.get("PROVIDER_LATENCY_MS", "0"))
+
+
+class CassetteMiss(KeyError):
+    """Replay mode was asked for a request that was never recorded."""
+
+
+def request_key(payload):
+    """Stable hash of an LLM message list or a search query."""
+    if isinstance(payload, list):
+        payload = [(getattr(m, "type", "human"), getattr(m, "content", m)) for m in payload]
+    raw = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class Cassette:
+    """A JSON file of request-hash -> recorded response."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self._entries = json.load(f)
+
+    def get(self, key):
+        if key not in self._entries:
+            raise CassetteMiss(f"No recorded response for request {key[:12]} in {self.path}")
+        return self._entries[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "w") as f:
+                json.dump(self._entries, f, indent=2, sort_keys=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class _Delayed:
+    """Artificial provider latency for the offline backends."""
+
+    def __init__(self, latency_ms=None):
+        self.latency = (LATENCY_MS if latency_ms is None else latency_ms) / 1000
+
+    def _sleep(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    async def _asleep(self):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+
+# --- RECORD ---
+class RecordingLLM:
+    def __init__(self, inner, cassette):
+        self.inner = inner
+        self.cassette = cassette
+
+    def invoke(self, messages, **kwargs):
+        response = self.inner.invoke(messages, **kwargs)
+        self.cassette.put(request_key(messages), response.content)
+        return response
+
+    async def ainvoke(self, messages, **kwargs):
+        response = await self.inner.ainvoke(messages, **kwargs)
+        self.cassette.put(request_key(messages), response.content)
+        return response
+
+
+class RecordingSearch:
+    def __init__(self, inner, cassette):
+        self.inner = inner
+        self.cassette = cassette
+
+    def invoke(self, payload, **kwargs):
+        results = self.inner.invoke(payload, **kwargs)
+        self.cassette.put(request_key(payload["query"]), results)
+        return results
+
+    async def ainvoke(self, payload, **kwargs):
+        results = await self.inner.ainvoke(payload, **kwargs)
+        self.cassette.put(request_key(payload["query"]), results)
+        return results
+
+
+# --- REPLAY ---
+class ReplayLLM(_Delayed):
+    def __init__(self, cassette, latency_ms=None):
+        super().__init__(latency_ms)
+        self.cassette = cassette
+
+    def invoke(self, messages, **kwargs):
+        self._sleep()
+        return AIMessage(content=self.cassette.get(request_key(messages)))
+
+    async def ainvoke(self, messages, **kwargs):
+        await self._asleep()
+        return AIMessage(content=self.cassette.get(request_key(messages)))
+
+
+class ReplaySearch(_Delayed):
+    def __init__(self, cassette, latency_ms=None):
+        super().__init__(latency_ms)
+        self.cassette = cassette
+
+    def invoke(self, payload, **kwargs):
+        self._sleep()
+        return self.cassette.get(request_key(payload["query"]))
+
+    async def ainvoke(self, payload, **kwargs):
+        await self._asleep()
+        return self.cassette.get(request_key(payload["query"]))
+
+
+# --- SYNTHETIC ---
+QUERY_PATTERN = re.compile(r"^(?P<tier>luxury|budget) hotels in (?P<destination>.+?) price per night", re.IGNORECASE)
+HOTEL_PATTERN = re.compile(
+    r"(?P<name>[A-Za-z][A-Za-z .&-]*?) - \$(?P<price>\d+) per night, located in the (?P<location>City Center|Suburbs)"
+)
+
+NAME_PARTS = {
+    "luxury": (["Grand", "Royal", "Imperial", "Palace", "Regent"], ["Hotel", "Suites", "Resort"]),
+    "budget": (["Central", "Backpackers", "Station", "Corner", "Garden"], ["Hostel", "Inn", "Lodge"]),
+}
+PRICE_RANGES = {"luxury": (300, 650), "budget": (60, 180)}
+
+
+def synthetic_hotels(tier: str, destination: str, count: int = 3):
+    """Deterministic fake hotels: the same (tier, destination) always gives the same list."""
+    seed = int(hashlib.sha256(f"{tier}|{destination.strip().lower()}".encode()).hexdigest(), 16)
+    rng = random.Random(seed)
+    prefixes, suffixes = NAME_PARTS[tier]
+    city = destination.strip().title()
+    hotels = []
+    for _ in range(count):
+        location = "City Center" if tier == "luxury" or rng.random() < 0.6 else "Suburbs"
+        hotels.append({
+            "name": f"{rng.choice(prefixes)} {city} {rng.choice(suffixes)}",
+            "price": rng.randint(*PRICE_RANGES[tier]),
+            "location": location,
+        })
+    return hotels
+
+
+class SyntheticSearch(_Delayed):
+    def _results(self, query):
+        match = QUERY_PATTERN.match(query)
+        tier = match.group("tier").lower() if match else "luxury"
+        destination = match.group("destination") if match else query
+        return [{
+            "url": f"https://example.com/{tier}/{i}",
+            "title": hotel["name"],
+            "content": f"{hotel['name']} - ${hotel['price']} per night, located in the {hotel['location']} of {destination}.",
+        } for i, hotel in enumerate(synthetic_hotels(tier, destination))]
+
+    def invoke(self, payload, **kwargs):
+        self._sleep()
+        return self._results(payload["query"])
+
+    async def ainvoke(self, payload, **kwargs):
+        await self._asleep()
+        return self._results(payload["query"])
+
+
+class SyntheticLLM(_Delayed):
+    """Answers the Scout's two prompts without a model: strategy by rules, extraction by regex."""
+
+    def _answer(self, messages):
+        prompt = messages[-1].content
+        if "Data Extractor" in prompt:
+            hotels = [
+                {"name": m.group("name").strip(), "price": int(m.group("price")), "location": m.group("location")}
+                for m in HOTEL_PATTERN.finditer(prompt)
+            ]
+            return AIMessage(content=json.dumps(hotels))
+        reason = prompt.split("History:", 1)[-1].strip()
+        return AIMessage(content=rule_based_tier(reason) or "luxury")
+
+    def invoke(self, messages, **kwargs):
+        self._sleep()
+        return self._answer(messages)
+
+    async def ainvoke(self, messages, **kwargs):
+        await self._asleep()
+        return self._answer(messages)
+
+
+# --- FACTORIES (used by src/providers.py) ---
+MODES = ("live", "record", "replay", "synthetic")
+
+
+def _cassette(name):
+    return Cassette(os.path.join(CASSETTE_DIR, f"{name}.json"))
+
+
+def build_llm(mode, live_factory):
+    if mode == "record":
+        return RecordingLLM(live_factory(), _cassette("llm"))
+    if mode == "replay":
+        return ReplayLLM(_cassette("llm"))
+    if mode == "synthetic":
+        return SyntheticLLM()
+    raise ValueError(f"Unknown PROVIDER_MODE '{mode}'. Expected one of {MODES}.")
+
+
+def build_search_tool(mode, live_factory):
+    if mode == "record":
+        return RecordingSearch(live_factory(), _cassette("search"))
+    if mode == "replay":
+        return ReplaySearch(_cassette("search"))
+    if mode == "synthetic":
+        return SyntheticSearch()
+    raise ValueError(f"Unknown PROVIDER_MODE '{mode}'. Expected one of {MODES}.")
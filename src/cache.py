@@ -0,0 +1,210 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# --- SEARCH RESULT CACHE ---
+# Tavily results for a (tier, destination) pair barely change during a day,
+# so the Scout reuses them instead of paying for the same search again.
+# Past its TTL an entry is kept for another stale_ttl seconds: the Scout can
+# still serve it (and refresh it in the background), or fall back on it when
+# the providers are down.
+
+def make_key(tier: str, destination: str, max_price: int = None):
+    """Normalizes 'Luxury', '  paris ' and 'PARIS' onto the same cache entry."""
+    tier = tier.strip().lower()
+    destination = " ".join(destination.lower().split())
+    key = f"{tier}|{destination}"
+    return f"{key}|under-{max_price}" if max_price else key
+
+
+def candidates_key(tier: str, destination: str, max_price: int = None):
+    """Where the Scout keeps the hotels it extracted from that search."""
+    return f"candidates|{make_key(tier, destination, max_price)}"
+
+
+def fallback_key(destination: str):
+    """The last hotels extracted for a destination (any tier or price), for when providers fail."""
+    return f"fallback|{' '.join(destination.lower().split())}"
+
+logger = logging.getLogger(__name__)
+
+
+class SearchCache:
+    """
+    In-memory LRU cache with TTL expiry and an optional SQLite file behind it.
+    The SQLite layer lets warm entries survive a restart of the API worker.
+    """
+
+    def __init__(self, ttl=21600, max_entries=1024, db_path=None, clock=time.time, stale_ttl=0):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.clock = clock
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        # Hits only note the time here; the rows' last_used is written with the
+        # next set(), where the on-disk LRU bound is enforced, so a hit never commits
+        self._touched = {}  # key -> last hit time
+        self._lock = threading.Lock()
+        self._db = None
+        # Writes (and their commits) run on one background thread, in order, so
+        # a set() on the event loop never waits for SQLite. flush() waits for them.
+        self._writer = None
+        self._db_lock = threading.Lock()
+        if db_path:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search-cache-writer")
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            ttl=float(os.environ.get("SEARCH_CACHE_TTL", "21600")),
+            max_entries=int(os.environ.get("SEARCH_CACHE_SIZE", "1024")),
+            db_path=os.environ.get("SEARCH_CACHE_PATH") or None,
+            stale_ttl=float(os.environ.get("SEARCH_CACHE_STALE_TTL", "86400")),
+        )
+
+    def get(self, key, stale=False):
+        """
+        The cached value while fresh, else None. With stale=True an expired value
+        still inside the stale window is returned too (see is_fresh()).
+        """
+        now = self.clock()
+        with self._lock:
+            entry = self._load(key)
+            if entry is not None and entry[0] + self.stale_ttl <= now:
+                self._drop(key)
+                entry = None
+            if entry is None or (entry[0] <= now and not stale):
+                self.misses += 1
+                return None
+            if entry[0] <= now:
+                self.stale_hits += 1
+
+            self._entries.move_to_end(key)
+            if self._db is not None:
+                self._touched[key] = now
+            self.hits += 1
+            return entry[1]
+
+    def expires_at(self, key):
+        """When the entry stops being fresh; None if it is not cached (no counters touched)."""
+        with self._lock:
+            entry = self._load(key)
+            return entry[0] if entry is not None else None
+
+    def is_fresh(self, key):
+        expires_at = self.expires_at(key)
+        return expires_at is not None and expires_at > self.clock()
+
+    def set(self, key, value):
+        now = self.clock()
+        entry = (now + self.ttl, value)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._evict()
+
+            if self._db is not None:
+                self._touched.pop(key, None)
+                touched = list(self._touched.items())
+                self._touched.clear()
+                self._submit(self._db_set, key, json.dumps(value), entry[0], now, touched)
+
+    def flush(self):
+        """Waits until every pending SQLite write is committed."""
+        if self._writer is not None:
+            self._writer.submit(lambda: None).result()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._touched.clear()
+            if self._db is not None:
+                self._submit(self._db_write, "DELETE FROM search_cache")
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": len(self._entries),
+            "persistent": self._db is not None,
+        }
+
+    # --- internal helpers (caller holds the lock) ---
+    def _load(self, key):
+        entry = self._entries.get(key)
+        if entry is None and self._db is not None:
+            entry = self._db_get(key)
+            if entry is not None:
+                self._entries[key] = entry
+                self._evict()
+        return entry
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _db_get(self, key):
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT expires_at, value FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return (row[0], json.loads(row[1]))
+
+    def _drop(self, key):
+        self._entries.pop(key, None)
+        self._touched.pop(key, None)
+        if self._db is not None:
+            self._submit(self._db_write, "DELETE FROM search_cache WHERE key = ?", (key,))
+
+    # --- SQLite writes (writer thread only) ---
+    def _submit(self, write, *args):
+        self._writer.submit(self._logged, write, *args)
+
+    @staticmethod
+    def _logged(write, *args):
+        try:
+            write(*args)
+        except sqlite3.Error as e:
+            logger.error(f"[CACHE] SQLite write failed: {e}")  # the in-memory entry still serves
+
+    def _db_write(self, sql, params=()):
+        with self._db_lock:
+            self._db.execute(sql, params)
+            self._db.commit()
+
+    def _db_set(self, key, value, expires_at, now, touched):
+        with self._db_lock:
+            self._db.executemany("UPDATE search_cache SET last_used = ? WHERE key = ?",
+                                 [(used, k) for k, used in touched])
+            self._db.execute(
+                "INSERT OR REPLACE INTO search_cache (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, now),
+            )
+            # LRU bound on disk as well: keep only the most recently used rows
+            self._db.execute(
+                "DELETE FROM search_cache WHERE key NOT IN "
+                "(SELECT key FROM search_cache ORDER BY last_used DESC, rowid DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+            self._db.commit()
@@ -0,0 +1,130 @@
+import os
+import time
+import uuid
+import asyncio
+import logging
+import weakref
+import aiosqlite
+from langgraph.checkpoint.base import copy_checkpoint
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from src.graph import build_graph
+
+# --- PERSISTENT CHECKPOINTS (human-in-the-loop resume) ---
+# The API graph saves its state to SQLite after every step and pauses *before*
+# the human node. A decision then resumes the saved run instead of re-running
+# the whole negotiation from the Scout.
+
+CHECKPOINT_PATH = os.environ.get("CHECKPOINT_PATH", "checkpoints.db")
+# Only a paused or finished run is ever read back, so by default the state is
+# serialized once when the run stops instead of after every step. "async" or
+# "sync" saves every step again (LangGraph's durability modes).
+CHECKPOINT_DURABILITY = os.environ.get("CHECKPOINT_DURABILITY", "exit")
+
+# Runs whose newest checkpoint is older than this are deleted by the sweeper,
+# paused ones included: a decision that late is not coming (0 = keep forever).
+CHECKPOINT_RETENTION_S = float(os.environ.get("CHECKPOINT_RETENTION_S", "86400"))
+CHECKPOINT_SWEEP_INTERVAL_S = float(os.environ.get("CHECKPOINT_SWEEP_INTERVAL_S", "3600"))
+
+logger = logging.getLogger(__name__)
+
+# aiosqlite connections are bound to the event loop that opened them,
+# so keep one checkpointed graph per loop (uvicorn only ever has one).
+_graphs = weakref.WeakKeyDictionary()
+
+# The state's own types, registered so restoring them needs no unsafe-type fallback
+STATE_TYPES = [("src.state", "Proposal"), ("src.state", "Event")]
+
+
+def run_config(run_id: str):
+    return {"configurable": {"thread_id": run_id}}
+
+
+async def get_checkpointed_graph():
+    loop = asyncio.get_running_loop()
+    graph = _graphs.get(loop)
+    if graph is None:
+        saver = AsyncSqliteSaver(aiosqlite.connect(CHECKPOINT_PATH),
+                                 serde=JsonPlusSerializer(allowed_msgpack_modules=STATE_TYPES))
+        graph = build_graph(checkpointer=saver, interrupt_before=["human"])
+        _graphs[loop] = graph
+    return graph
+
+
+async def fork_run(graph, run_id: str, **values):
+    """
+    Copies a run's latest checkpoint to a new run_id, with `values` overriding
+    state keys. The copy resumes exactly where the original stopped (e.g.
+    paused before "human") but independently of it. Returns the new run_id.
+    """
+    saved = await graph.checkpointer.aget_tuple(run_config(run_id))
+    checkpoint = copy_checkpoint(saved.checkpoint)
+    checkpoint["channel_values"].update(values)
+    new_run_id = str(uuid.uuid4())
+    config = {"configurable": {"thread_id": new_run_id, "checkpoint_ns": ""}}
+    await graph.checkpointer.aput(config, checkpoint, saved.metadata, checkpoint["channel_versions"])
+    return new_run_id
+
+
+# --- RETENTION ---
+# LangGraph's checkpoint ids are time-ordered UUIDv6 strings (100 ns ticks since
+# 1582-10-15), so "older than T" is a plain string comparison against the
+# smallest id that could have been created at T.
+_UUID_EPOCH_TICKS = 0x01B21DD213814000
+
+
+def checkpoint_id_at(epoch: float):
+    ticks = f"{int(epoch * 10_000_000) + _UUID_EPOCH_TICKS:015x}"
+    return f"{ticks[:8]}-{ticks[8:12]}-6{ticks[12:]}-0000-000000000000"
+
+
+async def sweep_checkpoints(graph, retention: float = None, now: float = None):
+    """Deletes every run whose newest checkpoint is older than `retention` seconds. Returns how many."""
+    retention = CHECKPOINT_RETENTION_S if retention is None else retention
+    if retention <= 0:
+        return 0
+    saver = graph.checkpointer
+    await saver.setup()
+    cutoff = checkpoint_id_at((time.time() if now is None else now) - retention)
+    async with saver.conn.execute(
+        "SELECT thread_id FROM checkpoints GROUP BY thread_id HAVING MAX(checkpoint_id) < ?", (cutoff,)
+    ) as cursor:
+        expired = [row[0] for row in await cursor.fetchall()]
+    for run_id in expired:
+        await saver.adelete_thread(run_id)
+    if expired:
+        logger.info(f"[CHECKPOINT] Deleted {len(expired)} runs older than {retention:.0f}s.")
+    return len(expired)
+
+
+class CheckpointSweeper:
+    """Runs sweep_checkpoints() every CHECKPOINT_SWEEP_INTERVAL_S (started from the API lifespan)."""
+
+    def __init__(self, interval: float = None):
+        self.interval = CHECKPOINT_SWEEP_INTERVAL_S if interval is None else interval
+        self._task = None
+
+    def start(self):
+        if self._task is None and CHECKPOINT_RETENTION_S > 0:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                await sweep_checkpoints(await get_checkpointed_graph())
+            except Exception as e:
+                logger.error(f"[CHECKPOINT] Sweep failed: {e}")
+            await asyncio.sleep(self.interval)
+
+
+async def close_checkpointed_graph():
+    """Closes this loop's SQLite connection (its worker thread would otherwise block exit)."""
+    graph = _graphs.pop(asyncio.get_running_loop(), None)
+    if graph is not None:
+        await graph.checkpointer.conn.close()
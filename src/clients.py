@@ -0,0 +1,316 @@
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+import weakref
+from collections import deque
+import httpx
+from src import metrics
+
+# --- RESILIENT PROVIDER CLIENTS ---
+# Every live Groq/Tavily call goes through Resilient, which adds:
+#   * a per-call timeout (async calls are cancelled; sync calls rely on the
+#     HTTP client's own timeout)
+#   * retries with jittered exponential backoff for timeouts, connection
+#     errors, 429 and 5xx
+#   * optional hedging: when an async call is slower than the recent
+#     HEDGE_PERCENTILE latency, a duplicate is sent and the first answer wins
+#   * a circuit breaker that fails fast while a provider keeps failing
+# The HTTP connections themselves come from shared, bounded httpx pools.
+
+logger = logging.getLogger(__name__)
+
+LLM_TIMEOUT_S = float(os.environ.get("LLM_TIMEOUT_S", "30"))
+SEARCH_TIMEOUT_S = float(os.environ.get("SEARCH_TIMEOUT_S", "10"))
+PROVIDER_RETRIES = int(os.environ.get("PROVIDER_RETRIES", "2"))  # extra attempts after the first
+RETRY_BASE_MS = float(os.environ.get("PROVIDER_RETRY_BASE_MS", "200"))
+RETRY_MAX_MS = float(os.environ.get("PROVIDER_RETRY_MAX_MS", "2000"))
+# Hedge after this percentile of recent latency (0 = never). Hedged LLM calls cost tokens twice.
+LLM_HEDGE_PERCENTILE = float(os.environ.get("LLM_HEDGE_PERCENTILE", "0"))
+SEARCH_HEDGE_PERCENTILE = float(os.environ.get("SEARCH_HEDGE_PERCENTILE", "0"))
+HEDGE_MIN_SAMPLES = int(os.environ.get("HEDGE_MIN_SAMPLES", "20"))
+BREAKER_FAILURES = int(os.environ.get("BREAKER_FAILURES", "5"))  # consecutive failed attempts
+BREAKER_RESET_S = float(os.environ.get("BREAKER_RESET_S", "30"))
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.environ.get("HTTP_MAX_KEEPALIVE", "10"))
+TAVILY_API_URL = os.environ.get("TAVILY_API_URL", "https://api.tavily.com")
+
+
+class CircuitOpen(Exception):
+    """The provider's circuit breaker is open; the call was not attempted."""
+
+
+def retryable(exc: BaseException):
+    """Timeouts, connection problems, 429 and 5xx are worth another attempt; other errors are not."""
+    if isinstance(exc, CircuitOpen):
+        return False
+    status = getattr(exc, "status_code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    if status:
+        return status == 429 or status >= 500
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, ConnectionError, httpx.TransportError)):
+        return True
+    # Groq SDK: APIConnectionError / APITimeoutError carry no status code
+    return type(exc).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+def backoff(attempt: int, base_ms: float = None, max_ms: float = None):
+    """Full-jitter exponential backoff, in seconds."""
+    base_ms = RETRY_BASE_MS if base_ms is None else base_ms
+    max_ms = RETRY_MAX_MS if max_ms is None else max_ms
+    return random.uniform(0, min(max_ms, base_ms * 2 ** attempt)) / 1000
+
+
+# --- CIRCUIT BREAKER ---
+class CircuitBreaker:
+    """
+    closed -> open after `failures` consecutive failed attempts; open fails fast
+    for `reset_after` seconds, then lets one trial call through (half-open).
+    """
+
+    def __init__(self, name: str, failures: int = None, reset_after: float = None, clock=time.monotonic):
+        self.name = name
+        self.failures = BREAKER_FAILURES if failures is None else failures
+        self.reset_after = BREAKER_RESET_S if reset_after is None else reset_after
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._consecutive = 0
+        self._opened_at = None
+        self._trial = False
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return "closed"
+        return "half_open" if self.clock() - self._opened_at >= self.reset_after else "open"
+
+    def check(self):
+        """Raises CircuitOpen unless a call may go ahead. Returns True for the half-open trial call."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return False
+            if state == "half_open" and not self._trial:
+                self._trial = True  # one trial call; everyone else keeps failing fast
+                return True
+        metrics.PROVIDER_SHORT_CIRCUITS.inc(provider=self.name)
+        raise CircuitOpen(f"{self.name} circuit open after {self._consecutive} consecutive failures")
+
+    def success(self):
+        with self._lock:
+            self._consecutive = 0
+            self._opened_at = None
+            self._trial = False
+
+    def failure(self):
+        with self._lock:
+            self._consecutive += 1
+            if self._trial or self._consecutive >= self.failures:
+                if self._opened_at is None or self._trial:
+                    logger.warning(f"[PROVIDER] {self.name} circuit opened ({self._consecutive} failures in a row)")
+                self._opened_at = self.clock()
+                self._trial = False
+
+    def release(self):
+        """The trial ended without a verdict (cancelled): the next call may try again."""
+        with self._lock:
+            self._trial = False
+
+
+class LatencyWindow:
+    """Recent successful call latencies, for the hedging threshold."""
+
+    def __init__(self, size: int = 200, min_samples: int = None):
+        self.min_samples = HEDGE_MIN_SAMPLES if min_samples is None else min_samples
+        self._samples = deque(maxlen=size)
+
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, p: float):
+        """None until min_samples calls have been seen."""
+        if len(self._samples) < max(self.min_samples, 1):
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(int(len(ordered) * p / 100), len(ordered) - 1)]
+
+
+# --- RESILIENT WRAPPER ---
+class Resilient:
+    """Wraps anything with invoke/ainvoke (a chat model, a search tool) with the policies above."""
+
+    def __init__(self, inner, name: str, timeout: float, retries: int = None, hedge_percentile: float = 0,
+                 breaker: CircuitBreaker = None, window: LatencyWindow = None):
+        self.inner = inner
+        self.name = name
+        self.timeout = timeout
+        self.retries = PROVIDER_RETRIES if retries is None else retries
+        self.hedge_percentile = hedge_percentile
+        self.breaker = breaker or CircuitBreaker(name)
+        self.window = window or LatencyWindow()
+
+    def __getattr__(self, attr):
+        return getattr(self.inner, attr)
+
+    def _failed(self, exc, attempt):
+        """Records a failed attempt. Returns the backoff before the next one, or re-raises."""
+        metrics.PROVIDER_ERRORS.inc(provider=self.name, kind=type(exc).__name__)
+        if not retryable(exc):
+            self.breaker.success()  # e.g. a 400: the provider is up, the request is wrong
+            raise exc
+        self.breaker.failure()
+        if attempt >= self.retries:
+            raise exc
+        delay = backoff(attempt)
+        metrics.PROVIDER_RETRIES.inc(provider=self.name)
+        logger.warning(f"[PROVIDER] {self.name} attempt {attempt + 1} failed ({exc!r}); retrying in {delay * 1000:.0f} ms")
+        return delay
+
+    def _succeeded(self, start):
+        self.breaker.success()
+        self.window.add(time.perf_counter() - start)
+
+    def invoke(self, payload, **kwargs):
+        for attempt in range(self.retries + 1):
+            trial = self.breaker.check()
+            start = time.perf_counter()
+            try:
+                result = self.inner.invoke(payload, **kwargs)
+            except Exception as e:
+                delay = self._failed(e, attempt)
+            else:
+                self._succeeded(start)
+                return result
+            finally:
+                if trial:
+                    self.breaker.release()  # no-op unless the attempt was interrupted
+            time.sleep(delay)
+
+    async def ainvoke(self, payload, **kwargs):
+        for attempt in range(self.retries + 1):
+            trial = self.breaker.check()
+            start = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(self._hedged(payload, kwargs), timeout=self.timeout)
+            except Exception as e:
+                delay = self._failed(e, attempt)
+            else:
+                self._succeeded(start)
+                return result
+            finally:
+                # A cancelled trial (e.g. by the run's deadline) never reaches success()
+                # or failure(); without this the breaker would stay half-open for good
+                if trial:
+                    self.breaker.release()
+            await asyncio.sleep(delay)
+
+    async def _hedged(self, payload, kwargs):
+        hedge_after = self.window.percentile(self.hedge_percentile) if self.hedge_percentile else None
+        if hedge_after is None:
+            return await self.inner.ainvoke(payload, **kwargs)
+
+        tasks = [asyncio.ensure_future(self.inner.ainvoke(payload, **kwargs))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if not done:
+                metrics.PROVIDER_HEDGES.inc(provider=self.name)
+                tasks.append(asyncio.ensure_future(self.inner.ainvoke(payload, **kwargs)))
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            raise tasks[0].exception()  # every copy failed
+        finally:
+            for task in tasks:
+                task.cancel()  # the slower copy (no-op for finished ones)
+
+
+# --- POOLED HTTP ---
+_http_lock = threading.Lock()
+_http_client = None
+# httpx async pools belong to the event loop that opened them (like aiosqlite in src/checkpoint.py)
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _limits():
+    return httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_KEEPALIVE)
+
+
+def http_client():
+    """The process-wide pooled sync client."""
+    global _http_client
+    if _http_client is None:
+        with _http_lock:
+            if _http_client is None:
+                _http_client = httpx.Client(limits=_limits(), timeout=SEARCH_TIMEOUT_S)
+    return _http_client
+
+
+def async_http_client():
+    """This event loop's pooled async client."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = httpx.AsyncClient(limits=_limits(), timeout=SEARCH_TIMEOUT_S)
+    return client
+
+
+class PerLoop:
+    """
+    A client whose async side needs this loop's pool (e.g. ChatGroq): invoke()
+    uses one shared instance, ainvoke() an instance built per event loop.
+    build(async_client) makes an instance; it is called with None for the sync one.
+    """
+
+    def __init__(self, build):
+        self.build = build
+        self._sync = build(None)
+        self._per_loop = weakref.WeakKeyDictionary()
+
+    def __getattr__(self, attr):
+        return getattr(self._sync, attr)
+
+    def invoke(self, payload, **kwargs):
+        return self._sync.invoke(payload, **kwargs)
+
+    async def ainvoke(self, payload, **kwargs):
+        loop = asyncio.get_running_loop()
+        inner = self._per_loop.get(loop)
+        if inner is None:
+            inner = self._per_loop[loop] = self.build(async_http_client())
+        return await inner.ainvoke(payload, **kwargs)
+
+
+# --- TAVILY ---
+class TavilySearch:
+    """
+    Tavily /search on the pooled clients. Same input and output as langchain's
+    TavilySearchResults ({"query": ...} -> [{title, url, content, score}]), but
+    errors are raised instead of being returned as a string.
+    """
+
+    def __init__(self, api_key: str = None, max_results: int = 3, base_url: str = None, timeout: float = None):
+        self.api_key = api_key if api_key is not None else os.environ.get("TAVILY_API_KEY", "")
+        self.max_results = max_results
+        self.base_url = (base_url or TAVILY_API_URL).rstrip("/")
+        self.timeout = SEARCH_TIMEOUT_S if timeout is None else timeout
+
+    def _params(self, payload):
+        query = payload["query"] if isinstance(payload, dict) else str(payload)
+        return {"api_key": self.api_key, "query": query, "max_results": self.max_results, "search_depth": "advanced"}
+
+    @staticmethod
+    def _clean(response):
+        response.raise_for_status()
+        return [{"title": r.get("title", ""), "url": r.get("url", ""), "content": r.get("content", ""),
+                 "score": r.get("score")} for r in response.json().get("results", [])]
+
+    def invoke(self, payload, **kwargs):
+        return self._clean(http_client().post(f"{self.base_url}/search", json=self._params(payload), timeout=self.timeout))
+
+    async def ainvoke(self, payload, **kwargs):
+        response = await async_http_client().post(f"{self.base_url}/search", json=self._params(payload), timeout=self.timeout)
+        return self._clean(response)
@@ -0,0 +1,68 @@
+import os
+import asyncio
+
+# --- SINGLE-FLIGHT COALESCING ---
+# When several identical trip requests arrive while one is still negotiating,
+# only the first runs the graph; the rest wait for its result. The negotiation
+# runs in its own task, so a caller that disconnects does not cancel it for the
+# others.
+
+COALESCE_REQUESTS = os.environ.get("COALESCE_REQUESTS", "1") == "1"
+# Budgets are rounded down to this step before matching (0 = exact budget).
+# With a step of 100, a $2050 request joins a running $2000 negotiation, but
+# only keeps its result if it was approved (a stall or timeout at $2000 says
+# nothing about $2050). A $2000 request never joins a $2050 one: that plan
+# may cost more than it has.
+COALESCE_BUDGET_BUCKET = int(os.environ.get("COALESCE_BUDGET_BUCKET", "0"))
+
+
+def trip_key(destination: str, total_budget: int, days: int, budget_bucket: int = None,
+             deadline_seconds: float = None):
+    """
+    Requests with equal keys may share a negotiation, if the running one's exact
+    budget is no larger than theirs (SingleFlight.do's `budget`).
+    """
+    if budget_bucket is None:
+        budget_bucket = COALESCE_BUDGET_BUCKET
+    if budget_bucket > 0:
+        total_budget = total_budget // budget_bucket * budget_bucket
+    # Same normalization as the search cache (make_key) and the plan cache (plan_key)
+    return (" ".join(destination.lower().split()), total_budget, days, deadline_seconds)
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight = {}  # key -> {budget: asyncio.Task}
+
+    def __len__(self):
+        return sum(len(runs) for runs in self._inflight.values())
+
+    async def do(self, key, fn, budget: int = 0, reusable=None):
+        """
+        Runs fn() unless a call with the same key and a budget no larger than
+        `budget` is already in flight (the closest one is joined). A result from
+        a smaller budget is only reused if reusable(result) says so; otherwise
+        this caller runs fn() itself once the joined call is done.
+        Returns (result, shared): shared is True when another caller's run was reused.
+        """
+        runs = self._inflight.setdefault(key, {})
+        joinable = [b for b in runs if b <= budget]
+        if not joinable:
+            task = runs[budget] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda done: self._forget(key, budget, done))
+            return await asyncio.shield(task), False
+
+        joined = max(joinable)
+        result = await asyncio.shield(runs[joined])
+        if joined < budget and reusable is not None and not reusable(result):
+            return await fn(), False
+        return result, True
+
+    def _forget(self, key, budget, task):
+        runs = self._inflight.get(key, {})
+        if runs.get(budget) is task:
+            del runs[budget]
+            if not runs:
+                del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # every waiter may be gone; don't warn about an unretrieved error
@@ -0,0 +1,70 @@
+import math
+from typing import NamedTuple, Optional, Tuple
+from src import geo
+from src.tools import DAILY_FOOD_COST, check_distance
+
+# --- CONSTRAINT ENVELOPE ---
+# The Budget Officer and the Planner only ever check two things: the total cost
+# (calculate_total) and the travel time (check_distance). Both limits are known
+# as soon as the request arrives, so the Scout works them out up front, puts
+# them into the search query and the extraction prompt, and drops hotels that
+# would be rejected anyway before proposing anything. Travel time is measured
+# the way the Planner measures it: geo distances in known cities, the location
+# label elsewhere.
+
+# Planner's limit on travel time from the hotel to the City Center
+MAX_TRAVEL_MINUTES = 30
+
+# The locations the extraction prompt lets the LLM choose from
+LOCATIONS = ("City Center", "Suburbs")
+
+# Search queries round the price ceiling up to this step, so nearby budgets
+# share one search-cache entry (the exact ceiling is still enforced locally).
+QUERY_PRICE_STEP = 50
+
+
+class Envelope(NamedTuple):
+    max_nightly: int                # highest nightly price calculate_total still accepts
+    locations: Tuple[str, ...]      # locations check_distance keeps within MAX_TRAVEL_MINUTES
+    destination: Optional[str] = None  # for geo distances (src/geo.py); None = label only
+
+    @property
+    def feasible(self):
+        return self.max_nightly > 0
+
+    @property
+    def query_ceiling(self):
+        return math.ceil(self.max_nightly / QUERY_PRICE_STEP) * QUERY_PRICE_STEP
+
+    def allows(self, candidate: dict):
+        """Would this hotel pass both the Budget Officer and the Planner?"""
+        return bool(self.filter([candidate]))
+
+    def filter(self, candidates: list):
+        """The candidates that pass both checks, in order (one batch distance lookup)."""
+        affordable = [c for c in candidates if c["price"] <= self.max_nightly]
+        if not self.destination:
+            return [c for c in affordable if check_distance.func(c["location"]) <= MAX_TRAVEL_MINUTES]
+        measured = geo.annotate(affordable, self.destination)
+        return [c for c, m in zip(affordable, measured) if m["travel_minutes"] <= MAX_TRAVEL_MINUTES]
+
+    def describe(self):
+        return f"at most ${self.max_nightly} per night, located in: {', '.join(self.locations)}"
+
+
+def envelope(total_budget: int, days: int, daily_food_cost: int = DAILY_FOOD_COST, destination: str = None):
+    """(hotel_price + daily_food_cost) * days <= total_budget, solved for hotel_price."""
+    days = max(days, 1)
+    max_nightly = (total_budget - daily_food_cost * days) // days
+    locations = tuple(l for l in LOCATIONS if check_distance.func(l) <= MAX_TRAVEL_MINUTES)
+    return Envelope(max_nightly, locations, destination)
+
+
+def infeasible_reason(total_budget: int, days: int, daily_food_cost: int = DAILY_FOOD_COST):
+    """Why envelope() is infeasible: food alone is over budget, or what is left can't buy one night."""
+    food = daily_food_cost * max(days, 1)
+    if total_budget < food:
+        return f"Budget ${total_budget} cannot cover food for {days} days (${food}), let alone a hotel."
+    left = total_budget - food
+    return (f"Budget ${total_budget} covers food for {days} days (${food}) but leaves "
+            f"{f'only ${left}' if left else 'nothing'} for {days} hotel nights.")
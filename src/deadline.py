@@ -0,0 +1,109 @@
+import os
+import time
+import asyncio
+import functools
+import logging
+from src.constraints import envelope, MAX_TRAVEL_MINUTES
+from src.tools import calculate_total
+from src.state import Proposal, proposals
+
+# --- PER-REQUEST DEADLINE ---
+# retry_count only bounds how many passes a negotiation makes, not how long a
+# slow Groq/Tavily call can take. A run carries an absolute deadline in its
+# state (wall clock, so it survives a checkpoint). Every node and the router
+# checks it; the async nodes are also cancelled mid-call when it passes. A
+# run out of time ends with the best valid hotel it has already seen.
+
+logger = logging.getLogger(__name__)
+
+# Default budget for API runs, in seconds (0 = no deadline)
+NEGOTIATION_DEADLINE_SECONDS = float(os.environ.get("NEGOTIATION_DEADLINE_SECONDS", "30"))
+
+PARTIAL = "PARTIAL"      # out of time, returning the best valid hotel seen
+TIMED_OUT = "TIMED_OUT"  # out of time, and nothing seen fits
+
+
+def deadline_at(seconds: float = None):
+    """Absolute deadline (epoch seconds) for a run starting now; None for no deadline."""
+    if seconds is None:
+        seconds = NEGOTIATION_DEADLINE_SECONDS
+    return time.time() + seconds if seconds > 0 else None
+
+
+def remaining(state):
+    """Seconds left for this run (may be negative); None when it has no deadline."""
+    deadline = state.get("deadline")
+    return None if deadline is None else deadline - time.time()
+
+
+def expired(state):
+    left = remaining(state)
+    return left is not None and left <= 0
+
+
+def _valid(hotel: dict, env):
+    if hotel.get("price", 0) <= 0 or hotel["price"] > env.max_nightly:
+        return False
+    if "travel_minutes" in hotel:  # the Planner already measured it (src/geo.py)
+        return hotel["travel_minutes"] <= MAX_TRAVEL_MINUTES
+    return env.allows(hotel)
+
+
+def best_so_far(state):
+    """
+    The valid hotel (within budget, acceptable location) that uses the most of
+    the budget, among the current proposal and the unused candidates. Hotels the
+    agents rejected are never valid, so nothing earlier needs remembering.
+    """
+    env = envelope(state["total_budget"], state["days"], destination=state.get("destination"))
+    seen = [state.get("current_proposal")] + (state.get("candidates") or [])
+    valid = [h for h in seen if h and _valid(h, env)]
+    return max(valid, key=lambda h: h["price"], default=None)
+
+
+def deadline_result(state):
+    """Ends the run: PARTIAL with the best valid hotel, or TIMED_OUT without one."""
+    best = best_so_far(state)
+    if best is None:
+        logger.warning("[DEADLINE] Out of time and no valid hotel found.")
+        return {
+            "plan_status": TIMED_OUT,
+            "rejection_reason": "Deadline passed before any hotel fit the budget and location.",
+            "messages": ["Deadline: Out of time, no valid hotel found."],
+        }
+    best = Proposal.of(best).with_(total_cost=calculate_total.func(best["price"], state["days"]))
+    logger.warning(f"[DEADLINE] Out of time. Returning best so far: {best['name']} (${best['price']})")
+    return {
+        "plan_status": PARTIAL,
+        "current_proposal": best,
+        "candidates": proposals(h for h in state.get("candidates") or [] if h.get("name") != best.name),
+        "rejection_reason": None,
+        "messages": [f"Deadline: Out of time. Best so far: {best['name']}."],
+    }
+
+
+# --- NODE WRAPPERS (src/graph.py) ---
+def guarded_node(func):
+    """Skips the node once the deadline has passed."""
+    @functools.wraps(func)
+    def wrapper(state):
+        if expired(state):
+            return deadline_result(state)
+        return func(state)
+    return wrapper
+
+
+def aguarded_node(afunc):
+    """Like guarded_node, and cancels the node (and its provider calls) when time runs out mid-call."""
+    @functools.wraps(afunc)
+    async def wrapper(state):
+        left = remaining(state)
+        if left is None:
+            return await afunc(state)
+        if left <= 0:
+            return deadline_result(state)
+        try:
+            return await asyncio.wait_for(afunc(state), timeout=left)
+        except asyncio.TimeoutError:
+            return deadline_result(state)
+    return wrapper
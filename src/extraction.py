@@ -0,0 +1,115 @@
+import os
+import re
+import json
+
+# --- LOCAL EXTRACTION (LLM fast path) ---
+# Most search results already say "<hotel> ... $<price> per night ... <area>".
+# Parsing that locally is cheaper than a Groq round trip with the whole payload
+# as input tokens, so the Scout only asks the LLM when this parser is not
+# confident about what it read.
+
+# Share of search results that must yield a complete {name, price, location}
+EXTRACTION_CONFIDENCE = float(os.environ.get("EXTRACTION_CONFIDENCE", "0.6"))
+
+PRICE_PATTERN = re.compile(
+    r"(?:US\$|\$|USD\s?)(?P<amount>\d{1,3}(?:,\d{3})*|\d+)(?:\.\d{1,2})?"
+    r"|(?P<amount_after>\d{1,3}(?:,\d{3})*|\d+)(?:\.\d{1,2})?\s?(?:USD|dollars)\b",
+    re.IGNORECASE,
+)
+NIGHT_PATTERN = re.compile(r"\s*(?:/|per|a|each)?\s*night", re.IGNORECASE)
+
+HOTEL_WORDS = r"(?:Hotel|Inn|Hostel|Suites|Resort|Lodge|Motel|Palace|Residence|Apartments|B&B)"
+NAME_PATTERN = re.compile(
+    rf"\b((?:[A-Z][\w'&.-]*\s){{0,4}}{HOTEL_WORDS}(?:\s(?:de|du|of|la|le|[A-Z][\w'&.-]*)){{0,3}})"
+)
+# Titles of list pages and booking sites, not of one hotel
+LISTING_MARKERS = ("best", "top ", "cheap", "hotels in", "deals", "booking", "tripadvisor", "expedia")
+TITLE_SEPARATORS = re.compile(r"\s+[-|–—:]\s+")
+
+CENTER_KEYWORDS = ("city center", "city centre", "downtown", "old town", "town center", "central location")
+SUBURB_KEYWORDS = ("suburb", "outskirts", "near the airport", "airport hotel", "outside the city")
+
+
+# --- JSON OBJECTS IN LLM OUTPUT ---
+_decoder = json.JSONDecoder()
+_OPENERS = re.compile(r"[\[{]")
+
+
+def json_objects(text: str):
+    """
+    Every JSON object in free text, in order. Arrays are flattened and nested
+    braces are handled (unlike a non-greedy regex); malformed fragments are skipped.
+    """
+    objects = []
+    position = 0
+    while True:
+        opener = _OPENERS.search(text, position)
+        if opener is None:
+            return objects
+        try:
+            value, position = _decoder.raw_decode(text, opener.start())
+        except ValueError:
+            position = opener.start() + 1
+            continue
+        if isinstance(value, dict):
+            objects.append(value)
+        elif isinstance(value, list):
+            objects.extend(item for item in value if isinstance(item, dict))
+
+
+# --- FIELD PARSERS ---
+def parse_price(text: str):
+    """The nightly USD price in text; None when missing or ambiguous."""
+    prices = []
+    nightly = []
+    for match in PRICE_PATTERN.finditer(text):
+        amount = int((match.group("amount") or match.group("amount_after")).replace(",", ""))
+        prices.append(amount)
+        if NIGHT_PATTERN.match(text, match.end()):
+            nightly.append(amount)
+    if nightly:
+        return nightly[0]
+    return prices[0] if len(prices) == 1 else None
+
+
+def parse_name(title: str, content: str):
+    """Hotel name from the result title, else from a 'Something Hotel' phrase in the text."""
+    title = (title or "").strip()
+    if title and not any(marker in title.lower() for marker in LISTING_MARKERS):
+        name = TITLE_SEPARATORS.split(title)[0].strip()
+        if name:
+            return name
+    match = NAME_PATTERN.search(content or "")
+    return match.group(1).strip() if match else None
+
+
+def parse_location(text: str):
+    text = text.lower()
+    center = any(keyword in text for keyword in CENTER_KEYWORDS)
+    suburb = any(keyword in text for keyword in SUBURB_KEYWORDS)
+    if center == suburb:
+        return None  # neither, or contradictory
+    return "City Center" if center else "Suburbs"
+
+
+def parse_result(result: dict):
+    """{name, price, location} for one search result, or None if any field is missing."""
+    content = str(result.get("content", ""))
+    name = parse_name(result.get("title"), content)
+    price = parse_price(content)
+    location = parse_location(content)
+    if name and price and location:
+        return {"name": name, "price": price, "location": location}
+    return None
+
+
+def extract_local(search_results):
+    """
+    Returns (candidates, confidence). Confidence is the share of results that
+    parsed completely; anything that is not a list of result dicts scores 0.
+    """
+    if not isinstance(search_results, list) or not search_results:
+        return [], 0.0
+    parsed = [parse_result(r) for r in search_results if isinstance(r, dict)]
+    candidates = [c for c in parsed if c]
+    return candidates, len(candidates) / len(search_results)
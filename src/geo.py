@@ -0,0 +1,203 @@
+import os
+import json
+import zlib
+import math
+import threading
+import numpy as np
+
+# --- OFFLINE GEOSPATIAL ENGINE ---
+# Travel times from real coordinates instead of string matching. Cities, their
+# points of interest and well-known neighborhoods come from a bundled dataset
+# (src/data/cities.json), held in a geohash grid index. Hotels are placed by a
+# neighborhood named in their location/name, or else by their location label.
+# Distances from many hotels to many points are one vectorized numpy call.
+#
+# For cities outside the dataset the old rules still hold:
+#   City Center -> 5 min, Suburbs -> 45 min, anything else -> 20 min.
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "data", "cities.json")
+
+EARTH_RADIUS_KM = 6371.0
+URBAN_SPEED_KMH = 24.0  # door-to-door average across walking, transit and taxis
+TRIP_OVERHEAD_MIN = 5.0
+
+# Where a bare location label puts a hotel (km from the city center)
+LABEL_DISTANCE_KM = {"Suburbs": 16.0, "City Center": 0.0}
+DEFAULT_DISTANCE_KM = 6.0
+
+# Points of interest within this radius of the center count for ranking
+POI_RADIUS_KM = 25.0
+
+GEOHASH_PRECISION = 4  # cells of roughly 39 x 20 km
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+# --- GEOHASH GRID INDEX ---
+def geohash(lat: float, lon: float, precision: int = GEOHASH_PRECISION):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    code, bits, value, even = [], 0, 0, True
+    while len(code) < precision:
+        rng, coord = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        value = value * 2 + (coord >= mid)
+        rng[0 if coord >= mid else 1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            code.append(_BASE32[value])
+            bits, value = 0, 0
+    return "".join(code)
+
+
+class GeoIndex:
+    """Named points bucketed by geohash cell; radius queries scan only nearby cells."""
+
+    def __init__(self, precision: int = GEOHASH_PRECISION):
+        self.precision = precision
+        lon_bits = math.ceil(precision * 5 / 2)
+        lat_bits = precision * 5 // 2
+        self.cell_lat = 180.0 / 2 ** lat_bits
+        self.cell_lon = 360.0 / 2 ** lon_bits
+        self._cells = {}
+
+    def add(self, lat: float, lon: float, item):
+        self._cells.setdefault(geohash(lat, lon, self.precision), []).append((lat, lon, item))
+
+    def near(self, lat: float, lon: float, radius_km: float):
+        """Items within radius_km, nearest first, as (distance_km, item)."""
+        dlat = radius_km / 111.0
+        dlon = radius_km / (111.0 * max(math.cos(math.radians(lat)), 0.01))
+        cells = {
+            geohash(lat + i * self.cell_lat, lon + j * self.cell_lon, self.precision)
+            for i in range(-math.ceil(dlat / self.cell_lat), math.ceil(dlat / self.cell_lat) + 1)
+            for j in range(-math.ceil(dlon / self.cell_lon), math.ceil(dlon / self.cell_lon) + 1)
+        }
+        entries = [entry for cell in cells for entry in self._cells.get(cell, [])]
+        if not entries:
+            return []
+        km = haversine_km(np.array([[lat, lon]]), np.array([e[:2] for e in entries]))[0]
+        order = np.argsort(km)
+        return [(float(km[i]), entries[i][2]) for i in order if km[i] <= radius_km]
+
+
+# --- DATASET ---
+_dataset = None
+_lock = threading.Lock()
+
+
+def _load():
+    global _dataset
+    if _dataset is None:
+        with _lock:
+            if _dataset is None:
+                with open(DATA_PATH) as f:
+                    cities = json.load(f)
+                index = GeoIndex()
+                for key, city in cities.items():
+                    for name, (lat, lon) in city["points_of_interest"].items():
+                        index.add(lat, lon, {"name": name, "city": key, "lat": lat, "lon": lon})
+                _dataset = (cities, index)
+    return _dataset
+
+
+def city(destination: str):
+    """Dataset entry for 'Paris', ' paris ', 'Paris, France'...; None for unknown cities."""
+    cities, _ = _load()
+    return cities.get(" ".join(destination.split(",")[0].lower().split()))
+
+
+def interest_points(destination: str):
+    """Points of interest around the destination's center, nearest first (via the index)."""
+    entry = city(destination)
+    if entry is None:
+        return []
+    _, index = _load()
+    return [item for _, item in index.near(*entry["center"], POI_RADIUS_KM)]
+
+
+# --- DISTANCES ---
+def haversine_km(origins, targets):
+    """(N, 2) and (M, 2) arrays of [lat, lon] degrees -> (N, M) great-circle km."""
+    a = np.radians(np.asarray(origins, dtype=float))[:, None, :]
+    b = np.radians(np.asarray(targets, dtype=float))[None, :, :]
+    dlat, dlon = b[..., 0] - a[..., 0], b[..., 1] - a[..., 1]
+    h = np.sin(dlat / 2) ** 2 + np.cos(a[..., 0]) * np.cos(b[..., 0]) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(h, 1.0)))
+
+
+def travel_minutes(km):
+    return TRIP_OVERHEAD_MIN + np.asarray(km) * 60.0 / URBAN_SPEED_KMH
+
+
+def _label_km(location: str):
+    for label, km in LABEL_DISTANCE_KM.items():
+        if label in location:
+            return km
+    return DEFAULT_DISTANCE_KM
+
+
+def label_minutes(location: str):
+    """Travel time implied by the location label alone (unknown cities)."""
+    return int(travel_minutes(_label_km(location)))
+
+
+def _offset(center, km: float, seed: str):
+    """A point km from center, in a direction fixed by seed (so results are repeatable)."""
+    bearing = math.radians(zlib.crc32(seed.encode()) % 360)
+    lat = center[0] + km / 111.0 * math.cos(bearing)
+    lon = center[1] + km / (111.0 * math.cos(math.radians(center[0]))) * math.sin(bearing)
+    return [lat, lon]
+
+
+def locate(candidate: dict, entry: dict):
+    """[lat, lon] for a hotel in a known city."""
+    if "lat" in candidate and "lon" in candidate:
+        return [candidate["lat"], candidate["lon"]]
+    text = f"{candidate.get('location', '')} {candidate.get('name', '')}".lower()
+    for name, point in entry["neighborhoods"].items():
+        if name.lower() in text:
+            return list(point)
+    location = str(candidate.get("location", ""))
+    return _offset(entry["center"], _label_km(location), str(candidate.get("name", location)))
+
+
+def minutes_between(location: str, interest_point: str = "City Center", destination: str = None):
+    """check_distance's answer: minutes from a hotel location to a point in the destination."""
+    entry = city(destination) if destination else None
+    if entry is None:
+        return label_minutes(location)
+    places = {**entry["points_of_interest"], **entry["neighborhoods"]}
+    target = places.get(interest_point, entry["center"])
+    km = haversine_km([locate({"location": location}, entry)], [target])[0, 0]
+    return int(round(float(travel_minutes(km))))
+
+
+def annotate(candidates: list, destination: str):
+    """
+    Copies of the candidates with "travel_minutes" (to the center) and, in known
+    cities, "sightseeing_minutes" (mean to the points of interest). One batch call.
+    """
+    if not candidates:
+        return []
+    entry = city(destination)
+    if entry is None:
+        return [{**c, "travel_minutes": label_minutes(str(c.get("location", "")))} for c in candidates]
+
+    targets = [entry["center"]] + [[p["lat"], p["lon"]] for p in interest_points(destination)]
+    minutes = travel_minutes(haversine_km([locate(c, entry) for c in candidates], targets))
+    annotated = []
+    for c, row in zip(candidates, minutes):
+        extra = {"travel_minutes": int(round(row[0]))}
+        if len(row) > 1:
+            extra["sightseeing_minutes"] = int(round(row[1:].mean()))
+        annotated.append({**c, **extra})
+    return annotated
+
+
+def rank(annotated: list, max_minutes: float):
+    """Acceptable hotels first, then closest to the sights, then cheapest."""
+    return sorted(annotated, key=lambda c: (
+        c["travel_minutes"] > max_minutes,
+        c.get("sightseeing_minutes", c["travel_minutes"]),
+        c.get("price", 0),
+    ))
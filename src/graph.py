@@ -1,12 +1,31 @@
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
-from src.state import AgentState
-from src.agents import scout_agent, budget_agent, planner_agent, human_review_node
+from src.state import AgentState, node_event
+from src.metrics import timed_node, atimed_node
+from src.tracing import traced_node, atraced_node, event
+from src.deadline import guarded_node, aguarded_node, deadline_result, expired, PARTIAL, TIMED_OUT
+from src.agents import (
+    scout_agent, budget_agent, planner_agent, human_review_node,
+    ascout_agent, abudget_agent, aplanner_agent,
+)
 
 # --- ROUTER LOGIC ---
 def decide_next_step(state: AgentState):
+    decision = _route(state)
+    event("router", status=state["plan_status"], retry_count=state.get("retry_count", 0),
+          rejection_reason=state.get("rejection_reason"), decision=decision)
+    return decision
+
+def _route(state: AgentState):
     status = state["plan_status"]
     retry_count = state.get("retry_count", 0)
 
+    # A node already ran out of time (src/deadline.py)
+    if status in (PARTIAL, TIMED_OUT):
+        return "out_of_time"
+    if status != "APPROVED" and expired(state):
+        return "deadline"
+
     if status == "REJECTED":
         # CHANGE: If retries > 2, ask Human instead of quitting
         if retry_count > 2:
@@ -23,21 +42,69 @@ def decide_next_step(state: AgentState):
 
     return "failed"
 
+def after_scout(state: AgentState):
+    # The Scout stops a run whose budget can't cover food before any search (src/constraints.py)
+    if state["plan_status"] == "INFEASIBLE":
+        decision = "infeasible"
+    elif state["plan_status"] in (PARTIAL, TIMED_OUT):
+        decision = "out_of_time"
+    else:
+        decision = "budget"
+    event("router", status=state["plan_status"], decision=decision)
+    return decision
+
 # --- GRAPH CONSTRUCTION ---
 
 workflow = StateGraph(AgentState)
 
+def _logged(name, func):
+    return lambda state: node_event(name, func(state))
+
+def _alogged(name, afunc):
+    async def wrapper(state):
+        return node_event(name, await afunc(state))
+    return wrapper
+
+def _node(name, func, afunc=None, guarded=True):
+    """
+    Wraps a node with latency/error metrics (src/metrics.py), a trace span
+    (src/tracing.py), an entry in the state's event log (src/state.py) and,
+    unless guarded=False, the run's deadline (src/deadline.py).
+    """
+    if guarded:
+        func = guarded_node(func)
+        afunc = aguarded_node(afunc) if afunc else None
+    func = _logged(name, func)
+    afunc = _alogged(name, afunc) if afunc else None
+    return RunnableLambda(
+        timed_node(name, traced_node(name, func)),
+        afunc=atimed_node(name, atraced_node(name, afunc)) if afunc else None,
+        name=name,
+    )
+
 # Add Nodes
-workflow.add_node("scout", scout_agent)
-workflow.add_node("budget", budget_agent)
-workflow.add_node("planner", planner_agent)
-workflow.add_node("human", human_review_node)
+# Each node carries a sync and an async implementation:
+# app.invoke() uses the first, app.ainvoke() (the API path) uses the second.
+workflow.add_node("scout", _node("scout", scout_agent, ascout_agent))
+workflow.add_node("budget", _node("budget", budget_agent, abudget_agent))
+workflow.add_node("planner", _node("planner", planner_agent, aplanner_agent))
+# A human decision is never cut short by the deadline
+workflow.add_node("human", _node("human", human_review_node, guarded=False))
+workflow.add_node("deadline", _node("deadline", deadline_result, guarded=False))
 
 # Set Entry Point
 workflow.set_entry_point("scout")
 
 # Edges
-workflow.add_edge("scout", "budget")
+workflow.add_conditional_edges(
+    "scout",
+    after_scout,
+    {
+        "budget": "budget",
+        "infeasible": END,
+        "out_of_time": END
+    }
+)
 
 # Budget -> Decision
 workflow.add_conditional_edges(
@@ -47,6 +114,8 @@ workflow.add_conditional_edges(
         "retry": "scout",
         "planner": "planner",
         "human": "human", 
+        "deadline": "deadline",
+        "out_of_time": END,
         "failed": END
     }
 )
@@ -59,6 +128,8 @@ workflow.add_conditional_edges(
         "retry": "scout",
         "done": END,
         "human": "human", # <--- Route to Human
+        "deadline": "deadline",
+        "out_of_time": END,
         "failed": END
     }
 )
@@ -66,5 +137,23 @@ workflow.add_conditional_edges(
 # Human -> End
 # After the human decides, either finish (success) or fail (quit)
 workflow.add_edge("human", END) 
+workflow.add_edge("deadline", END)
+
+def build_graph(checkpointer=None, interrupt_before=None):
+    """Compiles the workflow. The API passes a checkpointer so paused runs can be resumed."""
+    return workflow.compile(checkpointer=checkpointer, interrupt_before=interrupt_before)
+
+_app = None
+
+def get_app():
+    """The plain graph (no checkpointer) used by main.py and the tests, compiled on first use."""
+    global _app
+    if _app is None:
+        _app = build_graph()
+    return _app
 
-app = workflow.compile()
\ No newline at end of file
+def __getattr__(name):
+    # `from src.graph import app` keeps working; compilation happens on first access
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
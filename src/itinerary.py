@@ -0,0 +1,144 @@
+import os
+import logging
+from contextlib import nullcontext
+from langgraph.graph import StateGraph, END
+from langgraph.types import Send
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from src.state import ItineraryState
+from src.graph import get_app
+from src import tracing
+
+logger = logging.getLogger(__name__)
+
+# --- MULTI-DESTINATION ITINERARIES ---
+# The total budget is split across legs by number of days, then every leg runs
+# the normal scout/budget/planner graph in parallel (LangGraph Send fan-out).
+# When a leg fails, what the approved legs did not spend is handed to the
+# failed legs and only those are run again.
+
+# How many times leftover budget is redistributed before giving up on a leg
+REBALANCE_ROUNDS = int(os.environ.get("ITINERARY_REBALANCE_ROUNDS", "1"))
+
+
+def split_budget(amount: int, days: list):
+    """Splits amount in proportion to days; the rounding remainder goes to the last leg."""
+    total_days = sum(days) or 1
+    shares = [amount * d // total_days for d in days]
+    shares[-1] += amount - sum(shares)
+    return shares
+
+
+# --- NODES ---
+def allocate(state: ItineraryState):
+    allocations = split_budget(state["total_budget"], [leg["days"] for leg in state["legs"]])
+    logger.info(f"[ITINERARY] {len(allocations)} legs, budgets: {allocations}")
+    return {"allocations": allocations, "pending": list(range(len(allocations))), "round": 0}
+
+
+def fan_out(state: ItineraryState):
+    if not state["pending"]:
+        return END
+    return [
+        Send("leg", {"index": i, "round": state["round"], "budget": state["allocations"][i], **state["legs"][i]})
+        for i in state["pending"]
+    ]
+
+
+def _leg_state(task: dict):
+    return {
+        "destination": task["destination"],
+        "total_budget": task["budget"],
+        "days": task["days"],
+        "retry_count": 0,
+        "messages": [],
+        "candidates": [],
+        "rejection_reason": None,
+        "plan_status": "IN_PROGRESS",
+        "human_decision": None,
+    }
+
+
+def _leg_result(task: dict, final_state: dict):
+    proposal = dict(final_state.get("current_proposal") or {})
+    approved = final_state.get("plan_status") == "APPROVED"
+    logger.info(f"[ITINERARY] Leg {task['index']} ({task['destination']}, ${task['budget']}): {final_state.get('plan_status')}")
+    return {"leg_results": [{
+        "index": task["index"],
+        "destination": task["destination"],
+        "days": task["days"],
+        "budget": task["budget"],
+        "round": task["round"],
+        "status": final_state.get("plan_status"),
+        "retry_count": final_state.get("retry_count", 0),
+        "itinerary": proposal,
+        "total_cost": proposal.get("total_cost", 0) if approved else 0,
+        "rejection_reason": final_state.get("rejection_reason"),
+        "logs": final_state.get("messages", [])[-5:],
+    }]}
+
+
+def run_leg(task: dict):
+    with tracing.span("itinerary.leg", destination=task["destination"], budget=task["budget"], round=task["round"]):
+        return _leg_result(task, get_app().invoke(_leg_state(task)))
+
+
+async def arun_leg(task: dict, config: RunnableConfig = None):
+    # Each leg is a full negotiation, so it takes one of the API's negotiation
+    # slots (passed in as configurable["slots"]) like a /plan-trip run does
+    slots = (config or {}).get("configurable", {}).get("slots")
+    async with slots or nullcontext():
+        with tracing.span("itinerary.leg", destination=task["destination"], budget=task["budget"], round=task["round"]):
+            return _leg_result(task, await get_app().ainvoke(_leg_state(task)))
+
+
+def rebalance(state: ItineraryState):
+    """Moves what approved legs left unspent to the failed legs, which then run again."""
+    results = state["leg_results"]
+    failed = [r for r in results if r["status"] != "APPROVED"]
+    if not failed or state["round"] >= REBALANCE_ROUNDS:
+        return {"pending": []}
+
+    allocations = list(state["allocations"])
+    leftover = 0
+    for r in results:
+        if r["status"] == "APPROVED":
+            leftover += allocations[r["index"]] - r["total_cost"]
+            allocations[r["index"]] = r["total_cost"]
+    if leftover <= 0:
+        return {"pending": []}
+
+    for r, extra in zip(failed, split_budget(leftover, [r["days"] for r in failed])):
+        allocations[r["index"]] += extra
+    logger.info(f"[ITINERARY] Rebalancing ${leftover} to legs {[r['index'] for r in failed]}: {allocations}")
+    return {"allocations": allocations, "pending": [r["index"] for r in failed], "round": state["round"] + 1}
+
+
+# --- GRAPH CONSTRUCTION ---
+itinerary_workflow = StateGraph(ItineraryState)
+itinerary_workflow.add_node("allocate", allocate)
+itinerary_workflow.add_node("leg", RunnableLambda(run_leg, afunc=arun_leg, name="leg"))
+itinerary_workflow.add_node("rebalance", rebalance)
+
+itinerary_workflow.set_entry_point("allocate")
+itinerary_workflow.add_conditional_edges("allocate", fan_out, ["leg", END])
+itinerary_workflow.add_edge("leg", "rebalance")
+itinerary_workflow.add_conditional_edges("rebalance", fan_out, ["leg", END])
+
+_itinerary_app = None
+
+def get_itinerary_app():
+    global _itinerary_app
+    if _itinerary_app is None:
+        _itinerary_app = itinerary_workflow.compile()
+    return _itinerary_app
+
+
+def itinerary_status(results: list):
+    approved = sum(r["status"] == "APPROVED" for r in results)
+    if approved == len(results):
+        return "APPROVED"
+    return "PARTIAL" if approved else "REJECTED"
+
+
+def initial_itinerary_state(total_budget: int, legs: list):
+    return {"total_budget": total_budget, "legs": legs, "allocations": [], "pending": [], "round": 0, "leg_results": []}
@@ -0,0 +1,148 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+import aiosqlite
+
+# --- BACKGROUND JOB QUEUE ---
+# A negotiation can take tens of seconds of Groq/Tavily calls. Instead of
+# holding the HTTP request open, POST /jobs stores the trip in SQLite and
+# returns an id; a fixed pool of workers runs queued jobs in order and
+# GET /jobs/{id} reports the result. Jobs left QUEUED or RUNNING when the
+# server stops are picked up again on the next start.
+
+logger = logging.getLogger(__name__)
+
+JOB_DB_PATH = os.environ.get("JOB_DB_PATH", "jobs.db")
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "4"))
+# Queued (not yet running) jobs beyond this are refused: POST /jobs -> 429
+JOB_QUEUE_LIMIT = int(os.environ.get("JOB_QUEUE_LIMIT", "100"))
+# A job interrupted by this many restarts is marked FAILED instead of requeued
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "3"))
+
+QUEUED, RUNNING, DONE, FAILED = "QUEUED", "RUNNING", "DONE", "FAILED"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    request TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+)
+"""
+
+
+class QueueFull(Exception):
+    """Raised by JobQueue.submit when JOB_QUEUE_LIMIT jobs are already waiting."""
+
+
+class JobQueue:
+    """
+    Durable FIFO of trip requests. handler(request_dict) is awaited by each
+    worker and returns the JSON-serialisable result stored on the job.
+    """
+
+    def __init__(self, handler, path: str = None, workers: int = None, max_depth: int = None,
+                 max_attempts: int = None):
+        self.handler = handler
+        self.path = path or JOB_DB_PATH
+        self.workers = JOB_WORKERS if workers is None else workers
+        self.max_depth = JOB_QUEUE_LIMIT if max_depth is None else max_depth
+        self.max_attempts = JOB_MAX_ATTEMPTS if max_attempts is None else max_attempts
+        self._db = None
+        self._queue = None
+        self._tasks = []
+        self.running = 0
+
+    def depth(self):
+        """Jobs waiting for a worker."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    # --- LIFECYCLE (called from the API lifespan) ---
+    async def start(self):
+        self._db = await aiosqlite.connect(self.path)
+        self._db.row_factory = aiosqlite.Row
+        await self._db.execute(SCHEMA)
+        # Jobs cut off by the last shutdown: try again, unless they keep dying
+        await self._db.execute(
+            "UPDATE jobs SET status = ?, error = 'Interrupted too many times', finished_at = ? "
+            "WHERE status = ? AND attempts >= ?", (FAILED, time.time(), RUNNING, self.max_attempts))
+        await self._db.execute("UPDATE jobs SET status = ? WHERE status = ?", (QUEUED, RUNNING))
+        await self._db.commit()
+
+        self._queue = asyncio.Queue()
+        async with self._db.execute("SELECT id FROM jobs WHERE status = ? ORDER BY created_at", (QUEUED,)) as cursor:
+            async for row in cursor:
+                self._queue.put_nowait(row["id"])
+        if self._queue.qsize():
+            logger.info(f"[JOBS] Resuming {self._queue.qsize()} queued jobs")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Stops the workers. Jobs they were running stay RUNNING and are requeued on start()."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+    # --- API ---
+    async def submit(self, request: dict):
+        if self.depth() >= self.max_depth:
+            raise QueueFull(f"{self.depth()} jobs already queued (limit {self.max_depth})")
+        job_id = str(uuid.uuid4())
+        await self._db.execute(
+            "INSERT INTO jobs (id, status, request, created_at) VALUES (?, ?, ?, ?)",
+            (job_id, QUEUED, json.dumps(request), time.time()))
+        await self._db.commit()
+        self._queue.put_nowait(job_id)
+        return await self.get(job_id)
+
+    async def get(self, job_id: str):
+        async with self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["request"] = json.loads(job["request"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    # --- WORKERS ---
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            job = await self.get(job_id)
+            if job is None or job["status"] != QUEUED:
+                continue
+            await self._db.execute(
+                "UPDATE jobs SET status = ?, attempts = attempts + 1, started_at = ? WHERE id = ?",
+                (RUNNING, time.time(), job_id))
+            await self._db.commit()
+            self.running += 1
+            try:
+                result = await self.handler(job["request"])
+                await self._finish(job_id, DONE, result=json.dumps(result))
+                logger.info(f"[JOBS] Job {job_id} done")
+            except asyncio.CancelledError:
+                raise  # shutting down: leave it RUNNING so start() requeues it
+            except Exception as e:
+                logger.error(f"[JOBS] Job {job_id} failed: {e}")
+                await self._finish(job_id, FAILED, error=str(e))
+            finally:
+                self.running -= 1
+
+    async def _finish(self, job_id: str, status: str, result: str = None, error: str = None):
+        await self._db.execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+            (status, result, error, time.time(), job_id))
+        await self._db.commit()
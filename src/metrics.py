@@ -0,0 +1,200 @@
+import time
+import bisect
+import threading
+import functools
+import contextvars
+
+# --- METRICS (Prometheus text format) ---
+# A deliberately small in-process registry: a lock, a dict lookup and a bisect
+# per observation, cheap enough to leave on in production. Served at /metrics.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 4, 5, 6, 8, 10)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+
+def _label_str(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_label_str(key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels):
+        series = self._series.get(tuple(sorted(labels.items())))
+        return series[-1] if series else 0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, hits in zip(self.buckets, series):
+                cumulative += hits
+                lines.append(f"{self.name}_bucket{_label_str(key + (('le', bound),))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_label_str(key + (('le', '+Inf'),))} {series[-1]}")
+            lines.append(f"{self.name}_sum{_label_str(key)} {round(series[-2], 6)}")
+            lines.append(f"{self.name}_count{_label_str(key)} {series[-1]}")
+        return lines
+
+
+class CallbackGauge:
+    """Gauge read from a function at scrape time (e.g. the search cache's own counters)."""
+
+    def __init__(self, name, help_text, fn):
+        self.name = name
+        self.help = help_text
+        self.fn = fn
+
+    def render(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge", f"{self.name} {self.fn()}"]
+
+
+_registry = []
+
+
+def register(metric):
+    _registry.append(metric)
+    return metric
+
+
+def render():
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- THE METRICS WE EXPORT ---
+NODE_SECONDS = register(Histogram("travelgraph_node_duration_seconds", "Time spent in each graph node."))
+NODE_ERRORS = register(Counter("travelgraph_node_errors_total", "Graph node invocations that raised."))
+LLM_CALLS = register(Counter("travelgraph_llm_calls_total", "LLM calls by purpose (strategy, extraction)."))
+LLM_TOKENS = register(Counter("travelgraph_llm_tokens_total", "LLM tokens by direction (input, output)."))
+SCOUT_PASS_LLM_CALLS = register(Histogram(
+    "travelgraph_scout_pass_llm_calls", "LLM calls made during one scout pass.", COUNT_BUCKETS))
+SCOUT_PASS_TOKENS = register(Histogram(
+    "travelgraph_scout_pass_tokens", "LLM tokens (input + output) used by one scout pass.", TOKEN_BUCKETS))
+SEARCH_SECONDS = register(Histogram("travelgraph_search_duration_seconds", "Latency of web search calls (cache misses)."))
+EXTRACTION_PROMPT_TOKENS = register(Counter(
+    "travelgraph_extraction_prompt_tokens_total", "Estimated search-result tokens in extraction prompts (raw, compacted)."))
+EXTRACTIONS = register(Counter("travelgraph_extractions_total", "Scout extractions by method (local parser, llm)."))
+PROPOSALS = register(Counter("travelgraph_proposals_total", "Scout proposals by source (search, pool, fallback)."))
+RETRIES = register(Histogram("travelgraph_negotiation_retries", "Scout passes per finished negotiation.", COUNT_BUCKETS))
+NEGOTIATIONS = register(Counter("travelgraph_negotiations_total", "Finished negotiations by final plan_status."))
+PROVIDER_ERRORS = register(Counter("travelgraph_provider_errors_total", "Failed Groq/Tavily attempts by provider and error type."))
+PROVIDER_RETRIES = register(Counter("travelgraph_provider_retries_total", "Provider calls retried after a failure."))
+PROVIDER_HEDGES = register(Counter("travelgraph_provider_hedges_total", "Duplicate provider calls sent for slow requests."))
+PROVIDER_SHORT_CIRCUITS = register(Counter(
+    "travelgraph_provider_short_circuits_total", "Provider calls refused because the circuit breaker was open."))
+STALE_SERVED = register(Counter(
+    "travelgraph_stale_served_total", "Expired cache entries served by kind (search, candidates) and reason (refreshing, fallback)."))
+PREFETCHES = register(Counter("travelgraph_prefetches_total", "Background cache refreshes by outcome (ok, error)."))
+BATCH_SHARED = register(Counter(
+    "travelgraph_batch_shared_searches_total", "Scout searches answered by another trip of the same /plan-trips batch."))
+COALESCED = register(Counter("travelgraph_coalesced_requests_total", "/plan-trip requests served by another request's negotiation."))
+
+
+# --- INSTRUMENTATION HELPERS ---
+# Per-scout-pass accounting: the node wrapper opens a tally, LLM calls add to it.
+_scout_pass = contextvars.ContextVar("scout_pass", default=None)
+
+
+def timed_node(name, func):
+    @functools.wraps(func)
+    def wrapper(state):
+        tally = _scout_pass.set({"calls": 0, "tokens": 0}) if name == "scout" else None
+        start = time.perf_counter()
+        try:
+            return func(state)
+        except Exception:
+            NODE_ERRORS.inc(node=name)
+            raise
+        finally:
+            NODE_SECONDS.observe(time.perf_counter() - start, node=name)
+            if tally is not None:
+                _close_scout_pass(tally)
+    return wrapper
+
+
+def atimed_node(name, afunc):
+    @functools.wraps(afunc)
+    async def wrapper(state):
+        tally = _scout_pass.set({"calls": 0, "tokens": 0}) if name == "scout" else None
+        start = time.perf_counter()
+        try:
+            return await afunc(state)
+        except Exception:
+            NODE_ERRORS.inc(node=name)
+            raise
+        finally:
+            NODE_SECONDS.observe(time.perf_counter() - start, node=name)
+            if tally is not None:
+                _close_scout_pass(tally)
+    return wrapper
+
+
+def _close_scout_pass(token):
+    tally = _scout_pass.get()
+    _scout_pass.reset(token)
+    SCOUT_PASS_LLM_CALLS.observe(tally["calls"])
+    SCOUT_PASS_TOKENS.observe(tally["tokens"])
+
+
+def observe_llm(response, purpose):
+    """Counts one LLM call and its token usage (when the provider reports it)."""
+    LLM_CALLS.inc(purpose=purpose)
+    usage = getattr(response, "usage_metadata", None) or {}
+    input_tokens, output_tokens = usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+    if input_tokens:
+        LLM_TOKENS.inc(input_tokens, direction="input")
+    if output_tokens:
+        LLM_TOKENS.inc(output_tokens, direction="output")
+    tally = _scout_pass.get()
+    if tally is not None:
+        tally["calls"] += 1
+        tally["tokens"] += input_tokens + output_tokens
+
+
+def record_negotiation(status, retry_count):
+    NEGOTIATIONS.inc(status=status)
+    RETRIES.observe(retry_count or 0)
@@ -0,0 +1,127 @@
+import os
+import time
+import bisect
+import threading
+from collections import OrderedDict
+from src.strategy import PRICE_MARKERS
+
+# --- PLAN CACHE ---
+# Whole negotiation outcomes, indexed per (destination, days) and ordered by budget.
+# Two facts make one run answer many budgets:
+#   * a plan the agents APPROVED at budget B still fits any budget >= B
+#   * a run that stalled because everything was too expensive at budget B
+#     will stall the same way for any budget <= B
+# Plans a human force-approved are never cached (they may be over budget).
+
+APPROVED = "approved"
+PRICE_REJECTED = "price_rejected"
+
+
+def plan_key(destination: str, days: int):
+    return (" ".join(destination.lower().split()), days)
+
+
+def plan_outcome(final_state: dict, status: str):
+    """Which monotonic rule (if any) lets this run's result be reused."""
+    if final_state.get("human_decision"):
+        return None
+    if status == "APPROVED":
+        return APPROVED
+    reason = (final_state.get("rejection_reason") or "").lower()
+    if status == "WAITING_FOR_HUMAN" and any(marker in reason for marker in PRICE_MARKERS):
+        return PRICE_REJECTED
+    return None
+
+
+class PlanCache:
+    def __init__(self, ttl=3600, max_entries=1024, clock=time.time):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        # (key, outcome) -> sorted budgets; (key, outcome, budget) -> (expires_at, response)
+        self._budgets = {}
+        self._entries = OrderedDict()  # LRU order across every (destination, days)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            ttl=float(os.environ.get("PLAN_CACHE_TTL", "3600")),
+            max_entries=int(os.environ.get("PLAN_CACHE_SIZE", "1024")),
+        )
+
+    def get(self, destination: str, days: int, budget: int):
+        """A cached /plan-trip body that is valid for this budget, or None."""
+        key = plan_key(destination, days)
+        with self._lock:
+            # Approved at the largest budget <= ours, else rejected at the smallest budget >= ours
+            budgets = self._budgets.get((key, APPROVED), [])
+            hit = self._first_live(key, APPROVED, reversed(budgets[:bisect.bisect_right(budgets, budget)]))
+            if hit is None:
+                budgets = self._budgets.get((key, PRICE_REJECTED), [])
+                hit = self._first_live(key, PRICE_REJECTED, budgets[bisect.bisect_left(budgets, budget):])
+
+            if hit is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(hit)
+            self.hits += 1
+            return self._entries[hit][1]
+
+    def set(self, destination: str, days: int, budget: int, outcome: str, response: dict):
+        key = plan_key(destination, days)
+        entry_key = (key, outcome, budget)
+        with self._lock:
+            if entry_key not in self._entries:
+                bisect.insort(self._budgets.setdefault((key, outcome), []), budget)
+            self._entries[entry_key] = (self.clock() + self.ttl, response)
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, destination: str = None, days: int = None, run_id: str = None):
+        """Drops matching entries (no filters = everything). Returns how many were removed."""
+        with self._lock:
+            doomed = [
+                entry_key for entry_key, (_, response) in self._entries.items()
+                if (destination is None or entry_key[0][0] == plan_key(destination, 0)[0])
+                and (days is None or entry_key[0][1] == days)
+                and (run_id is None or response.get("run_id") == run_id)
+            ]
+            for entry_key in doomed:
+                self._drop(entry_key)
+            return len(doomed)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": len(self._entries),
+        }
+
+    # --- internal helpers (caller holds the lock) ---
+    def _first_live(self, key, outcome, budgets):
+        now = self.clock()
+        expired = []
+        hit = None
+        for budget in budgets:
+            entry_key = (key, outcome, budget)
+            if self._entries[entry_key][0] > now:
+                hit = entry_key
+                break
+            expired.append(entry_key)
+        for entry_key in expired:
+            self._drop(entry_key)
+        return hit
+
+    def _drop(self, entry_key):
+        key, outcome, budget = entry_key
+        del self._entries[entry_key]
+        budgets = self._budgets[(key, outcome)]
+        budgets.pop(bisect.bisect_left(budgets, budget))
+        if not budgets:
+            del self._budgets[(key, outcome)]
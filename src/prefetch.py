@@ -0,0 +1,171 @@
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from src import agents, tools
+from src.cache import candidates_key
+from src.constraints import envelope
+
+# --- POPULAR-DESTINATION PREFETCHER ---
+# Traffic concentrates on a few dozen destinations. Every /plan-trip bumps a
+# decaying popularity score for its destination; every PREFETCH_INTERVAL_S the
+# prefetcher re-runs search + extraction (agents.awarm) for both tiers of the
+# PREFETCH_TOP_N hottest destinations whose cached candidates expire within
+# PREFETCH_AHEAD_S, so their next request never waits on Groq/Tavily.
+# Destinations scoring under PREFETCH_MIN_SCORE are left alone, and a search
+# whose refresh failed backs off exponentially instead of retrying every tick.
+
+logger = logging.getLogger(__name__)
+
+PREFETCH = os.environ.get("PREFETCH", "1") == "1"
+PREFETCH_INTERVAL_S = float(os.environ.get("PREFETCH_INTERVAL_S", "60"))
+PREFETCH_TOP_N = int(os.environ.get("PREFETCH_TOP_N", "30"))
+PREFETCH_AHEAD_S = float(os.environ.get("PREFETCH_AHEAD_S", "300"))
+# A request counts half as much after this long, so yesterday's hot spot cools off
+PREFETCH_HALF_LIFE_S = float(os.environ.get("PREFETCH_HALF_LIFE_S", "3600"))
+# Decayed score a destination needs before it is prefetched at all (one request scores 1.0)
+PREFETCH_MIN_SCORE = float(os.environ.get("PREFETCH_MIN_SCORE", "1.5"))
+# A failed refresh is retried after PREFETCH_INTERVAL_S, then twice as long each time, up to this
+PREFETCH_MAX_BACKOFF_S = float(os.environ.get("PREFETCH_MAX_BACKOFF_S", "3600"))
+# Refreshes running at once (each is one search and at most one LLM call)
+PREFETCH_CONCURRENCY = int(os.environ.get("PREFETCH_CONCURRENCY", "4"))
+
+# Price ceilings remembered per destination; each one is its own cache entry
+ENVELOPES_PER_DESTINATION = 3
+TIERS = ("luxury", "budget")
+
+
+def _normalize(destination: str):
+    return " ".join(destination.lower().split())
+
+
+class Prefetcher:
+    """Popularity tracker + refresh loop. record() is called per request, run_once() per tick."""
+
+    def __init__(self, top_n: int = None, interval: float = None, ahead: float = None,
+                 half_life: float = None, concurrency: int = None, min_score: float = None,
+                 max_backoff: float = None, clock=time.time):
+        self.top_n = PREFETCH_TOP_N if top_n is None else top_n
+        self.interval = PREFETCH_INTERVAL_S if interval is None else interval
+        self.ahead = PREFETCH_AHEAD_S if ahead is None else ahead
+        self.half_life = PREFETCH_HALF_LIFE_S if half_life is None else half_life
+        self.concurrency = PREFETCH_CONCURRENCY if concurrency is None else concurrency
+        self.min_score = PREFETCH_MIN_SCORE if min_score is None else min_score
+        self.max_backoff = PREFETCH_MAX_BACKOFF_S if max_backoff is None else max_backoff
+        self.clock = clock
+        self._scores = {}     # normalized destination -> (score, updated_at)
+        self._names = {}      # normalized destination -> spelling used in searches
+        self._envelopes = {}  # normalized destination -> OrderedDict(query_ceiling -> Envelope)
+        self._failures = {}   # (normalized destination, tier, query_ceiling) -> (failures in a row, retry_at)
+        self._task = None
+
+    # --- POPULARITY ---
+    def _decayed(self, key: str, now: float):
+        score, updated_at = self._scores.get(key, (0.0, now))
+        return score * 0.5 ** ((now - updated_at) / self.half_life)
+
+    def record(self, destination: str, total_budget: int, days: int):
+        env = envelope(total_budget, days)
+        if not env.feasible:
+            return
+        key, now = _normalize(destination), self.clock()
+        self._scores[key] = (self._decayed(key, now) + 1, now)
+        self._names[key] = " ".join(destination.split())
+
+        envelopes = self._envelopes.setdefault(key, OrderedDict())
+        envelopes[env.query_ceiling] = env
+        envelopes.move_to_end(env.query_ceiling)
+        while len(envelopes) > ENVELOPES_PER_DESTINATION:
+            envelopes.popitem(last=False)
+
+        # Forget the long tail so the tracker stays small
+        if len(self._scores) > 10 * max(self.top_n, 1):
+            keep = {d for d, _ in self._ranked(5 * max(self.top_n, 1))}
+            for stale in [d for d in self._scores if d not in keep]:
+                self._scores.pop(stale)
+                self._names.pop(stale)
+                self._envelopes.pop(stale)
+            self._failures = {k: v for k, v in self._failures.items() if k[0] in self._scores}
+
+    def _ranked(self, n: int = None):
+        """[(normalized destination, score)], hottest first."""
+        now = self.clock()
+        ranked = sorted(((d, self._decayed(d, now)) for d in self._scores),
+                        key=lambda item: item[1], reverse=True)
+        return ranked[:self.top_n if n is None else n]
+
+    def popular(self, n: int = None):
+        """[(destination, score)], hottest first."""
+        return [(self._names[d], score) for d, score in self._ranked(n)]
+
+    # --- REFRESHING ---
+    def due(self):
+        """
+        (tier, destination, envelope) of hot searches whose candidates are missing
+        or about to expire. Destinations under min_score and searches backing off
+        after a failed refresh are skipped.
+        """
+        cache = tools.search_cache
+        now, tick = cache.clock(), self.clock()
+        due = []
+        for destination, score in self.popular():
+            if score < self.min_score:
+                break  # hottest first: the rest are colder still
+            key = _normalize(destination)
+            for env in reversed(self._envelopes[key].values()):
+                for tier in TIERS:
+                    _, retry_at = self._failures.get((key, tier, env.query_ceiling), (0, 0))
+                    if retry_at > tick:
+                        continue
+                    expires_at = cache.expires_at(candidates_key(tier, destination, env.query_ceiling))
+                    if expires_at is None or expires_at - now <= self.ahead:
+                        due.append((tier, destination, env))
+        return due
+
+    def _refreshed(self, tier: str, destination: str, env, ok: bool):
+        key = (_normalize(destination), tier, env.query_ceiling)
+        if ok:
+            self._failures.pop(key, None)
+            return
+        failures = self._failures.get(key, (0, 0))[0] + 1
+        delay = min(self.interval * 2 ** (failures - 1), self.max_backoff)
+        self._failures[key] = (failures, self.clock() + delay)
+        logger.warning(f"[PREFETCH] Refresh of {tier} hotels in {destination} failed {failures}x; "
+                       f"next try in {delay:.0f}s.")
+
+    async def run_once(self):
+        """Refreshes everything due(); returns how many entries were refreshed."""
+        due = self.due()
+        if not due:
+            return 0
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def refresh(tier, destination, env):
+            async with slots:
+                ok = await agents.awarm(tier, destination, env)
+            self._refreshed(tier, destination, env, ok)
+            return ok
+
+        refreshed = sum(await asyncio.gather(*(refresh(*entry) for entry in due)))
+        logger.info(f"[PREFETCH] Refreshed {refreshed}/{len(due)} cached searches for popular destinations.")
+        return refreshed
+
+    # --- LIFECYCLE (called from the API lifespan) ---
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"[PREFETCH] Refresh pass failed: {e}")
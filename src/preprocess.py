@@ -0,0 +1,98 @@
+import os
+import re
+from src.extraction import PRICE_PATTERN, HOTEL_WORDS, CENTER_KEYWORDS, SUBURB_KEYWORDS
+
+# --- SEARCH RESULT PREPROCESSING ---
+# The extraction prompt used to embed Tavily's payload verbatim: URLs, page
+# chrome, repeated snippets. Only sentences about hotels, prices or the area
+# matter to the extractor, so those are kept (deduplicated, under a token
+# budget) and the rest is dropped before the LLM sees it.
+
+SEARCH_PREPROCESS = os.environ.get("SEARCH_PREPROCESS", "1") == "1"
+EXTRACTION_TOKEN_BUDGET = int(os.environ.get("EXTRACTION_TOKEN_BUDGET", "800"))
+
+# Rough English average for Llama/GPT tokenizers; good enough for a budget
+CHARS_PER_TOKEN = 4
+
+URL_PATTERN = re.compile(r"https?://\S+|www\.\S+")
+MARKDOWN_LINK = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+HTML_TAG = re.compile(r"<[^>]+>")
+SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|\n+|\s+[|•·]\s+")
+HOTEL_MENTION = re.compile(HOTEL_WORDS + r"|hostel|accommodation|room", re.IGNORECASE)
+BOILERPLATE = ("cookie", "sign in", "log in", "subscribe", "newsletter", "privacy policy",
+               "all rights reserved", "javascript", "terms of use", "skip to")
+
+
+def estimate_tokens(text: str):
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _clean(text: str):
+    text = MARKDOWN_LINK.sub(r"\1", text)
+    text = HTML_TAG.sub(" ", text)
+    return URL_PATTERN.sub("", text)
+
+
+def _relevant(sentence: str):
+    lowered = sentence.lower()
+    if any(marker in lowered for marker in BOILERPLATE):
+        return False
+    return bool(
+        PRICE_PATTERN.search(sentence)
+        or HOTEL_MENTION.search(sentence)
+        or any(keyword in lowered for keyword in CENTER_KEYWORDS + SUBURB_KEYWORDS)
+    )
+
+
+def _fingerprint(sentence: str):
+    return re.sub(r"[^a-z0-9$]+", "", sentence.lower())
+
+
+def compact_results(search_results, token_budget: int = None):
+    """
+    Returns (text, report): the prompt-ready search results and a dict with
+    tokens before/after plus how many sentences were kept, deduplicated or dropped.
+    """
+    if token_budget is None:
+        token_budget = EXTRACTION_TOKEN_BUDGET
+    raw = str(search_results)
+    report = {"tokens_before": estimate_tokens(raw), "kept": 0, "duplicates": 0, "dropped": 0}
+
+    if not isinstance(search_results, list):
+        text = raw[:token_budget * CHARS_PER_TOKEN]
+        return text, {**report, "tokens_after": estimate_tokens(text)}
+
+    seen = set()
+    lines = []
+    for result in search_results:
+        if not isinstance(result, dict):
+            continue
+        kept = []
+        for sentence in SENTENCE_BREAK.split(_clean(str(result.get("content", "")))):
+            sentence = " ".join(sentence.split())
+            if not sentence:
+                continue
+            if not _relevant(sentence):
+                report["dropped"] += 1
+                continue
+            fingerprint = _fingerprint(sentence)
+            if fingerprint in seen:
+                report["duplicates"] += 1
+                continue
+            seen.add(fingerprint)
+            kept.append(sentence)
+        if kept:
+            title = " ".join(_clean(str(result.get("title") or "")).split())
+            lines.append(f"- {title}: {' '.join(kept)}" if title else f"- {' '.join(kept)}")
+            report["kept"] += len(kept)
+
+    # Token budget: whole results first, then cut the last one that doesn't fit
+    limit = token_budget * CHARS_PER_TOKEN
+    text = ""
+    for line in lines:
+        if len(text) + len(line) + 1 > limit:
+            text += line[:max(limit - len(text) - 1, 0)]
+            break
+        text += line + "\n"
+    text = text.strip()
+    return text, {**report, "tokens_after": estimate_tokens(text)}
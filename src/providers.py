@@ -0,0 +1,93 @@
+import os
+import threading
+
+# --- PROVIDER FACTORY ---
+# Groq and Tavily clients are built on first use rather than at import time,
+# so importing the agents/graph/API needs neither the SDKs nor the API keys.
+# set_llm()/set_search_tool() swap in another backend at runtime (tests, stubs).
+# PROVIDER_MODE picks live (default), record, replay or synthetic backends
+# for every entry point at once -- see src/backends.py. Live clients are
+# wrapped with timeouts, retries, hedging and a circuit breaker (src/clients.py).
+
+PROVIDER_MODE = os.environ.get("PROVIDER_MODE", "live").strip().lower()
+LLM_MODEL = os.environ.get("GROQ_MODEL", "llama-3.3-70b-versatile")
+SEARCH_MAX_RESULTS = int(os.environ.get("SEARCH_MAX_RESULTS", "3"))
+
+_lock = threading.Lock()
+_llm = None
+_search_tool = None
+_env_loaded = False
+
+
+def _load_env():
+    """Reads API keys from .env once, right before the first real client is built."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+
+def _live_llm():
+    _load_env()
+    from langchain_groq import ChatGroq
+    from src import clients
+
+    def build_chat(async_client):
+        return ChatGroq(
+            model=LLM_MODEL,
+            temperature=0,
+            api_key=os.environ.get("GROQ_API_KEY"),
+            timeout=clients.LLM_TIMEOUT_S,
+            max_retries=0,  # retries, hedging and the circuit breaker live in src/clients.py
+            http_client=clients.http_client(),
+            # ainvoke() (the API path) on this loop's pool, not the SDK's own client
+            http_async_client=async_client,
+        )
+
+    return clients.Resilient(clients.PerLoop(build_chat), "groq", clients.LLM_TIMEOUT_S, hedge_percentile=clients.LLM_HEDGE_PERCENTILE)
+
+
+def _live_search_tool():
+    _load_env()
+    from src import clients
+    tavily = clients.TavilySearch(max_results=SEARCH_MAX_RESULTS)
+    return clients.Resilient(tavily, "tavily", clients.SEARCH_TIMEOUT_S, hedge_percentile=clients.SEARCH_HEDGE_PERCENTILE)
+
+
+def get_llm():
+    global _llm
+    if _llm is None:
+        with _lock:
+            if _llm is None:
+                if PROVIDER_MODE == "live":
+                    _llm = _live_llm()
+                else:
+                    from src import backends
+                    _llm = backends.build_llm(PROVIDER_MODE, _live_llm)
+    return _llm
+
+
+def get_search_tool():
+    global _search_tool
+    if _search_tool is None:
+        with _lock:
+            if _search_tool is None:
+                if PROVIDER_MODE == "live":
+                    _search_tool = _live_search_tool()
+                else:
+                    from src import backends
+                    _search_tool = backends.build_search_tool(PROVIDER_MODE, _live_search_tool)
+    return _search_tool
+
+
+def set_llm(llm):
+    """Replaces the chat model used by the Scout (None = rebuild the default on next use)."""
+    global _llm
+    _llm = llm
+
+
+def set_search_tool(search_tool):
+    """Replaces the web search backend (None = rebuild the default on next use)."""
+    global _search_tool
+    _search_tool = search_tool
@@ -1,6 +1,90 @@
-import operator
+import os
+import time
+import dataclasses
+from collections.abc import Mapping
 from typing import TypedDict, Annotated, List, Optional
 
+# --- RETENTION ---
+# The API only ever shows the last few log lines, but every checkpoint stores the
+# whole state. Both logs keep only their newest entries (0 = keep everything).
+STATE_MESSAGE_LIMIT = int(os.environ.get("STATE_MESSAGE_LIMIT", "5"))
+STATE_EVENT_LIMIT = int(os.environ.get("STATE_EVENT_LIMIT", "20"))
+
+def capped(limit: int):
+    """Reducer: appends the node's entries and keeps the newest `limit`."""
+    def append(existing: list, new: list):
+        merged = (existing or []) + (new or [])
+        return merged[-limit:] if limit else merged
+    return append
+
+# --- PROPOSAL ---
+@dataclasses.dataclass(frozen=True, slots=True, eq=False)
+class Proposal(Mapping):
+    """
+    A hotel offer. Immutable: agents derive a new one with with_() instead of
+    editing it. Reads like a dict of its set fields (proposal["price"],
+    proposal.get("travel_minutes"), dict(proposal)), so API bodies are unchanged.
+    """
+    name: str
+    price: int = 0
+    location: str = "City Center"
+    total_cost: Optional[int] = None
+    travel_minutes: Optional[int] = None
+    sightseeing_minutes: Optional[int] = None
+
+    @classmethod
+    def of(cls, hotel):
+        """A Proposal from a hotel dict (unknown keys dropped); Proposals and None pass through."""
+        if hotel is None or isinstance(hotel, cls):
+            return hotel
+        return cls(**{f: hotel[f] for f in PROPOSAL_FIELDS if hotel.get(f) is not None})
+
+    def with_(self, **changes):
+        return dataclasses.replace(self, **changes)
+
+    def __getitem__(self, key):
+        value = getattr(self, key, None) if key in PROPOSAL_FIELDS else None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self):
+        return (f for f in PROPOSAL_FIELDS if getattr(self, f) is not None)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __eq__(self, other):
+        if isinstance(other, Mapping):
+            return dict(self) == dict(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, f) for f in PROPOSAL_FIELDS))
+
+PROPOSAL_FIELDS = tuple(f.name for f in dataclasses.fields(Proposal))
+
+def proposals(hotels):
+    return [Proposal.of(h) for h in hotels or []]
+
+# --- EVENT LOG ---
+@dataclasses.dataclass(frozen=True, slots=True)
+class Event:
+    """One node step: which node ran, the plan_status it left, when, and why (rejections)."""
+    node: str
+    status: Optional[str]
+    at: float
+    reason: Optional[str] = None
+
+    def to_dict(self):
+        return dataclasses.asdict(self)
+
+def node_event(node: str, update: dict):
+    """The update with an Event for this step added (used by the graph's node wrapper)."""
+    update = update or {}
+    event = Event(node, update.get("plan_status"), round(time.time(), 3), update.get("rejection_reason"))
+    return {**update, "events": [event]}
+
 class AgentState(TypedDict):
     """
     The shared memory state for the travel negotiation system.
@@ -9,13 +93,38 @@ class AgentState(TypedDict):
     destination: str
     total_budget: int
     days: int
-    
+
     # -- INTERNAL STATE --
-    messages: Annotated[List[str], operator.add] 
-    current_proposal: Optional[dict] 
-    rejection_reason: Optional[str] 
-    plan_status: str  # "IN_PROGRESS", "REJECTED", "APPROVED", "WAITING_FOR_HUMAN"
+    messages: Annotated[List[str], capped(STATE_MESSAGE_LIMIT)]  # human-readable log, newest last
+    events: Annotated[List[Event], capped(STATE_EVENT_LIMIT)]    # structured log, one per node step
+    current_proposal: Optional[Proposal]
+    candidates: List[Proposal]  # Unused hotels from the last extraction, tried before searching again
+    rejection_reason: Optional[str]
+    plan_status: str  # "IN_PROGRESS", "REJECTED", "APPROVED", "WAITING_FOR_HUMAN", "PARTIAL", "TIMED_OUT"
     retry_count: int
-    
+    deadline: Optional[float]  # epoch seconds; past it the run ends with its best valid hotel (src/deadline.py)
+
     # -- NEW FIELD --
-    human_decision: Optional[str] # "approve" or "quit"s
\ No newline at end of file
+    human_decision: Optional[str] # "approve" or "quit"s
+
+def merge_legs(existing: List[dict], new: List[dict]):
+    """Reducer for leg results: the newest result per leg index wins, kept in leg order."""
+    by_index = {result["index"]: result for result in existing or []}
+    for result in new or []:
+        by_index[result["index"]] = result
+    return [by_index[i] for i in sorted(by_index)]
+
+class ItineraryState(TypedDict):
+    """
+    A multi-city trip: one single-destination negotiation (AgentState) per leg,
+    all sharing one total budget.
+    """
+    # -- INPUTS --
+    total_budget: int
+    legs: List[dict]  # [{"destination": str, "days": int}, ...]
+
+    # -- INTERNAL STATE --
+    allocations: List[int]  # budget currently assigned to each leg
+    pending: List[int]      # leg indexes to (re)run in the next fan-out
+    round: int              # how many times leftover budget has been redistributed
+    leg_results: Annotated[List[dict], merge_legs]
@@ -0,0 +1,88 @@
+import os
+import logging
+from typing import Optional
+from langchain_core.messages import SystemMessage, HumanMessage
+from src.providers import get_llm
+from src import metrics, tracing
+
+logger = logging.getLogger(__name__)
+
+# --- SCOUT STRATEGY (luxury vs budget) ---
+# The rules below are the ones the Scout's LLM prompt used to spell out.
+# Running them in Python covers every reason budget_agent and planner_agent
+# produce, so the LLM is only a fallback for free-text reasons we don't know.
+
+# Off by default: unknown reasons fall back to 'luxury' without a Groq call.
+LLM_STRATEGY_FALLBACK = os.environ.get("SCOUT_LLM_STRATEGY", "0") == "1"
+
+PRICE_MARKERS = ("exceeds budget", "over budget", "expensive", "too costly", "cheaper", "price")
+DISTANCE_MARKERS = ("too far", "far", "distance", "mins", "commute")
+
+STRATEGY_PROMPT = """You are a Travel Scout.
+    Decide whether to search for a 'luxury' or 'budget' hotel.
+    - If rejection mentioned 'expensive', switch to 'budget'.
+    - If rejection mentioned 'far', switch to 'luxury'.
+    - Default to 'luxury'.
+    Respond with ONLY: "luxury" or "budget".
+    """
+
+
+def rule_based_tier(rejection_reason: Optional[str]):
+    """Returns 'luxury' / 'budget', or None when no rule recognizes the reason."""
+    if not rejection_reason:
+        return "luxury"
+    reason = rejection_reason.lower()
+    if any(marker in reason for marker in PRICE_MARKERS):
+        return "budget"
+    if any(marker in reason for marker in DISTANCE_MARKERS):
+        return "luxury"
+    return None
+
+
+def strategy_messages(rejection_reason):
+    return [
+        SystemMessage(content=STRATEGY_PROMPT),
+        HumanMessage(content=f"History: {rejection_reason}")
+    ]
+
+
+def tier_from_decision(decision: str):
+    return "budget" if "budget" in decision.strip().lower() else "luxury"
+
+
+def choose_tier(rejection_reason, llm=None, use_llm=None):
+    tier = rule_based_tier(rejection_reason)
+    if tier:
+        return tier
+
+    if use_llm is None:
+        use_llm = LLM_STRATEGY_FALLBACK
+    if not use_llm:
+        logger.info(f"[STRATEGY] Unrecognized reason '{rejection_reason}'. Defaulting to luxury.")
+        return "luxury"
+
+    logger.info(f"[STRATEGY] Unrecognized reason '{rejection_reason}'. Asking the LLM.")
+    llm = llm or get_llm()
+    with tracing.span("llm.invoke", purpose="strategy", rejection_reason=rejection_reason):
+        response = llm.invoke(strategy_messages(rejection_reason))
+    metrics.observe_llm(response, "strategy")
+    return tier_from_decision(response.content)
+
+
+async def achoose_tier(rejection_reason, llm=None, use_llm=None):
+    tier = rule_based_tier(rejection_reason)
+    if tier:
+        return tier
+
+    if use_llm is None:
+        use_llm = LLM_STRATEGY_FALLBACK
+    if not use_llm:
+        logger.info(f"[STRATEGY] Unrecognized reason '{rejection_reason}'. Defaulting to luxury.")
+        return "luxury"
+
+    logger.info(f"[STRATEGY] Unrecognized reason '{rejection_reason}'. Asking the LLM.")
+    llm = llm or get_llm()
+    with tracing.span("llm.invoke", purpose="strategy", rejection_reason=rejection_reason):
+        response = await llm.ainvoke(strategy_messages(rejection_reason))
+    metrics.observe_llm(response, "strategy")
+    return tier_from_decision(response.content)
@@ -1,11 +1,22 @@
-import os
-from dotenv import load_dotenv
-load_dotenv()  # Load API keys from .env file
-from langchain_community.tools.tavily_search import TavilySearchResults
+import time
 from langchain_core.tools import tool
+from src import geo, metrics, tracing
+from src.cache import SearchCache, make_key
+from src.providers import get_search_tool
 
-# Initialize Tavily
-tavily_tool = TavilySearchResults(max_results=3)
+# Food allowance per day that calculate_total adds on top of the hotel
+DAILY_FOOD_COST = 100
+
+# Shared cache for search results (see src/cache.py for the knobs)
+search_cache = SearchCache.from_env()
+
+metrics.register(metrics.CallbackGauge(
+    "travelgraph_search_cache_hits", "Search cache hits since start.", lambda: search_cache.hits))
+metrics.register(metrics.CallbackGauge(
+    "travelgraph_search_cache_misses", "Search cache misses since start.", lambda: search_cache.misses))
+metrics.register(metrics.CallbackGauge(
+    "travelgraph_search_cache_stale_hits", "Expired entries served from the stale window since start.",
+    lambda: search_cache.stale_hits))
 
 @tool
 def search_hotels(query: str):
@@ -15,22 +26,91 @@ def search_hotels(query: str):
     Returns raw search results.
     """
     print(f"   [TOOL]  Searching the web for: '{query}'...")
-    return tavily_tool.invoke({"query": query})
+    return get_search_tool().invoke({"query": query})
+
+@tool
+async def asearch_hotels(query: str):
+    """
+    Async version of search_hotels (non-blocking Tavily call).
+    """
+    print(f"   [TOOL]  Searching the web for: '{query}'...")
+    return await get_search_tool().ainvoke({"query": query})
+
+# --- CACHED SEARCH (what the Scout actually calls) ---
+def hotel_query(tier: str, destination: str, max_price: int = None):
+    query = f"{tier} hotels in {destination} price per night"
+    return f"{query} under ${max_price}" if max_price else query
+
+def find_hotels(tier: str, destination: str, max_price: int = None, refresh: bool = False):
+    """
+    search_hotels behind the (tier, destination, price ceiling) cache.
+    refresh=True skips the lookup (background refresh). Otherwise, if the search
+    fails, an expired entry still in the stale window is returned instead of the error.
+    """
+    key = make_key(tier, destination, max_price)
+    with tracing.span("search_hotels", tier=tier, destination=destination, max_price=max_price) as span:
+        results = None if refresh else search_cache.get(key)
+        tracing.set_attributes(span, cache="refresh" if refresh else "miss" if results is None else "hit")
+        if results is None:
+            start = time.perf_counter()
+            try:
+                results = search_hotels.invoke(hotel_query(tier, destination, max_price))
+            except Exception:
+                results = None if refresh else _stale_results(key, span)
+                if results is None:
+                    raise
+            else:
+                if results:
+                    search_cache.set(key, results)
+            finally:
+                metrics.SEARCH_SECONDS.observe(time.perf_counter() - start)
+        else:
+            print(f"   [TOOL]  Cache hit for: '{key}'")
+    return results
+
+async def afind_hotels(tier: str, destination: str, max_price: int = None, refresh: bool = False):
+    key = make_key(tier, destination, max_price)
+    with tracing.span("search_hotels", tier=tier, destination=destination, max_price=max_price) as span:
+        results = None if refresh else search_cache.get(key)
+        tracing.set_attributes(span, cache="refresh" if refresh else "miss" if results is None else "hit")
+        if results is None:
+            start = time.perf_counter()
+            try:
+                results = await asearch_hotels.ainvoke(hotel_query(tier, destination, max_price))
+            except Exception:
+                results = None if refresh else _stale_results(key, span)
+                if results is None:
+                    raise
+            else:
+                if results:
+                    search_cache.set(key, results)
+            finally:
+                metrics.SEARCH_SECONDS.observe(time.perf_counter() - start)
+        else:
+            print(f"   [TOOL]  Cache hit for: '{key}'")
+    return results
+
+def _stale_results(key: str, span):
+    """The search failed: the last known results for key if still in the stale window, else None."""
+    stale = search_cache.get(key, stale=True)
+    if stale is None:
+        return None
+    print(f"   [TOOL]  Search failed, serving stale results for: '{key}'")
+    tracing.set_attributes(span, cache="stale")
+    metrics.STALE_SERVED.inc(kind="search", reason="fallback")
+    return stale
 
 @tool
-def calculate_total(hotel_price: int, days: int, daily_food_cost: int = 100):
+def calculate_total(hotel_price: int, days: int, daily_food_cost: int = DAILY_FOOD_COST):
     """Calculates the total cost."""
     return (hotel_price * days) + (daily_food_cost * days)
 
 @tool
-def check_distance(hotel_location: str, interest_point: str = "City Center"):
+def check_distance(hotel_location: str, interest_point: str = "City Center", city: str = ""):
     """
-    Checks distance. 
-    NOTE: Since we are using live data, this is a simplified logic check.
+    Checks distance (minutes) from a hotel location to a point of interest.
+    With a city from the bundled dataset this is computed from coordinates
+    (src/geo.py); otherwise it falls back to the location label:
+    "Suburbs" is far, "City Center" is close, anything else is average.
     """
-    # If the scout says it's in the "Suburbs", we assume it's far.
-    if "Suburbs" in hotel_location:
-        return 45
-    elif "City Center" in hotel_location:
-        return 5
-    return 20 # Default average
\ No newline at end of file
+    return geo.minutes_between(hotel_location, interest_point, city or None)
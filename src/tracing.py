@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import uuid
+import random
+import logging
+import threading
+import functools
+import contextvars
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+# --- PER-RUN TRACES ---
+# Each API run records a tree of spans (graph run -> node visits -> LLM/search
+# calls, plus router decisions) with timings and key attributes. Finished
+# traces are appended to TRACE_PATH as JSON lines and the most recent ones are
+# kept in memory, so GET /traces/{run_id} can show a waterfall of one run.
+# The file is written by one background thread (never on the event loop) and
+# rotated to TRACE_PATH.1 at TRACE_MAX_BYTES, so it (and a lookup that has to
+# scan it) stays bounded.
+
+TRACE_PATH = os.environ.get("TRACE_PATH", "traces.jsonl")
+TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", "1.0"))
+TRACE_MEMORY_LIMIT = int(os.environ.get("TRACE_MEMORY_LIMIT", "256"))
+TRACE_MAX_BYTES = int(os.environ.get("TRACE_MAX_BYTES", str(10 * 1024 * 1024)))  # 0 = never rotate
+
+logger = logging.getLogger(__name__)
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+_recent = OrderedDict()  # run_id -> list of spans
+_lock = threading.Lock()
+_writer = None  # single worker, so lines land in order
+
+
+class Trace:
+    def __init__(self, run_id):
+        self.run_id = run_id
+        self.spans = []
+
+
+def _new_span(trace, name, attributes):
+    span = {
+        "span_id": uuid.uuid4().hex[:16],
+        "parent_id": _current_span.get(),
+        "name": name,
+        "start": time.time(),
+        "duration_ms": 0.0,
+        "attributes": {k: v for k, v in attributes.items() if v is not None},
+    }
+    trace.spans.append(span)  # list.append is atomic: safe from worker threads
+    return span
+
+
+@contextmanager
+def trace(run_id, name="graph_run", **attributes):
+    """Opens a (sampled) trace for one run; no-op when the run is not sampled."""
+    if TRACE_SAMPLE_RATE < 1.0 and random.random() >= TRACE_SAMPLE_RATE:
+        yield None
+        return
+
+    current = Trace(run_id)
+    trace_token = _current_trace.set(current)
+    try:
+        with span(name, run_id=run_id, **attributes) as root:
+            yield root
+    finally:
+        _current_trace.reset(trace_token)
+        _store(current)
+
+
+@contextmanager
+def span(name, **attributes):
+    """Times a block as a child of the current span. Yields the span dict (or None)."""
+    current = _current_trace.get()
+    if current is None:
+        yield None
+        return
+
+    record = _new_span(current, name, attributes)
+    span_token = _current_span.set(record["span_id"])
+    start = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record["attributes"]["error"] = repr(e)
+        raise
+    finally:
+        record["duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        _current_span.reset(span_token)
+
+
+def event(name, **attributes):
+    """Zero-duration span (e.g. a router decision)."""
+    current = _current_trace.get()
+    if current is not None:
+        _new_span(current, name, attributes)
+
+
+def set_attributes(span_record, **attributes):
+    if span_record is not None:
+        span_record["attributes"].update({k: v for k, v in attributes.items() if v is not None})
+
+
+def traced_node(name, func):
+    @functools.wraps(func)
+    def wrapper(state):
+        with span(f"node.{name}", retry_count=state.get("retry_count"),
+                  rejection_reason=state.get("rejection_reason")) as record:
+            result = func(state)
+            set_attributes(record, plan_status=(result or {}).get("plan_status"))
+            return result
+    return wrapper
+
+
+def atraced_node(name, afunc):
+    @functools.wraps(afunc)
+    async def wrapper(state):
+        with span(f"node.{name}", retry_count=state.get("retry_count"),
+                  rejection_reason=state.get("rejection_reason")) as record:
+            result = await afunc(state)
+            set_attributes(record, plan_status=(result or {}).get("plan_status"))
+            return result
+    return wrapper
+
+
+# --- STORAGE ---
+def _store(finished):
+    global _writer
+    with _lock:
+        _recent.setdefault(finished.run_id, []).extend(finished.spans)
+        _recent.move_to_end(finished.run_id)
+        while len(_recent) > TRACE_MEMORY_LIMIT:
+            _recent.popitem(last=False)
+        if TRACE_PATH:
+            if _writer is None:
+                _writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trace-writer")
+            line = json.dumps({"run_id": finished.run_id, "spans": finished.spans}) + "\n"
+            _writer.submit(_append, TRACE_PATH, line)
+
+
+def _append(path, line):
+    try:
+        if TRACE_MAX_BYTES and os.path.exists(path) and os.path.getsize(path) + len(line) > TRACE_MAX_BYTES:
+            os.replace(path, path + ".1")  # keep one older file, drop the one before
+        with open(path, "a") as f:
+            f.write(line)
+    except OSError as e:
+        logger.warning(f"[TRACE] Could not write to {path}: {e}")
+
+
+def flush():
+    """Waits until every finished trace is on disk."""
+    if _writer is not None:
+        _writer.submit(lambda: None).result()
+
+
+def get_trace(run_id):
+    """All spans recorded for run_id (a resumed run adds a second trace), oldest first."""
+    with _lock:
+        spans = list(_recent.get(run_id, []))
+    if not spans and TRACE_PATH:
+        # Evicted from memory: scan the (size-capped) current and previous files
+        flush()
+        for path in (TRACE_PATH + ".1", TRACE_PATH):
+            if not os.path.exists(path):
+                continue
+            with open(path) as f:
+                for line in f:
+                    if run_id not in line:
+                        continue  # skip the JSON parse for other runs
+                    record = json.loads(line)
+                    if record["run_id"] == run_id:
+                        spans.extend(record["spans"])
+    if not spans:
+        return None
+
+    spans.sort(key=lambda s: s["start"])
+    origin = spans[0]["start"]
+    for s in spans:
+        s["offset_ms"] = round((s["start"] - origin) * 1000, 3)
+    return spans
+
+
+def render_waterfall(spans, width=40):
+    """Plain-text waterfall: one row per span, indented by depth, bar scaled to the run."""
+    depth = {}
+    by_id = {s["span_id"]: s for s in spans}
+    for s in spans:
+        depth[s["span_id"]] = depth.get(s["parent_id"], -1) + 1 if s["parent_id"] in by_id else 0
+
+    total = max((s["offset_ms"] + s["duration_ms"] for s in spans), default=0) or 1
+    rows = []
+    for s in spans:
+        start_col = int(s["offset_ms"] / total * width)
+        length = max(1, int(s["duration_ms"] / total * width))
+        bar = " " * start_col + "#" * length
+        label = "  " * depth[s["span_id"]] + s["name"]
+        rows.append(f"{label:<32} |{bar:<{width}}| {s['duration_ms']:>9.2f} ms")
+    return "\n".join(rows)
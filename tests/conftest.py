@@ -0,0 +1,75 @@
+import os
+import json
+import time
+import asyncio
+import tempfile
+import pytest
+from types import SimpleNamespace
+
+# Keep API checkpoints, traces and jobs out of the working tree
+_scratch = tempfile.mkdtemp()
+os.environ.setdefault("CHECKPOINT_PATH", os.path.join(_scratch, "checkpoints.db"))
+os.environ.setdefault("TRACE_PATH", os.path.join(_scratch, "traces.jsonl"))
+os.environ.setdefault("JOB_DB_PATH", os.path.join(_scratch, "jobs.db"))
+
+import src.tools as tools
+import src.api as api
+from src import providers
+from src.cache import SearchCache
+from src.plan_cache import PlanCache
+
+@pytest.fixture(autouse=True)
+def fresh_search_cache(monkeypatch):
+    """No test sees hotels another test searched for (tests that want caching build their own)."""
+    monkeypatch.setattr(tools, "search_cache", SearchCache(ttl=0))
+
+# --- STUB PROVIDERS ---
+# Every provider call sleeps for PROVIDER_LATENCY seconds, like a real Groq/Tavily round trip.
+PROVIDER_LATENCY = 0.05
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+class StubLLM:
+    def __init__(self):
+        # Tests can swap this to steer the negotiation (e.g. a far-away hotel)
+        self.hotel = {"name": "Stub Hotel", "price": 100, "location": "City Center"}
+
+    def _answer(self, messages):
+        if "Data Extractor" in messages[-1].content:
+            return FakeResponse(json.dumps(self.hotel))
+        return FakeResponse("luxury")
+
+    def invoke(self, messages):
+        time.sleep(PROVIDER_LATENCY)
+        return self._answer(messages)
+
+    async def ainvoke(self, messages):
+        await asyncio.sleep(PROVIDER_LATENCY)
+        return self._answer(messages)
+
+class StubSearch:
+    """Stands in for the Tavily tool: invoke({"query": ...}) -> list of results."""
+    # No price in the snippet, so the local parser defers to the (steerable) stub LLM
+    RESULTS = [{"url": "https://example.com", "content": "Stub Hotel, rates on request, City Center"}]
+
+    def invoke(self, query):
+        time.sleep(PROVIDER_LATENCY)
+        return self.RESULTS
+
+    async def ainvoke(self, query):
+        await asyncio.sleep(PROVIDER_LATENCY)
+        return self.RESULTS
+
+@pytest.fixture
+def stub_providers(monkeypatch):
+    """Swaps Groq and Tavily for stubs. Exposes the stub LLM and the per-call latency."""
+    llm = StubLLM()
+    monkeypatch.setattr(providers, "_llm", llm)
+    monkeypatch.setattr(providers, "_search_tool", StubSearch())
+    # Fresh, always-expired cache: every request pays the full search latency
+    monkeypatch.setattr(tools, "search_cache", SearchCache(ttl=0))
+    # Same for whole plans: every /plan-trip runs the graph
+    monkeypatch.setattr(api, "plan_cache", PlanCache(ttl=0))
+    return SimpleNamespace(llm=llm, latency=PROVIDER_LATENCY)
@@ -0,0 +1,143 @@
+import json
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from src.api import app as api_app
+
+@pytest.fixture(scope="module")
+def client():
+    # Context manager runs the app lifespan, which closes the checkpoint DB
+    with TestClient(api_app) as client:
+        yield client
+
+FAR_HOTEL = {"name": "Airport Lodge", "price": 80, "location": "Suburbs"}
+
+PAYLOAD = {"destination": "Paris", "total_budget": 2000, "days": 5}
+
+# --- HELPER: SSE PARSER ---
+def read_events(response):
+    events = []
+    for block in response.text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+# --- TEST: STREAMING ENDPOINT ---
+
+def test_stream_emits_one_event_per_node(client, stub_providers):
+    response = client.post("/plan-trip/stream", json=PAYLOAD)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = read_events(response)
+    assert [data["node"] for kind, data in events if kind == "node"] == ["scout", "budget", "planner"]
+
+    scout_event = events[0][1]
+    assert scout_event["status"] == "PROPOSED"
+    assert scout_event["proposal"]["name"] == "Stub Hotel"
+
+def test_stream_ends_with_plan_trip_result(client, stub_providers):
+    events = read_events(client.post("/plan-trip/stream", json=PAYLOAD))
+    kind, result = events[-1]
+    expected = client.post("/plan-trip", json=PAYLOAD).json()
+
+    assert kind == "result"
+    assert result.pop("run_id") != expected.pop("run_id")
+    assert result == expected
+
+# --- TEST: HUMAN-IN-THE-LOOP RESUME ---
+
+def test_deadlock_pauses_and_resumes_on_approval(client, stub_providers):
+    stub_providers.llm.hotel = FAR_HOTEL  # Budget likes it, Planner never will
+    paused = client.post("/plan-trip", json=PAYLOAD).json()
+
+    assert paused["status"] == "WAITING_FOR_HUMAN"
+    assert paused["itinerary"]["name"] == "Airport Lodge"
+
+    # Resuming must not touch the providers again
+    stub_providers.llm.hotel = None
+    resumed = client.post(f"/plan-trip/{paused['run_id']}/decision", json={"decision": "approve"})
+
+    assert resumed.status_code == 200
+    assert resumed.json()["status"] == "APPROVED"
+    assert resumed.json()["itinerary"]["name"] == "Airport Lodge"
+    assert "Human overruled the agents." in resumed.json()["logs"]
+
+def test_quit_decision_rejects_the_run(client, stub_providers):
+    stub_providers.llm.hotel = FAR_HOTEL
+    paused = client.post("/plan-trip", json=PAYLOAD).json()
+
+    resumed = client.post(f"/plan-trip/{paused['run_id']}/decision", json={"decision": "quit"}).json()
+
+    assert resumed["status"] == "REJECTED"
+
+def test_decision_requires_a_waiting_run(client, stub_providers):
+    approved = client.post("/plan-trip", json=PAYLOAD).json()
+
+    assert client.post(f"/plan-trip/{approved['run_id']}/decision", json={"decision": "approve"}).status_code == 409
+    assert client.post("/plan-trip/no-such-run/decision", json={"decision": "approve"}).status_code == 404
+
+# --- TEST: BATCH ENDPOINT ---
+
+BATCH = [
+    {"destination": "Paris", "total_budget": 2000, "days": 5},
+    {"destination": "Rome", "total_budget": 2500, "days": 5},
+    {"destination": "paris ", "total_budget": 3000, "days": 5},
+    {"destination": "Paris", "total_budget": 100, "days": 5},   # can't even cover food
+    {"destination": "Rome", "total_budget": 4000, "days": 4},
+    {"destination": "Paris", "total_budget": 5000, "days": 3},
+]
+
+@pytest.fixture
+def searches(stub_providers, monkeypatch):
+    from src import providers
+    queries = []
+    search = providers._search_tool
+
+    class CountingSearch:
+        async def ainvoke(self, payload):
+            queries.append(payload["query"])
+            return await search.ainvoke(payload)
+
+    monkeypatch.setattr(providers, "_search_tool", CountingSearch())
+    return queries
+
+def test_batch_shares_one_search_per_destination(client, searches):
+    results = client.post("/plan-trips", json=BATCH).json()
+
+    assert [r["destination"] for r in results] == [t["destination"] for t in BATCH]
+    assert [r["status"] for r in results] == ["APPROVED", "APPROVED", "APPROVED", "INFEASIBLE", "APPROVED", "APPROVED"]
+    assert len(searches) == 2  # luxury Paris, luxury Rome -- not one per trip
+
+def test_batch_streams_ndjson_as_trips_finish(client, searches):
+    response = client.post("/plan-trips?stream=true", json=BATCH)
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert sorted(line["index"] for line in lines) == list(range(len(BATCH)))
+    assert all(line["destination"] == BATCH[line["index"]]["destination"] for line in lines)
+
+def test_batch_size_is_capped(client, monkeypatch):
+    monkeypatch.setattr("src.api.MAX_BATCH_TRIPS", 2)
+    assert client.post("/plan-trips", json=BATCH).status_code == 413
+
+def test_queued_batch_trips_keep_their_whole_deadline(client, stub_providers, monkeypatch):
+    # One slot, six distinct searches: the last trip queues for ~5x its own deadline
+    monkeypatch.setattr("src.api.negotiation_slots", asyncio.Semaphore(1))
+    batch = [{"destination": f"City {i}", "total_budget": 2000, "days": 5, "deadline_seconds": 0.3}
+             for i in range(6)]
+
+    results = client.post("/plan-trips", json=batch).json()
+
+    assert [r["status"] for r in results] == ["APPROVED"] * 6
+
+# --- TEST: EVENT LOG ---
+
+def test_run_events_come_from_the_checkpoint(client, stub_providers):
+    run = client.post("/plan-trip", json=PAYLOAD).json()
+    events = client.get(f"/plan-trip/{run['run_id']}/events").json()["events"]
+
+    assert [(e["node"], e["status"]) for e in events] == [
+        ("scout", "PROPOSED"), ("budget", "BUDGET_APPROVED"), ("planner", "APPROVED")]
+    assert client.get("/plan-trip/no-such-run/events").status_code == 404
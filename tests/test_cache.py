@@ -0,0 +1,120 @@
+import threading
+import pytest
+from src.cache import SearchCache, make_key
+
+# --- HELPER: CONTROLLABLE CLOCK ---
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+RESULTS = [{"url": "https://example.com", "content": "Hotel Lumiere, $120 per night"}]
+
+def test_key_normalization():
+    assert make_key("Luxury", "  New   York ") == make_key("luxury", "new york")
+    assert make_key("luxury", "Paris") != make_key("budget", "Paris")
+
+def test_hit_and_miss_counters():
+    cache = SearchCache()
+    key = make_key("budget", "Paris")
+
+    assert cache.get(key) is None
+    cache.set(key, RESULTS)
+    assert cache.get(key) == RESULTS
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    cache = SearchCache(ttl=60, clock=clock)
+    cache.set("k", RESULTS)
+
+    clock.now += 59
+    assert cache.get("k") == RESULTS
+    clock.now += 2
+    assert cache.get("k") is None
+    assert cache.stats()["size"] == 0
+
+def test_lru_eviction():
+    cache = SearchCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")       # 'a' is now the most recently used
+    cache.set("c", 3)    # evicts 'b'
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+def test_sqlite_backend_survives_restart(tmp_path):
+    db_path = str(tmp_path / "search_cache.db")
+    first = SearchCache(db_path=db_path)
+    first.set(make_key("luxury", "Rome"), RESULTS)
+    first.flush()  # written by a background thread
+
+    # A new instance (new process) reads the entry back from disk
+    second = SearchCache(db_path=db_path)
+    assert second.get(make_key("luxury", "Rome")) == RESULTS
+    assert second.stats()["persistent"] is True
+
+def test_sqlite_backend_respects_size_limit(tmp_path):
+    db_path = str(tmp_path / "search_cache.db")
+    cache = SearchCache(max_entries=1, db_path=db_path)
+    cache.set("old", 1)
+    cache.set("new", 2)
+    cache.flush()
+
+    reloaded = SearchCache(max_entries=1, db_path=db_path)
+    assert reloaded.get("old") is None
+    assert reloaded.get("new") == 2
+
+def test_sqlite_hits_do_not_write(tmp_path):
+    clock = FakeClock()
+    cache = SearchCache(max_entries=2, db_path=str(tmp_path / "search_cache.db"), clock=clock)
+    cache.set("a", 1)
+    clock.now += 1
+    cache.set("b", 2)
+    cache.flush()
+    writes = cache._db.total_changes
+
+    for _ in range(50):
+        clock.now += 1
+        assert cache.get("a") == 1
+    assert cache._db.total_changes == writes
+
+    cache.set("c", 3)  # the hits on 'a' are recorded first, so 'b' is the one evicted on disk
+    cache.flush()
+    reloaded = SearchCache(max_entries=2, db_path=str(tmp_path / "search_cache.db"), clock=clock)
+    assert reloaded.get("a") == 1
+    assert reloaded.get("b") is None
+
+def test_sqlite_writes_happen_off_the_calling_thread(tmp_path):
+    cache = SearchCache(db_path=str(tmp_path / "search_cache.db"))
+    writers = []
+
+    def trace(sql):
+        if sql.startswith(("INSERT", "COMMIT")):
+            writers.append(threading.current_thread().name)
+    cache._db.set_trace_callback(trace)
+
+    cache.set("k", RESULTS)
+    cache.flush()
+
+    assert writers and all(name.startswith("search-cache-writer") for name in writers)
+
+def test_loading_from_disk_respects_the_memory_bound(tmp_path):
+    db_path = str(tmp_path / "search_cache.db")
+    writer = SearchCache(max_entries=3, db_path=db_path)
+    for key in "abc":
+        writer.set(key, key)
+    writer.flush()
+
+    reader = SearchCache(max_entries=2, db_path=db_path)
+    for key in "abc":
+        assert reader.get(key) == key
+    assert reader.stats()["size"] == 2
@@ -0,0 +1,147 @@
+import time
+import asyncio
+import httpx
+import pytest
+from benchmarks.fake_provider import FakeProvider
+from src import metrics
+from src.clients import (Resilient, CircuitBreaker, CircuitOpen, LatencyWindow, PerLoop, TavilySearch,
+                         http_client, async_http_client)
+
+QUERY = {"query": "budget hotels in Paris price per night"}
+
+def tavily(fake, timeout=2.0):
+    return TavilySearch(api_key="test", base_url=fake.url, timeout=timeout)
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr("src.clients.RETRY_BASE_MS", 1.0)
+
+# --- TEST 1: RETRIES AND TIMEOUTS ---
+
+def test_5xx_is_retried():
+    with FakeProvider(error=lambda n: 503 if n == 1 else None) as fake:
+        results = Resilient(tavily(fake), "tavily", timeout=2).invoke(QUERY)
+    assert results[0]["title"] == "Fake Hotel"
+    assert fake.requests == 2
+
+def test_client_errors_are_not_retried():
+    with FakeProvider(error=lambda n: 400) as fake:
+        with pytest.raises(httpx.HTTPStatusError):
+            Resilient(tavily(fake), "tavily", timeout=2).invoke(QUERY)
+    assert fake.requests == 1
+
+def test_async_timeout_cancels_and_retries():
+    with FakeProvider(latency=lambda n: 1.0 if n == 1 else 0.0) as fake:
+        start = time.perf_counter()
+        results = asyncio.run(Resilient(tavily(fake), "tavily", timeout=0.2).ainvoke(QUERY))
+        elapsed = time.perf_counter() - start
+    assert results and elapsed < 0.8
+
+def test_pooled_client_reuses_connections():
+    with FakeProvider() as fake:
+        client = tavily(fake)
+        for _ in range(10):
+            client.invoke(QUERY)
+    assert fake.requests == 10
+    assert len(fake.client_ports) == 1
+    assert http_client() is http_client()
+
+# --- TEST 2: CIRCUIT BREAKER ---
+
+def test_breaker_fails_fast_then_recovers():
+    now = [0.0]
+    breaker = CircuitBreaker("tavily", failures=2, reset_after=30, clock=lambda: now[0])
+    down = [True]
+    with FakeProvider(error=lambda n: 500 if down[0] else None) as fake:
+        client = Resilient(tavily(fake), "tavily", timeout=2, retries=0, breaker=breaker)
+        for _ in range(2):
+            with pytest.raises(httpx.HTTPStatusError):
+                client.invoke(QUERY)
+        assert breaker.state == "open"
+        with pytest.raises(CircuitOpen):
+            client.invoke(QUERY)
+        assert fake.requests == 2  # the open circuit never reached the server
+
+        down[0] = False
+        now[0] = 31  # half-open: one trial call goes through and closes it
+        assert client.invoke(QUERY)
+        assert breaker.state == "closed"
+
+def test_cancelled_trial_does_not_wedge_the_breaker():
+    now = [0.0]
+    breaker = CircuitBreaker("tavily", failures=1, reset_after=30, clock=lambda: now[0])
+    down = [True]
+    with FakeProvider(error=lambda n: 500 if down[0] else None,
+                      latency=lambda n: 1.0 if n == 2 else 0.0) as fake:
+        client = Resilient(tavily(fake), "tavily", timeout=5, retries=0, breaker=breaker)
+
+        async def scenario():
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.ainvoke(QUERY)
+            down[0] = False
+            now[0] = 31
+            with pytest.raises(asyncio.TimeoutError):  # e.g. the run's deadline cancels the trial
+                await asyncio.wait_for(client.ainvoke(QUERY), timeout=0.1)
+            return await client.ainvoke(QUERY)
+
+        assert asyncio.run(scenario())
+    assert breaker.state == "closed"
+
+def test_client_error_during_trial_closes_the_breaker():
+    now = [0.0]
+    breaker = CircuitBreaker("tavily", failures=1, reset_after=30, clock=lambda: now[0])
+    with FakeProvider(error=lambda n: 500 if n == 1 else 400) as fake:
+        client = Resilient(tavily(fake), "tavily", timeout=2, retries=0, breaker=breaker)
+        with pytest.raises(httpx.HTTPStatusError):
+            client.invoke(QUERY)
+        now[0] = 31
+        with pytest.raises(httpx.HTTPStatusError):  # the 400: the provider answered
+            client.invoke(QUERY)
+    assert breaker.state == "closed"
+
+# --- TEST 3: HEDGING ---
+
+def test_slow_call_is_hedged():
+    hedges = metrics.PROVIDER_HEDGES.value(provider="tavily")
+    # Warm-up calls are fast; call 6 hangs, its hedged copy (call 7) is fast
+    with FakeProvider(latency=lambda n: 2.0 if n == 6 else 0.01) as fake:
+        client = Resilient(tavily(fake), "tavily", timeout=5, hedge_percentile=90,
+                           window=LatencyWindow(min_samples=5))
+
+        async def scenario():
+            for _ in range(5):
+                await client.ainvoke(QUERY)
+            start = time.perf_counter()
+            await client.ainvoke(QUERY)
+            return time.perf_counter() - start
+
+        assert asyncio.run(scenario()) < 0.5
+    assert metrics.PROVIDER_HEDGES.value(provider="tavily") == hedges + 1
+
+# --- TEST 4: GROQ THROUGH THE SAME LAYER ---
+
+def test_groq_client_retries_against_fake_server():
+    from langchain_core.messages import HumanMessage
+    from langchain_groq import ChatGroq
+    with FakeProvider(error=lambda n: 503 if n == 1 else None) as fake:
+        chat = ChatGroq(model="fake", api_key="test", base_url=fake.url, max_retries=0, http_client=http_client())
+        response = Resilient(chat, "groq", timeout=5).invoke([HumanMessage(content="hi")])
+    assert "Fake Hotel" in response.content
+    assert fake.requests == 2
+
+def test_async_groq_calls_use_the_loops_pool():
+    from langchain_core.messages import HumanMessage
+    from langchain_groq import ChatGroq
+    with FakeProvider() as fake:
+        chat = PerLoop(lambda async_client: ChatGroq(model="fake", api_key="test", base_url=fake.url, max_retries=0,
+                                                     http_client=http_client(), http_async_client=async_client))
+
+        async def scenario():
+            for _ in range(3):
+                response = await Resilient(chat, "groq", timeout=5).ainvoke([HumanMessage(content="hi")])
+            pooled = next(iter(chat._per_loop.values())).async_client._client._client
+            return response, pooled is async_http_client()
+
+        response, pooled = asyncio.run(scenario())
+    assert "Fake Hotel" in response.content and pooled
+    assert len(fake.client_ports) == 1
@@ -0,0 +1,142 @@
+import asyncio
+import httpx
+import pytest
+from src import metrics
+from src.api import app as api_app
+from src.checkpoint import close_checkpointed_graph
+from src.coalesce import SingleFlight, trip_key
+
+PAYLOAD = {"destination": "Paris", "total_budget": 2000, "days": 5}
+
+# --- TEST 1: SINGLE FLIGHT ---
+
+def test_concurrent_calls_share_one_run():
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+        return flight, results
+
+    flight, results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert [r for r, _ in results] == ["result"] * 5
+    assert [shared for _, shared in results].count(False) == 1
+    assert len(flight) == 0  # finished calls are forgotten
+
+def test_errors_reach_every_waiter():
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("provider down")
+
+    async def scenario():
+        flight = SingleFlight()
+        return await asyncio.gather(*(flight.do("k", boom) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in asyncio.run(scenario()))
+
+def test_budget_bucketing_widens_the_key():
+    assert trip_key(" Paris", 2000, 5, budget_bucket=0) == trip_key("paris", 2000, 5, budget_bucket=0)
+    assert trip_key("New  York", 2000, 5) == trip_key("new york", 2000, 5)
+    assert trip_key("Paris", 2000, 5, deadline_seconds=5) != trip_key("Paris", 2000, 5)
+    assert trip_key("Paris", 2000, 5, budget_bucket=0) != trip_key("Paris", 2050, 5, budget_bucket=0)
+    assert trip_key("Paris", 2000, 5, budget_bucket=100) == trip_key("Paris", 2050, 5, budget_bucket=100)
+    assert trip_key("Paris", 2000, 5, budget_bucket=100) != trip_key("Paris", 2000, 4, budget_bucket=100)
+
+def test_followers_only_join_runs_they_can_afford():
+    started = []
+
+    def work(budget):
+        async def run():
+            started.append(budget)
+            await asyncio.sleep(0.01)
+            return budget
+        return run
+
+    async def scenario():
+        flight = SingleFlight()
+        key = trip_key("Paris", 2000, 5, budget_bucket=100)
+        leader = asyncio.ensure_future(flight.do(key, work(2050), budget=2050))
+        await asyncio.sleep(0)
+        return await asyncio.gather(leader, flight.do(key, work(2000), budget=2000),
+                                    flight.do(key, work(2099), budget=2099))
+
+    results = asyncio.run(scenario())
+    assert results == [(2050, False), (2000, False), (2050, True)]  # $2000 never gets the $2050 plan
+    assert started == [2050, 2000]
+
+def test_larger_budgets_only_reuse_approved_results():
+    started = []
+
+    def work(budget, status):
+        async def run():
+            started.append(budget)
+            await asyncio.sleep(0.01)
+            return {"budget": budget, "status": status}
+        return run
+
+    async def scenario(status):
+        flight = SingleFlight()
+        key = trip_key("Paris", 2000, 5, budget_bucket=100)
+        approved = lambda body: body["status"] == "APPROVED"
+        leader = asyncio.ensure_future(flight.do(key, work(2000, status), budget=2000, reusable=approved))
+        await asyncio.sleep(0)
+        twin = flight.do(key, work(2000, status), budget=2000, reusable=approved)
+        richer = flight.do(key, work(2050, status), budget=2050, reusable=approved)
+        return [(body["budget"], shared) for body, shared in await asyncio.gather(leader, twin, richer)]
+
+    assert asyncio.run(scenario("APPROVED")) == [(2000, False), (2000, True), (2000, True)]
+    started.clear()
+    # A stall at $2000 is reused by the $2000 twin, but $2050 negotiates for itself
+    assert asyncio.run(scenario("WAITING_FOR_HUMAN")) == [(2000, False), (2000, True), (2050, False)]
+    assert started == [2000, 2050]
+
+# --- TEST 2: API BURST ---
+
+async def _burst(payloads):
+    transport = httpx.ASGITransport(app=api_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        responses = await asyncio.gather(*(client.post("/plan-trip", json=p) for p in payloads))
+    await close_checkpointed_graph()
+    return [r.json() for r in responses]
+
+def test_identical_burst_runs_one_negotiation(stub_providers):
+    extractions = metrics.LLM_CALLS.value(purpose="extraction")
+    coalesced = metrics.COALESCED.value()
+
+    results = asyncio.run(_burst([PAYLOAD] * 8))
+
+    assert len({r["run_id"] for r in results}) == 1
+    assert all(r["status"] == "APPROVED" for r in results)
+    assert metrics.LLM_CALLS.value(purpose="extraction") - extractions == 1
+    assert metrics.COALESCED.value() - coalesced == 7
+
+def test_different_trips_are_not_coalesced(stub_providers):
+    results = asyncio.run(_burst([PAYLOAD, {**PAYLOAD, "destination": "Rome"}]))
+    assert results[0]["run_id"] != results[1]["run_id"]
+
+def test_paused_burst_gives_every_caller_its_own_run(stub_providers):
+    stub_providers.llm.hotel = {"name": "Airport Lodge", "price": 80, "location": "Suburbs"}
+    coalesced = metrics.COALESCED.value()
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=api_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            paused = await asyncio.gather(*(client.post("/plan-trip", json=PAYLOAD) for _ in range(3)))
+            paused = [r.json() for r in paused]
+            decisions = [await client.post(f"/plan-trip/{p['run_id']}/decision", json={"decision": d})
+                         for p, d in zip(paused, ("quit", "approve", "approve"))]
+        await close_checkpointed_graph()
+        return paused, [r.json()["status"] for r in decisions]
+
+    paused, decided = asyncio.run(scenario())
+
+    assert all(p["status"] == "WAITING_FOR_HUMAN" for p in paused)
+    assert len({p["run_id"] for p in paused}) == 3  # one quit cannot end the others' runs
+    assert decided == ["REJECTED", "APPROVED", "APPROVED"]
+    assert metrics.COALESCED.value() - coalesced == 2  # still one negotiation
@@ -0,0 +1,86 @@
+import pytest
+from fastapi.testclient import TestClient
+from src import metrics, tools
+from src.agents import scout_agent, planner_agent
+from src.api import app as api_app
+from src.constraints import envelope, infeasible_reason
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(api_app) as client:
+        yield client
+
+def make_state(budget, days=5):
+    return {
+        "destination": "Paris", "total_budget": budget, "days": days,
+        "retry_count": 0, "messages": [], "candidates": [],
+        "rejection_reason": None, "plan_status": "IN_PROGRESS", "human_decision": None,
+    }
+
+# --- TEST 1: THE ENVELOPE MATCHES THE AGENTS' OWN CHECKS ---
+
+def test_max_nightly_is_the_last_price_calculate_total_accepts():
+    env = envelope(1500, 5)
+    assert env.max_nightly == 200
+    assert tools.calculate_total.invoke({"hotel_price": env.max_nightly, "days": 5}) <= 1500
+    assert tools.calculate_total.invoke({"hotel_price": env.max_nightly + 1, "days": 5}) > 1500
+
+def test_envelope_allows_only_close_affordable_hotels():
+    env = envelope(1500, 5)
+    assert env.locations == ("City Center",)
+    assert env.allows({"name": "A", "price": 200, "location": "City Center"})
+    assert not env.allows({"name": "B", "price": 201, "location": "City Center"})
+    assert not env.allows({"name": "C", "price": 50, "location": "Suburbs"})
+    assert env.query_ceiling == 200 and envelope(1510, 5).query_ceiling == 250
+
+def test_envelope_measures_distance_like_the_planner():
+    # Labelled "City Center", but the name places it in Versailles: the Planner would reject it
+    far = {"name": "Versailles Palace Inn", "price": 150, "location": "City Center"}
+    near = {"name": "Hotel Lumiere", "price": 150, "location": "City Center"}
+    env = envelope(1500, 5, destination="Paris")
+
+    assert not env.allows(far) and env.allows(near)
+    assert env.filter([far, near]) == [near]
+    assert envelope(1500, 5).allows(far)  # no destination: the label alone decides
+    assert planner_agent({"destination": "Paris", "current_proposal": far, "candidates": []})["plan_status"] == "REJECTED"
+
+def test_budget_below_food_is_infeasible():
+    assert not envelope(500, 5).feasible
+    assert envelope(505, 5).feasible
+
+def test_infeasible_reason_names_what_runs_out():
+    assert "cannot cover food" in infeasible_reason(400, 5)
+    assert infeasible_reason(500, 5) == "Budget $500 covers food for 5 days ($500) but leaves nothing for 5 hotel nights."
+    assert "leaves only $4 for 5 hotel nights" in infeasible_reason(504, 5)
+
+# --- TEST 2: THE SCOUT USES IT ---
+
+def test_first_pass_skips_a_tier_that_cannot_fit(monkeypatch):
+    searched = []
+
+    def fake_search(tier, destination, fallback=True, env=None):
+        searched.append((tier, env.query_ceiling))
+        price = 450 if tier == "luxury" else 150
+        return [{"name": f"{tier} hotel", "price": price, "location": "City Center"}]
+
+    import src.agents as agents
+    monkeypatch.setattr(agents, "_search_and_extract", fake_search)
+
+    result = scout_agent(make_state(1500))
+
+    assert searched == [("luxury", 200), ("budget", 200)]
+    assert result["current_proposal"]["name"] == "budget hotel"
+    assert result["candidates"] == []
+
+def test_infeasible_request_stops_without_provider_calls(client, stub_providers):
+    extractions = metrics.LLM_CALLS.value(purpose="extraction")
+
+    body = client.post("/plan-trip", json={"destination": "Paris", "total_budget": 300, "days": 5}).json()
+
+    assert body["status"] == "INFEASIBLE"
+    assert "cannot cover food" in body["logs"][-1]
+    assert metrics.LLM_CALLS.value(purpose="extraction") == extractions
+
+def test_search_query_carries_the_price_ceiling():
+    assert tools.hotel_query("budget", "Paris", 200) == "budget hotels in Paris price per night under $200"
+    assert tools.hotel_query("budget", "Paris") == "budget hotels in Paris price per night"
@@ -0,0 +1,83 @@
+import time
+import asyncio
+from fastapi.testclient import TestClient
+from src import api, providers
+from src.deadline import best_so_far, aguarded_node, PARTIAL, TIMED_OUT
+from src.graph import _route, get_app
+
+def make_state(deadline, proposal=None, candidates=()):
+    return {
+        "destination": "Test City", "total_budget": 1000, "days": 5,
+        "retry_count": 1, "messages": [], "candidates": list(candidates),
+        "current_proposal": proposal, "rejection_reason": None,
+        "plan_status": "BUDGET_APPROVED", "human_decision": None, "deadline": deadline,
+    }
+
+def hotel(name, price, location="City Center"):
+    return {"name": name, "price": price, "location": location}
+
+# --- TEST 1: BEST SO FAR ---
+
+def test_best_so_far_is_the_valid_hotel_closest_to_budget():
+    # $1000 for 5 days leaves $100/night after food
+    state = make_state(None, hotel("Pricey", 150), [
+        hotel("Cheap", 60), hotel("Good", 95), hotel("Far", 99, "Suburbs"),
+        {**hotel("Measured Far", 98), "travel_minutes": 40},
+    ])
+    assert best_so_far(state)["name"] == "Good"
+    assert best_so_far(make_state(None, hotel("Pricey", 150))) is None
+
+def test_router_stops_an_expired_run():
+    assert _route(make_state(time.time() - 1)) == "deadline"
+    assert _route(make_state(time.time() + 60)) == "planner"
+    assert _route({**make_state(time.time() - 1), "plan_status": "APPROVED"}) == "done"
+
+def test_expired_run_returns_best_so_far_without_searching():
+    state = make_state(time.time() - 1, hotel("Pricey", 150), [hotel("Good", 95)])
+    state["plan_status"] = "REJECTED"
+    final = get_app().invoke(state)
+    assert final["plan_status"] == PARTIAL
+    assert final["current_proposal"]["name"] == "Good"
+    assert final["current_proposal"]["total_cost"] == 975
+
+# --- TEST 2: CANCELLATION ---
+
+def test_slow_node_is_cancelled_at_the_deadline():
+    cancelled = []
+
+    async def slow(state):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    state = make_state(time.time() + 0.1, hotel("Good", 95))
+    start = time.perf_counter()
+    result = asyncio.run(aguarded_node(slow)(state))
+    assert time.perf_counter() - start < 1
+    assert cancelled and result["plan_status"] == PARTIAL
+
+class HangingLLM:
+    def __init__(self):
+        self.cancelled = 0
+
+    async def ainvoke(self, messages):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+def test_api_deadline_bounds_latency(stub_providers, monkeypatch):
+    llm = HangingLLM()
+    monkeypatch.setattr(providers, "_llm", llm)
+    with TestClient(api.app) as client:
+        start = time.perf_counter()
+        response = client.post("/plan-trip", json={
+            "destination": "Paris", "total_budget": 2000, "days": 5, "deadline_seconds": 0.3})
+        elapsed = time.perf_counter() - start
+    assert response.status_code == 200
+    assert response.json()["status"] == TIMED_OUT
+    assert elapsed < 1.5
+    assert llm.cancelled == 1
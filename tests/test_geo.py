@@ -0,0 +1,63 @@
+import time
+import numpy as np
+from src import geo
+from src.agents import planner_agent
+from src.tools import check_distance
+
+def hotel(name, location, price=150):
+    return {"name": name, "price": price, "location": location}
+
+# --- TEST 1: DISTANCES ---
+
+def test_haversine_matches_known_distance_in_one_batch():
+    paris, london = [48.8566, 2.3522], [51.5074, -0.1278]
+    km = geo.haversine_km([paris, london], [london, paris, paris])
+    assert km.shape == (2, 3)
+    assert 335 < km[0, 0] < 350  # Paris -> London is ~344 km
+    assert km[0, 1] == 0 and np.isclose(km[0, 0], km[1, 1])
+
+def test_geohash_index_finds_only_nearby_points():
+    index = geo.GeoIndex()
+    index.add(48.8584, 2.2945, "eiffel")
+    index.add(51.5007, -0.1246, "big ben")
+    assert [item for _, item in index.near(48.8566, 2.3522, 25)] == ["eiffel"]
+
+# --- TEST 2: LABEL FALLBACK KEEPS THE OLD ANSWERS ---
+
+def test_unknown_city_uses_location_labels():
+    assert check_distance.invoke({"hotel_location": "Suburbs"}) == 45
+    assert check_distance.invoke({"hotel_location": "City Center"}) == 5
+    assert check_distance.invoke({"hotel_location": "Riverside", "city": "Atlantis"}) == 20
+
+def test_known_city_uses_neighborhood_coordinates():
+    annotated = geo.annotate([hotel("Palace Hotel Versailles", "City Center"), hotel("Marais Inn", "Le Marais")], "paris, France")
+    versailles, marais = annotated
+    assert versailles["travel_minutes"] > 30  # the name places it outside Paris
+    assert marais["travel_minutes"] < 30
+    assert marais["sightseeing_minutes"] < versailles["sightseeing_minutes"]
+
+# --- TEST 3: PLANNER RANKS THE POOL ---
+
+def test_planner_rejection_ranks_pool_by_sightseeing_distance():
+    state = {
+        "destination": "Paris", "plan_status": "PROPOSED", "human_decision": None,
+        "current_proposal": hotel("Airport Lodge", "Suburbs", 90),
+        "candidates": [hotel("Far Inn", "Suburbs", 80), hotel("Cheap Central", "City Center", 120),
+                       hotel("Marais Inn", "Le Marais", 110)],
+    }
+    result = planner_agent(state)
+    assert result["plan_status"] == "REJECTED"
+    assert result["current_proposal"]["travel_minutes"] == 45
+    names = [c["name"] for c in result["candidates"]]
+    assert names[-1] == "Far Inn"
+    assert all("sightseeing_minutes" in c for c in result["candidates"])
+
+def test_batch_lookup_is_sub_millisecond():
+    candidates = [hotel(f"Hotel {i}", ("City Center", "Suburbs", "Le Marais")[i % 3]) for i in range(20)]
+    geo.annotate(candidates, "Paris")  # loads the dataset
+    timings = []
+    for _ in range(20):
+        start = time.perf_counter()
+        geo.annotate(candidates, "Paris")
+        timings.append(time.perf_counter() - start)
+    assert min(timings) < 0.001
@@ -0,0 +1,98 @@
+import time
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from src.api import app as api_app
+from src.itinerary import split_budget, rebalance
+from src.state import merge_legs
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(api_app) as client:
+        yield client
+
+THREE_CITIES = {"total_budget": 6000, "legs": [
+    {"destination": "Paris", "days": 3}, {"destination": "Rome", "days": 3}, {"destination": "Oslo", "days": 4},
+]}
+
+def leg(index, status, budget, total_cost=0, days=3):
+    return {"index": index, "status": status, "budget": budget, "total_cost": total_cost, "days": days, "round": 0}
+
+# --- TEST 1: BUDGET SPLIT AND REDUCER ---
+
+def test_budget_is_split_by_days():
+    assert split_budget(6000, [3, 3, 4]) == [1800, 1800, 2400]
+    assert sum(split_budget(1001, [1, 1, 1])) == 1001
+
+def test_reducer_keeps_the_latest_result_per_leg():
+    merged = merge_legs([leg(0, "APPROVED", 100), leg(1, "REJECTED", 100)], [leg(1, "APPROVED", 150)])
+    assert [(r["index"], r["status"]) for r in merged] == [(0, "APPROVED"), (1, "APPROVED")]
+
+def test_rebalance_moves_unspent_budget_to_failed_legs():
+    state = {
+        "allocations": [1800, 1800, 2400], "round": 0,
+        "leg_results": [leg(0, "APPROVED", 1800, 1000), leg(1, "WAITING_FOR_HUMAN", 1800), leg(2, "APPROVED", 2400, 2400, 4)],
+    }
+
+    update = rebalance(state)
+
+    assert update["pending"] == [1]
+    assert update["allocations"] == [1000, 2600, 2400]
+    assert rebalance({**state, "round": 1}) == {"pending": []}
+
+# --- TEST 2: API ---
+
+def test_legs_run_in_parallel(client, stub_providers):
+    start = time.perf_counter()
+    body = client.post("/plan-itinerary", json=THREE_CITIES).json()
+    elapsed = time.perf_counter() - start
+
+    assert body["status"] == "APPROVED"
+    assert [l["destination"] for l in body["legs"]] == ["Paris", "Rome", "Oslo"]
+    assert [l["budget"] for l in body["legs"]] == [1800, 1800, 2400]
+    assert body["total_cost"] <= body["total_budget"]
+    # One leg makes two provider calls (search + extraction); three sequential legs would take six
+    assert elapsed < stub_providers.latency * 5
+
+def test_every_leg_takes_a_negotiation_slot(client, stub_providers, monkeypatch):
+    monkeypatch.setattr("src.api.negotiation_slots", asyncio.Semaphore(1))
+    start = time.perf_counter()
+    body = client.post("/plan-itinerary", json=THREE_CITIES).json()
+    elapsed = time.perf_counter() - start
+
+    assert body["status"] == "APPROVED"
+    # One slot: the three legs (two provider calls each) run one after another
+    assert elapsed >= stub_providers.latency * 6
+
+def test_no_rebalance_when_every_leg_fits(client, stub_providers):
+    # $1300 per leg covers 2 x ($300 + $100 food)
+    stub_providers.llm.hotel = {"name": "Pricey Place", "price": 300, "location": "City Center"}
+    body = client.post("/plan-itinerary", json={"total_budget": 2600, "legs": [
+        {"destination": "Paris", "days": 2}, {"destination": "Rome", "days": 2},
+    ]}).json()
+
+    assert body["status"] == "APPROVED"
+    assert body["rebalance_rounds"] == 0
+
+class PerCitySearch:
+    """Search results the local parser can read, with a different hotel per city."""
+    HOTELS = {"Paris": ("Paris Hostel", 50), "Rome": ("Rome Palace", 500)}
+
+    async def ainvoke(self, payload):
+        city = "Rome" if "Rome" in payload["query"] else "Paris"
+        name, price = self.HOTELS[city]
+        return [{"title": name, "content": f"{name} - ${price} per night, located in the City Center."}]
+
+def test_rebalancing_rescues_an_underfunded_leg(client, stub_providers, monkeypatch):
+    from src import providers
+    monkeypatch.setattr(providers, "_search_tool", PerCitySearch())
+    body = client.post("/plan-itinerary", json={"total_budget": 2000, "legs": [
+        {"destination": "Paris", "days": 2}, {"destination": "Rome", "days": 2},
+    ]}).json()
+
+    paris, rome = body["legs"]
+    assert body["rebalance_rounds"] == 1
+    assert paris["status"] == "APPROVED" and not paris["rebalanced"]
+    assert rome["status"] == "APPROVED" and rome["rebalanced"]
+    assert rome["budget"] == 1000 + (1000 - 300)  # Paris spent 2 x ($50 + $100)
+    assert body["total_cost"] <= 2000
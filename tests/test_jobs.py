@@ -0,0 +1,115 @@
+import time
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from src import api
+from src.jobs import JobQueue, QueueFull, DONE, FAILED, QUEUED
+
+PAYLOAD = {"destination": "Paris", "total_budget": 2000, "days": 5}
+
+async def wait_for(queue, job_id, status, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = await queue.get(job_id)
+        if job["status"] == status:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} never reached {status}")
+
+# --- TEST 1: WORKERS ---
+
+def test_worker_runs_job_and_stores_result(tmp_path):
+    async def handler(request):
+        return {"destination": request["destination"], "status": "APPROVED"}
+
+    async def scenario():
+        queue = JobQueue(handler, path=str(tmp_path / "jobs.db"), workers=2)
+        await queue.start()
+        job = await queue.submit(PAYLOAD)
+        assert job["status"] == QUEUED
+        done = await wait_for(queue, job["id"], DONE)
+        await queue.stop()
+        return done
+
+    done = asyncio.run(scenario())
+    assert done["result"] == {"destination": "Paris", "status": "APPROVED"}
+    assert done["attempts"] == 1 and done["finished_at"] >= done["started_at"]
+
+def test_handler_errors_fail_the_job(tmp_path):
+    async def handler(request):
+        raise RuntimeError("provider down")
+
+    async def scenario():
+        queue = JobQueue(handler, path=str(tmp_path / "jobs.db"), workers=1)
+        await queue.start()
+        job = await queue.submit(PAYLOAD)
+        failed = await wait_for(queue, job["id"], FAILED)
+        await queue.stop()
+        return failed
+
+    assert asyncio.run(scenario())["error"] == "provider down"
+
+def test_depth_limit_refuses_new_jobs(tmp_path):
+    async def scenario():
+        queue = JobQueue(None, path=str(tmp_path / "jobs.db"), workers=0, max_depth=2)
+        await queue.start()
+        await queue.submit(PAYLOAD)
+        await queue.submit(PAYLOAD)
+        try:
+            with pytest.raises(QueueFull):
+                await queue.submit(PAYLOAD)
+        finally:
+            await queue.stop()
+
+    asyncio.run(scenario())
+
+# --- TEST 2: DURABILITY ---
+
+def test_jobs_survive_a_restart(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    started = asyncio.Event()
+
+    async def hang(request):
+        started.set()
+        await asyncio.sleep(60)
+
+    async def finish(request):
+        return {"ok": True}
+
+    async def scenario():
+        queue = JobQueue(hang, path=path, workers=1)
+        await queue.start()
+        running = await queue.submit(PAYLOAD)
+        await started.wait()
+        waiting = await queue.submit(PAYLOAD)  # never picked up before the "crash"
+        await queue.stop()
+
+        queue = JobQueue(finish, path=path, workers=1)
+        await queue.start()
+        jobs = [await wait_for(queue, job["id"], DONE) for job in (running, waiting)]
+        await queue.stop()
+        return jobs
+
+    running, waiting = asyncio.run(scenario())
+    assert running["attempts"] == 2 and running["result"] == {"ok": True}
+    assert waiting["attempts"] == 1
+
+# --- TEST 3: API ---
+
+def test_jobs_endpoints(stub_providers, monkeypatch):
+    with TestClient(api.app) as client:
+        response = client.post("/jobs", json=PAYLOAD)
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+
+        deadline = time.monotonic() + 5
+        while (job := client.get(f"/jobs/{job_id}").json())["status"] != DONE:
+            assert time.monotonic() < deadline and job["status"] != FAILED
+            time.sleep(0.02)
+        assert job["result"]["status"] == "APPROVED"
+        assert job["request"] == PAYLOAD
+
+        assert client.get("/jobs/does-not-exist").status_code == 404
+        monkeypatch.setattr(api.job_queue, "max_depth", 0)
+        full = client.post("/jobs", json=PAYLOAD)
+        assert full.status_code == 429 and full.headers["Retry-After"]
@@ -0,0 +1,57 @@
+import time
+import asyncio
+import httpx
+from src import api
+from src.api import app as api_app
+from src.checkpoint import close_checkpointed_graph
+
+PAYLOAD = {"destination": "Paris", "total_budget": 2000, "days": 5}
+
+async def _throughput(concurrency, total=16):
+    """Fires `total` requests, `concurrency` at a time. Returns requests per second."""
+    transport = httpx.ASGITransport(app=api_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        pending = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with pending:
+                response = await client.post("/plan-trip", json=PAYLOAD)
+                assert response.status_code == 200
+                assert response.json()["status"] == "APPROVED"
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - start
+
+    await close_checkpointed_graph()
+    return total / elapsed
+
+# --- TEST: THROUGHPUT SCALES WITH CONCURRENCY ---
+
+def test_throughput_grows_with_concurrency(stub_providers, monkeypatch):
+    """A blocking event loop would keep throughput flat; the async path must scale."""
+    # Identical requests would be coalesced into one run; measure real concurrency instead
+    monkeypatch.setattr(api, "COALESCE_REQUESTS", False)
+    serial = asyncio.run(_throughput(concurrency=1))
+    parallel = asyncio.run(_throughput(concurrency=8))
+
+    print(f"\n[LOAD] 1 client: {serial:.1f} req/s | 8 clients: {parallel:.1f} req/s")
+    assert parallel > serial * 3
+
+def test_health_responds_during_negotiation(stub_providers):
+    """/health must not wait behind a slow negotiation."""
+    async def scenario():
+        transport = httpx.ASGITransport(app=api_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            negotiation = asyncio.create_task(client.post("/plan-trip", json=PAYLOAD))
+            await asyncio.sleep(stub_providers.latency / 2)
+            start = time.perf_counter()
+            health = await client.get("/health")
+            health_latency = time.perf_counter() - start
+            await negotiation
+        await close_checkpointed_graph()
+        return health, health_latency
+
+    health, health_latency = asyncio.run(scenario())
+    assert health.status_code == 200
+    assert health_latency < stub_providers.latency
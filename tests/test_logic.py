@@ -1,5 +1,7 @@
 import pytest
-from src.agents import budget_agent, planner_agent
+import src.agents as agents
+from src import providers
+from src.agents import budget_agent, planner_agent, scout_agent
 
 # --- HELPER: MOCK STATE ---
 # This creates a fake "state" object so we can test the functions in isolation
@@ -68,4 +70,62 @@ def test_planner_approval():
     
     result = planner_agent(state)
     
-    assert result["plan_status"] == "APPROVED"
\ No newline at end of file
+    assert result["plan_status"] == "APPROVED"
+
+
+# --- TEST 3: SCOUT CANDIDATE POOL ---
+
+class ExplodingLLM:
+    """Fails the test if the Scout reaches for the network."""
+    def invoke(self, messages):
+        raise AssertionError("Scout should not call the LLM while the pool has a feasible candidate")
+
+def test_scout_retry_uses_candidate_pool(monkeypatch):
+    """A rejected proposal is replaced locally by the next feasible pooled hotel."""
+    monkeypatch.setattr(providers, "_llm", ExplodingLLM())
+    state = create_mock_state(price=500, budget=1000, location="City Center", status="REJECTED")
+    state["rejection_reason"] = "Total cost $3000 exceeds budget of $1000."
+    state["candidates"] = [
+        {"name": "Still Too Pricey", "price": 400, "location": "City Center"},
+        {"name": "Far Away Motel", "price": 50, "location": "Suburbs"},
+        {"name": "Hostel Central", "price": 80, "location": "City Center"},
+        {"name": "Spare Inn", "price": 90, "location": "City Center"},
+    ]
+
+    result = scout_agent(state)
+
+    assert result["current_proposal"]["name"] == "Hostel Central"
+    assert result["candidates"] == [{"name": "Spare Inn", "price": 90, "location": "City Center"}]
+    assert result["retry_count"] == 1
+
+def test_scout_parses_every_extracted_candidate():
+    content = """Here you go:
+    [{"name": "Hotel A", "price": "$120", "location": "City Center"},
+     {"name": "Hotel B", "price": 95, "location": "Suburbs"}]"""
+
+    candidates = agents._parse_candidates(content)
+
+    assert [c["name"] for c in candidates] == ["Hotel A", "Hotel B"]
+    assert candidates[0]["price"] == 120
+
+def test_speculative_first_pass_pools_both_tiers(monkeypatch):
+    """In speculative mode the other tier's hotels are already pooled after pass 1."""
+    searched = []
+    monkeypatch.setattr(agents, "SPECULATIVE_SEARCH", True)
+    monkeypatch.setattr(agents, "find_hotels", lambda tier, destination, max_price=None, refresh=False: searched.append(tier) or tier)
+    monkeypatch.setattr(agents, "_extraction_messages", lambda results, env=None: results)
+
+    class TierLLM:
+        def invoke(self, tier):
+            price = 450 if tier == "luxury" else 90
+            return type("Response", (), {"content": f'{{"name": "{tier} hotel", "price": {price}}}'})
+
+    monkeypatch.setattr(providers, "_llm", TierLLM())
+    # Both tiers fit this budget ($900/night ceiling), so neither is pruned
+    state = create_mock_state(price=0, budget=5000, location="City Center")
+
+    result = scout_agent(state)
+
+    assert sorted(searched) == ["budget", "luxury"]
+    assert result["current_proposal"]["name"] == "luxury hotel"
+    assert [c["name"] for c in result["candidates"]] == ["budget hotel"]
@@ -0,0 +1,53 @@
+import pytest
+from fastapi.testclient import TestClient
+from src import metrics
+from src.api import app as api_app
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(api_app) as client:
+        yield client
+
+PAYLOAD = {"destination": "Paris", "total_budget": 2000, "days": 5}
+
+# --- TEST 1: PRIMITIVES ---
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = metrics.Histogram("test_seconds", "Test histogram.", buckets=(0.1, 1.0))
+    histogram.observe(0.05, node="scout")
+    histogram.observe(0.5, node="scout")
+    histogram.observe(5.0, node="scout")
+
+    text = "\n".join(histogram.render())
+    assert 'test_seconds_bucket{node="scout",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{node="scout",le="1.0"} 2' in text
+    assert 'test_seconds_bucket{node="scout",le="+Inf"} 3' in text
+    assert 'test_seconds_count{node="scout"} 3' in text
+
+def test_counter_tracks_labels_separately():
+    counter = metrics.Counter("test_total", "Test counter.")
+    counter.inc(status="APPROVED")
+    counter.inc(2, status="REJECTED")
+
+    assert counter.value(status="APPROVED") == 1
+    assert counter.value(status="REJECTED") == 2
+
+# --- TEST 2: /metrics AFTER A NEGOTIATION ---
+
+def test_metrics_endpoint_reports_a_negotiation(client, stub_providers):
+    approved_before = metrics.NEGOTIATIONS.value(status="APPROVED")
+    scout_before = metrics.NODE_SECONDS.count(node="scout")
+    extraction_before = metrics.LLM_CALLS.value(purpose="extraction")
+
+    assert client.post("/plan-trip", json=PAYLOAD).json()["status"] == "APPROVED"
+
+    assert metrics.NEGOTIATIONS.value(status="APPROVED") == approved_before + 1
+    assert metrics.NODE_SECONDS.count(node="scout") == scout_before + 1
+    assert metrics.LLM_CALLS.value(purpose="extraction") == extraction_before + 1
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    for name in ("travelgraph_node_duration_seconds_bucket", "travelgraph_search_duration_seconds_count",
+                 "travelgraph_scout_pass_llm_calls_count", "travelgraph_negotiation_retries_count",
+                 'travelgraph_proposals_total{source="search"}', "travelgraph_search_cache_misses"):
+        assert name in response.text
@@ -0,0 +1,103 @@
+import pytest
+from fastapi.testclient import TestClient
+from src import api
+from src.api import app as api_app
+from src.plan_cache import PlanCache, plan_outcome, APPROVED, PRICE_REJECTED
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(api_app) as client:
+        yield client
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+PAYLOAD = {"destination": "Paris", "total_budget": 2000, "days": 5}
+PRICEY_HOTEL = {"name": "Palace", "price": 900, "location": "City Center"}
+
+# --- TEST 1: BUDGET-RANGE REUSE ---
+
+def test_approved_plan_serves_larger_budgets_only():
+    cache = PlanCache()
+    cache.set("Paris", 5, 1500, APPROVED, {"run_id": "a"})
+
+    assert cache.get("paris", 5, 1500)["run_id"] == "a"
+    assert cache.get(" PARIS ", 5, 9000)["run_id"] == "a"
+    assert cache.get("Paris", 5, 1499) is None
+    assert cache.get("Paris", 4, 9000) is None
+
+def test_price_rejection_serves_smaller_budgets_only():
+    cache = PlanCache()
+    cache.set("Paris", 5, 800, PRICE_REJECTED, {"run_id": "r"})
+
+    assert cache.get("Paris", 5, 500)["run_id"] == "r"
+    assert cache.get("Paris", 5, 801) is None
+
+def test_closest_approved_budget_wins():
+    cache = PlanCache()
+    cache.set("Paris", 5, 3000, APPROVED, {"run_id": "luxury"})
+    cache.set("Paris", 5, 1200, APPROVED, {"run_id": "budget"})
+
+    assert cache.get("Paris", 5, 2000)["run_id"] == "budget"
+    assert cache.get("Paris", 5, 5000)["run_id"] == "luxury"
+
+def test_ttl_size_bound_and_invalidate():
+    clock = FakeClock()
+    cache = PlanCache(ttl=60, max_entries=2, clock=clock)
+    cache.set("Paris", 5, 1000, APPROVED, {"run_id": "old"})
+    clock.now += 61
+    assert cache.get("Paris", 5, 1000) is None
+
+    cache.set("Paris", 5, 1000, APPROVED, {"run_id": "a"})
+    cache.set("Rome", 5, 1000, APPROVED, {"run_id": "b"})
+    cache.set("Oslo", 5, 1000, APPROVED, {"run_id": "c"})  # evicts Paris
+    assert cache.get("Paris", 5, 1000) is None
+    assert cache.stats()["size"] == 2
+
+    assert cache.invalidate(destination="rome") == 1
+    assert cache.get("Rome", 5, 1000) is None
+    assert cache.invalidate() == 1
+
+def test_only_agent_decisions_are_cacheable():
+    assert plan_outcome({}, "APPROVED") == APPROVED
+    assert plan_outcome({"human_decision": "approve"}, "APPROVED") is None
+    assert plan_outcome({"rejection_reason": "Total cost $5000 exceeds budget of $2000."}, "WAITING_FOR_HUMAN") == PRICE_REJECTED
+    assert plan_outcome({"rejection_reason": "Hotel is too far (45 mins) from City Center."}, "WAITING_FOR_HUMAN") is None
+
+# --- TEST 2: API ---
+
+def test_repeat_and_larger_budget_skip_the_graph(client, stub_providers, monkeypatch):
+    monkeypatch.setattr(api, "plan_cache", PlanCache())
+    first = client.post("/plan-trip", json=PAYLOAD).json()
+    assert first["status"] == "APPROVED" and "cached" not in first
+
+    stub_providers.llm.hotel = None  # any graph run would now fall back
+    richer = client.post("/plan-trip", json={**PAYLOAD, "total_budget": 5000}).json()
+    assert richer["cached"] is True
+    assert richer["run_id"] == first["run_id"]
+    assert client.get("/plan-cache/stats").json()["hits"] == 1
+
+    assert client.delete("/plan-cache", params={"destination": "Paris"}).json() == {"removed": 1}
+
+def test_price_deadlock_is_reused_for_smaller_budgets(client, stub_providers, monkeypatch):
+    monkeypatch.setattr(api, "plan_cache", PlanCache())
+    stub_providers.llm.hotel = PRICEY_HOTEL
+    stalled = client.post("/plan-trip", json=PAYLOAD).json()
+    assert stalled["status"] == "WAITING_FOR_HUMAN"
+
+    poorer = client.post("/plan-trip", json={**PAYLOAD, "total_budget": 1000}).json()
+    assert poorer["cached"] is True and poorer["status"] == "WAITING_FOR_HUMAN"
+    assert poorer["itinerary"] == stalled["itinerary"]
+
+    # The poorer caller decides on its own copy of the paused run, not on the original
+    assert poorer["run_id"] != stalled["run_id"]
+    forced = client.post(f"/plan-trip/{poorer['run_id']}/decision", json={"decision": "approve"}).json()
+    assert forced["status"] == "APPROVED" and forced["itinerary"]["name"] == "Palace"
+
+    # A decision moves the run on, so its cached body is dropped
+    assert client.post(f"/plan-trip/{stalled['run_id']}/decision", json={"decision": "quit"}).json()["status"] == "REJECTED"
+    assert api.plan_cache.stats()["size"] == 0
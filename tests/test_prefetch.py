@@ -0,0 +1,168 @@
+import asyncio
+import pytest
+import src.agents as agents
+import src.tools as tools
+from src import providers
+from src.cache import SearchCache, candidates_key
+from src.constraints import envelope
+from src.prefetch import Prefetcher
+
+# --- HELPERS ---
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class BrokenLLM:
+    def invoke(self, messages):
+        raise RuntimeError("groq is down")
+
+    async def ainvoke(self, messages):
+        raise RuntimeError("groq is down")
+
+def hotel_results(name, price):
+    return [{"title": name, "content": f"{name} - ${price} per night, located in the City Center."}]
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(tools, "search_cache", SearchCache(ttl=60, stale_ttl=600, clock=clock))
+    return clock
+
+@pytest.fixture
+def searches(monkeypatch):
+    """Async find_hotels stand-in: answers with whatever .hotel is, and counts the calls."""
+    class Searches:
+        calls = 0
+        hotel = ("Hotel Lumiere", 120)
+
+    async def fake_afind(tier, destination, max_price=None, refresh=False):
+        Searches.calls += 1
+        return hotel_results(*Searches.hotel)
+
+    monkeypatch.setattr(agents, "afind_hotels", fake_afind)
+    return Searches
+
+# --- TEST 1: STALE WINDOW ---
+
+def test_expired_entries_are_only_served_on_request():
+    clock = FakeClock()
+    cache = SearchCache(ttl=60, stale_ttl=600, clock=clock)
+    cache.set("k", [1])
+
+    clock.now += 61
+    assert not cache.is_fresh("k")
+    assert cache.get("k") is None
+    assert cache.get("k", stale=True) == [1]
+    assert cache.stats()["stale_hits"] == 1
+
+    clock.now += 600
+    assert cache.get("k", stale=True) is None
+    assert cache.expires_at("k") is None
+
+# --- TEST 2: STALE-WHILE-REVALIDATE ---
+
+def test_stale_candidates_are_served_while_refreshing(clock, searches):
+    async def scenario():
+        first = await agents._asearch_and_extract("budget", "Paris")
+        clock.now += 61
+        searches.hotel = ("Hotel Nouveau", 110)
+        stale = await agents._asearch_and_extract("budget", "Paris")
+        await asyncio.gather(*agents._background)
+        fresh = await agents._asearch_and_extract("budget", "Paris")
+        return first, stale, fresh
+
+    first, stale, fresh = asyncio.run(scenario())
+
+    assert first[0]["name"] == stale[0]["name"] == "Hotel Lumiere"
+    assert fresh[0]["name"] == "Hotel Nouveau"
+    assert searches.calls == 2  # the first search and the background refresh
+    assert tools.search_cache.is_fresh(candidates_key("budget", "Paris"))
+
+# --- TEST 3: CACHED HOTELS INSTEAD OF THE RANDOM FALLBACK ---
+
+def test_cached_hotels_replace_the_fallback_when_providers_fail(clock, searches, monkeypatch):
+    asyncio.run(agents._asearch_and_extract("luxury", "Paris"))
+
+    async def down(*args, **kwargs):
+        raise RuntimeError("tavily is down")
+    monkeypatch.setattr(agents, "afind_hotels", down)
+    monkeypatch.setattr(providers, "_llm", BrokenLLM())
+
+    candidates = asyncio.run(agents._asearch_and_extract("budget", "paris "))
+
+    assert [c["name"] for c in candidates] == ["Hotel Lumiere"]
+    assert agents.FALLBACK_HOTEL_NAME not in [c["name"] for c in candidates]
+
+def test_failed_refresh_keeps_the_cached_hotels(clock, searches, monkeypatch):
+    asyncio.run(agents._asearch_and_extract("budget", "Paris"))
+    monkeypatch.setattr(providers, "_llm", BrokenLLM())
+    searches.hotel = ("Rates on request", "?")  # unparseable: the LLM would be needed
+
+    assert asyncio.run(agents.awarm("budget", "Paris")) is False
+    assert asyncio.run(agents._asearch_and_extract("budget", "Paris"))[0]["name"] == "Hotel Lumiere"
+
+# --- TEST 4: PREFETCHER ---
+
+def test_popularity_decays():
+    clock = FakeClock()
+    prefetcher = Prefetcher(half_life=60, clock=clock)
+    for _ in range(4):
+        prefetcher.record("Paris", 2000, 5)
+    clock.now += 120  # Paris is down to 1.0
+    prefetcher.record("  tokyo", 2000, 5)
+    prefetcher.record("Tokyo", 2000, 5)
+
+    assert [d for d, _ in prefetcher.popular()] == ["Tokyo", "Paris"]
+
+def test_pruning_the_long_tail_keeps_the_hottest_destinations():
+    prefetcher = Prefetcher(top_n=2, clock=FakeClock())
+    for _ in range(5):
+        prefetcher.record("Paris", 2000, 5)
+    for i in range(20):  # crosses the 10 * top_n pruning threshold
+        prefetcher.record(f"City {i}", 2000, 5)
+
+    assert len(prefetcher._scores) <= 20
+    assert prefetcher.popular(1) == [("Paris", 5.0)]
+
+def test_prefetcher_refreshes_popular_destinations_before_they_expire(clock, searches):
+    prefetcher = Prefetcher(top_n=1, ahead=30, clock=clock)
+    prefetcher.record("Paris", 2000, 5)
+    prefetcher.record("Paris", 2000, 5)
+    prefetcher.record("Rome", 2000, 5)
+    env = envelope(2000, 5)
+
+    assert prefetcher.due() == [("luxury", "Paris", env), ("budget", "Paris", env)]
+    assert asyncio.run(prefetcher.run_once()) == 2
+    assert prefetcher.due() == []
+
+    clock.now += 31  # within PREFETCH_AHEAD_S of expiring
+    assert len(prefetcher.due()) == 2
+    asyncio.run(prefetcher.run_once())
+    assert tools.search_cache.expires_at(candidates_key("budget", "Paris", env.query_ceiling)) == clock.now + 60
+
+def test_one_off_destinations_are_not_prefetched(clock, searches):
+    prefetcher = Prefetcher(clock=clock)
+    prefetcher.record("Reykjavik", 2000, 5)
+
+    assert prefetcher.due() == []
+
+def test_failed_refreshes_back_off(clock, monkeypatch):
+    attempts = []
+
+    async def failing_awarm(tier, destination, env=None):
+        attempts.append(clock.now)
+        return False
+    monkeypatch.setattr(agents, "awarm", failing_awarm)
+    prefetcher = Prefetcher(top_n=1, interval=60, max_backoff=200, clock=clock)
+    prefetcher.record("Paris", 2000, 5)
+    prefetcher.record("Paris", 2000, 5)
+
+    for _ in range(10):  # ten ticks, 60s apart
+        asyncio.run(prefetcher.run_once())
+        clock.now += 60
+
+    # Both tiers retried after 60s, 120s, then every 200s -- not on all ten ticks
+    assert sorted(set(attempts)) == [1000, 1060, 1180, 1420]
@@ -0,0 +1,52 @@
+import src.agents as agents
+from src import providers
+from src.preprocess import compact_results
+
+NOISY = [
+    {"url": "https://example.com/a", "title": "Le Marais Inn - Official Site",
+     "content": "Sign in for member prices. Le Marais Inn is in the city center. Rooms from $180 per night. "
+                "[Book now](https://example.com/book) We use cookies. Paris is lovely in spring."},
+    {"url": "https://example.com/b", "title": "Le Marais Inn - Reviews",
+     "content": "Le Marais Inn is in the city center.   Rooms from $180 per night! <b>Great</b> breakfast."},
+]
+
+def test_noise_and_duplicates_are_removed():
+    text, report = compact_results(NOISY)
+
+    assert "http" not in text and "cookies" not in text and "Sign in" not in text
+    assert "spring" not in text  # nothing about hotels, prices or the area
+    assert text.count("Rooms from $180 per night") == 1
+    assert "Le Marais Inn - Official Site:" in text
+    assert report["duplicates"] == 2
+    assert report["tokens_after"] < report["tokens_before"]
+
+def test_token_budget_is_enforced():
+    results = [{"title": f"Hotel {i}", "content": f"Hotel {i} costs ${100 + i} per night in the city center."}
+               for i in range(50)]
+
+    text, report = compact_results(results, token_budget=60)
+
+    assert len(text) <= 60 * 4
+    assert report["tokens_after"] <= 60
+    assert text.startswith("- Hotel 0:")
+
+def test_non_list_payloads_pass_through_truncated():
+    text, _ = compact_results("Search failed: rate limited", token_budget=2)
+    assert text == "Search f"
+
+def test_extraction_prompt_embeds_the_compacted_results(monkeypatch):
+    prompts = []
+
+    class RecordingLLM:
+        def invoke(self, messages):
+            prompts.append(messages[-1].content)
+            return type("Response", (), {"content": '{"name": "Le Marais Inn", "price": 180, "location": "City Center"}'})
+
+    monkeypatch.setattr(providers, "_llm", RecordingLLM())
+    monkeypatch.setattr(agents, "EXTRACTION_CONFIDENCE", 1.1)  # force the LLM path
+    monkeypatch.setattr(agents, "find_hotels", lambda tier, destination, max_price=None, refresh=False: NOISY)
+
+    agents._search_and_extract("budget", "Paris")
+
+    assert "Rooms from $180 per night" in prompts[0]
+    assert "https://" not in prompts[0]
@@ -0,0 +1,39 @@
+import os
+import sys
+import json
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Ceiling for a cold `import src.api` (seconds). Override on slow CI boxes.
+IMPORT_TIME_BUDGET = float(os.environ.get("IMPORT_TIME_BUDGET", "3.0"))
+
+# Provider SDKs that must only load on the first real provider call
+LAZY_MODULES = ["langchain_groq", "langchain_community", "groq", "tavily"]
+
+PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import src.api
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {LAZY_MODULES!r} if m in sys.modules]}}))
+"""
+
+def run_probe():
+    # No API keys in the environment: importing must not need them
+    env = {k: v for k, v in os.environ.items() if k not in ("GROQ_API_KEY", "TAVILY_API_KEY")}
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=ROOT, env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def test_import_api_without_keys_within_budget():
+    probe = run_probe()
+
+    print(f"\n[STARTUP] import src.api took {probe['elapsed']:.2f}s (budget {IMPORT_TIME_BUDGET}s)")
+    assert probe["elapsed"] < IMPORT_TIME_BUDGET
+
+def test_provider_sdks_load_lazily():
+    assert run_probe()["loaded"] == []
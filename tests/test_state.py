@@ -0,0 +1,91 @@
+import time
+import asyncio
+import dataclasses
+import logging
+import pytest
+from benchmarks.common import use_scenario, initial_state
+from src import checkpoint
+from src.agents import budget_agent
+from src.graph import app
+from src.state import Proposal, Event, capped
+
+# --- TEST 1: PROPOSAL ---
+
+def test_proposal_reads_like_a_dict_but_cannot_change():
+    proposal = Proposal.of({"name": "Hostel Marais", "price": 150, "location": "City Center", "stars": 2})
+
+    assert proposal["price"] == 150 and proposal.get("total_cost") is None
+    assert "travel_minutes" not in proposal
+    assert dict(proposal) == {"name": "Hostel Marais", "price": 150, "location": "City Center"}
+    assert proposal == {"name": "Hostel Marais", "price": 150, "location": "City Center"}
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        proposal.price = 10
+    with pytest.raises(TypeError):
+        proposal["price"] = 10
+
+def test_budget_officer_returns_a_new_proposal():
+    hotel = {"name": "Test Hotel", "price": 0, "location": "City Center"}
+    state = {"current_proposal": hotel, "total_budget": 5000, "days": 5, "plan_status": "PROPOSED"}
+
+    result = budget_agent(state)
+
+    assert result["current_proposal"].total_cost == 500
+    assert result["current_proposal"].price == 100  # back-filled from the total
+    assert hotel == {"name": "Test Hotel", "price": 0, "location": "City Center"}  # input untouched
+
+# --- TEST 2: BOUNDED LOGS ---
+
+def test_capped_reducer_keeps_the_newest_entries():
+    append = capped(3)
+    assert append(["a", "b"], ["c", "d"]) == ["b", "c", "d"]
+    assert capped(0)(["a"], ["b"]) == ["a", "b"]
+
+def test_runs_record_one_event_per_node_step():
+    final = app.invoke(initial_state(use_scenario("planner_deadlock")))
+
+    assert all(isinstance(e, Event) for e in final["events"])
+    assert [e.node for e in final["events"][:3]] == ["scout", "budget", "planner"]
+    assert final["events"][2].status == "REJECTED"
+    assert "too far" in final["events"][2].reason
+    assert final["events"][2].reason == final["rejection_reason"]
+    assert len(final["messages"]) <= 5
+
+# --- TEST 3: CHECKPOINT ROUND TRIP ---
+
+def test_checkpoint_restores_typed_state(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(checkpoint, "CHECKPOINT_PATH", str(tmp_path / "checkpoints.db"))
+    scenario = use_scenario("planner_deadlock")
+
+    async def scenario_run():
+        graph = await checkpoint.get_checkpointed_graph()
+        config = checkpoint.run_config("typed")
+        await graph.ainvoke(initial_state(scenario), config, durability=checkpoint.CHECKPOINT_DURABILITY)
+        snapshot = await graph.aget_state(config)
+        await checkpoint.close_checkpointed_graph()
+        return snapshot
+
+    with caplog.at_level(logging.WARNING, logger="langgraph.checkpoint.serde.jsonplus"):
+        snapshot = asyncio.run(scenario_run())
+
+    assert snapshot.next == ("human",)
+    assert isinstance(snapshot.values["current_proposal"], Proposal)
+    assert snapshot.values["current_proposal"].total_cost == 2000
+    assert all(isinstance(e, Event) for e in snapshot.values["events"])
+    # Registered types: the serializer never warns about unregistered ones
+    assert not [r for r in caplog.records if r.name.startswith("langgraph")]
+
+def test_sweep_deletes_only_old_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoint, "CHECKPOINT_PATH", str(tmp_path / "checkpoints.db"))
+    scenario = use_scenario("budget_loop")
+
+    async def scenario_run():
+        graph = await checkpoint.get_checkpointed_graph()
+        await graph.ainvoke(initial_state(scenario), checkpoint.run_config("old"))
+        await asyncio.sleep(0.2)
+        await graph.ainvoke(initial_state(scenario), checkpoint.run_config("new"))
+        swept = await checkpoint.sweep_checkpoints(graph, retention=0.1, now=time.time())
+        kept = [(await graph.aget_state(checkpoint.run_config(r))).values != {} for r in ("old", "new")]
+        await checkpoint.close_checkpointed_graph()
+        return swept, kept
+
+    assert asyncio.run(scenario_run()) == (1, [False, True])
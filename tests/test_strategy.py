@@ -0,0 +1,59 @@
+import pytest
+from src.agents import budget_agent, planner_agent
+from src.strategy import rule_based_tier, choose_tier
+
+# --- HELPER: REAL REJECTION REASONS ---
+# Taken from the agents themselves, so the rules stay in sync with their wording.
+def rejection_from(agent, price, location):
+    state = {
+        "current_proposal": {"name": "Test Hotel", "price": price, "location": location},
+        "total_budget": 1000,
+        "days": 5,
+        "human_decision": None,
+        "plan_status": "PROPOSED",
+    }
+    return agent(state)["rejection_reason"]
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+class CountingLLM:
+    def __init__(self, answer):
+        self.answer = answer
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        return FakeResponse(self.answer)
+
+def test_first_pass_defaults_to_luxury():
+    assert rule_based_tier(None) == "luxury"
+
+def test_budget_rejection_switches_to_budget():
+    reason = rejection_from(budget_agent, price=500, location="City Center")
+    assert rule_based_tier(reason) == "budget"
+
+def test_planner_rejection_switches_to_luxury():
+    reason = rejection_from(planner_agent, price=100, location="Suburbs")
+    assert rule_based_tier(reason) == "luxury"
+
+@pytest.mark.parametrize("reason", [
+    "Total cost $2750 exceeds budget of $1500.",
+    "Hotel is too far (45 mins) from City Center.",
+    None,
+])
+def test_known_reasons_never_call_the_llm(reason):
+    llm = CountingLLM("budget")
+    choose_tier(reason, llm=llm, use_llm=True)
+    assert llm.calls == 0
+
+def test_unknown_reason_defaults_without_flag():
+    llm = CountingLLM("budget")
+    assert choose_tier("The guest prefers a quiet street.", llm=llm, use_llm=False) == "luxury"
+    assert llm.calls == 0
+
+def test_unknown_reason_uses_llm_behind_flag():
+    llm = CountingLLM("Budget")
+    assert choose_tier("The guest prefers a quiet street.", llm=llm, use_llm=True) == "budget"
+    assert llm.calls == 1
@@ -0,0 +1,102 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+from src import tracing
+from src.api import app as api_app
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(api_app) as client:
+        yield client
+
+FAR_HOTEL = {"name": "Airport Lodge", "price": 80, "location": "Suburbs"}
+
+PAYLOAD = {"destination": "Paris", "total_budget": 2000, "days": 5}
+
+# --- TEST: SPAN TREE ---
+
+def test_spans_nest_under_the_current_span():
+    with tracing.trace("unit-run") as root:
+        with tracing.span("outer", tier="luxury") as outer:
+            with tracing.span("inner"):
+                pass
+            tracing.event("router", decision="done")
+
+    spans = {s["name"]: s for s in tracing.get_trace("unit-run")}
+    assert spans["graph_run"]["span_id"] == root["span_id"]
+    assert spans["outer"]["parent_id"] == root["span_id"]
+    assert spans["inner"]["parent_id"] == outer["span_id"]
+    assert spans["router"]["parent_id"] == outer["span_id"]
+    assert spans["outer"]["attributes"] == {"tier": "luxury"}
+
+def test_spans_outside_a_trace_are_noops():
+    with tracing.span("orphan") as span:
+        assert span is None
+    tracing.event("router")  # must not raise
+
+def test_unsampled_runs_are_not_recorded(monkeypatch):
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 0.0)
+    with tracing.trace("dropped-run") as root:
+        assert root is None
+    assert tracing.get_trace("dropped-run") is None
+
+def test_traces_are_written_as_json_lines():
+    with tracing.trace("file-run"):
+        pass
+    tracing.flush()  # written by a background thread
+    with open(tracing.TRACE_PATH) as f:
+        records = [json.loads(line) for line in f]
+    assert any(r["run_id"] == "file-run" for r in records)
+
+def test_trace_file_rotates_and_stays_searchable(tmp_path, monkeypatch):
+    path = str(tmp_path / "traces.jsonl")
+    monkeypatch.setattr(tracing, "TRACE_PATH", path)
+    monkeypatch.setattr(tracing, "TRACE_MAX_BYTES", 2000)
+    monkeypatch.setattr(tracing, "TRACE_MEMORY_LIMIT", 1)
+    for i in range(40):
+        with tracing.trace(f"rotating-run-{i}"):
+            with tracing.span("work", padding="x" * 100):
+                pass
+    tracing.flush()
+
+    assert (tmp_path / "traces.jsonl").stat().st_size <= 2000
+    assert (tmp_path / "traces.jsonl.1").stat().st_size <= 2000
+    assert tracing.get_trace("rotating-run-38")[0]["name"] == "graph_run"  # evicted from memory, read from disk
+    assert tracing.get_trace("rotating-run-0") is None  # rotated away
+
+# --- TEST: API RUNS ---
+
+def test_plan_trip_trace_covers_nodes_calls_and_router(client, stub_providers):
+    run_id = client.post("/plan-trip", json=PAYLOAD).json()["run_id"]
+
+    body = client.get(f"/traces/{run_id}").json()
+    names = [s["name"] for s in body["spans"]]
+
+    assert names[0] == "graph_run"
+    for expected in ("node.scout", "search_hotels", "llm.invoke", "node.budget", "node.planner", "router"):
+        assert expected in names
+    search = next(s for s in body["spans"] if s["name"] == "search_hotels")
+    assert search["attributes"]["tier"] == "luxury"
+    assert body["spans"][0]["attributes"]["status"] == "APPROVED"
+
+def test_retry_loop_is_visible_in_the_trace(client, stub_providers):
+    stub_providers.llm.hotel = FAR_HOTEL
+    run_id = client.post("/plan-trip", json=PAYLOAD).json()["run_id"]
+    client.post(f"/plan-trip/{run_id}/decision", json={"decision": "approve"})
+
+    spans = client.get(f"/traces/{run_id}").json()["spans"]
+    scout_visits = [s for s in spans if s["name"] == "node.scout"]
+    rejections = [s for s in spans if s["name"] == "router" and s["attributes"].get("rejection_reason")]
+
+    assert len(scout_visits) == 3
+    assert "too far" in rejections[0]["attributes"]["rejection_reason"].lower()
+    assert "graph_resume" in [s["name"] for s in spans]
+
+def test_text_waterfall_and_unknown_run(client, stub_providers):
+    run_id = client.post("/plan-trip", json=PAYLOAD).json()["run_id"]
+
+    text = client.get(f"/traces/{run_id}", params={"format": "text"}).text
+    assert text.splitlines()[0].startswith("graph_run")
+    assert "  node.scout" in text
+
+    assert client.get("/traces/no-such-run").status_code == 404